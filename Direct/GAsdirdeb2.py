@@ -1,6 +1,13 @@
 import streamlit as st
 import pandas as pd
+import sys
 from datetime import date
+from pathlib import Path
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing.postcodes import resolver
 
 st.set_page_config(layout="wide")
 st.title("Dyce Energy Gas Pricing Tool - Reactive Mode")
@@ -10,8 +17,8 @@ As you enter AQ and postcode, the supplier prices will automatically display.
 Then you can enter uplifts, and the final prices and annual cost will recalculate instantly.
 """)
 
-# Load postcode lookup
-postcode_df = pd.read_csv("Clean_PostCode.csv")
+# Postcode lookup, read once per process and shared across sessions
+postcodes = resolver(Path(__file__).resolve().parent / "Clean_PostCode.csv")
 
 # Upload tariff pricing file
 tariff_file = st.file_uploader("Upload Supplier Tariff File (Excel)", type=["xlsx"])
@@ -33,10 +40,22 @@ carbon_flag = True if carbon_offset == "Green" else False
 # Site data reactive state
 if "site_data" not in st.session_state:
     st.session_state.site_data = [{} for _ in range(10)]
+# Annual cost per site, None until priced; the portfolio total sums these
+if "site_costs" not in st.session_state:
+    st.session_state.site_costs = [None] * 10
 
 st.header("Site Details (Reactive, up to 10 sites)")
+total_slot = st.empty()
 
-for i in range(10):
+
+def show_total():
+    priced = [cost for cost in st.session_state.site_costs if cost is not None]
+    total_slot.markdown(f"**Portfolio Total ({len(priced)} sites priced): £{sum(priced):,.2f}**")
+
+
+@st.fragment
+def site_row(i, tariff_df, carbon_flag):
+    """One site's inputs and prices; editing them reruns only this row."""
     st.markdown(f"**Site {i+1}**")
     cols = st.columns(11)
 
@@ -64,12 +83,11 @@ for i in range(10):
 
         st.write(f"DEBUG: Postcode '{data['postcode']}' gives outcode '{outcode}'")
 
-        ldz_lookup = postcode_df[postcode_df["Outcode"] == outcode]
+        ldz = postcodes.ldz_for_outcode(outcode)
 
-        st.write("DEBUG: LDZ Lookup:", ldz_lookup)
+        st.write("DEBUG: LDZ Lookup:", ldz)
 
-        if not ldz_lookup.empty:
-            ldz = ldz_lookup.iloc[0]["LDZ"]
+        if ldz is not None:
             st.write(f"DEBUG: Found LDZ {ldz}")
 
             band = tariff_df[
@@ -84,19 +102,21 @@ for i in range(10):
                 match = band.iloc[0]
                 supplier_standing = match["Standing_Charge"]
                 supplier_unit = match["Unit_Rate"]
-
-                data["supplier_standing"] = supplier_standing
-                data["supplier_unit"] = supplier_unit
             else:
-                data["supplier_standing"] = "No Match"
-                data["supplier_unit"] = "No Match"
+                supplier_standing = "No Match"
+                supplier_unit = "No Match"
         else:
-            data["supplier_standing"] = "No LDZ"
-            data["supplier_unit"] = "No LDZ"
+            supplier_standing = "No LDZ"
+            supplier_unit = "No LDZ"
+
+    data["supplier_standing"] = supplier_standing
+    data["supplier_unit"] = supplier_unit
 
-    # show supplier rates
-    data["supplier_standing"] = cols[4].text_input("Supplier Standing (p/day)", value=str(data.get("supplier_standing", "")), disabled=True, key=f"ss_{i}")
-    data["supplier_unit"] = cols[5].text_input("Supplier Unit (p/kWh)", value=str(data.get("supplier_unit", "")), disabled=True, key=f"su_{i}")
+    # show supplier rates; keyed widgets take their value from session state
+    st.session_state[f"ss_{i}"] = str(supplier_standing)
+    st.session_state[f"su_{i}"] = str(supplier_unit)
+    cols[4].text_input("Supplier Standing (p/day)", disabled=True, key=f"ss_{i}")
+    cols[5].text_input("Supplier Unit (p/kWh)", disabled=True, key=f"su_{i}")
 
     # uplifts
     data["stand_uplift"] = cols[6].number_input("Standing Uplift (p/day)", min_value=0.0, value=data.get("stand_uplift", 0.0), step=0.1, key=f"uplift_s_{i}")
@@ -104,15 +124,27 @@ for i in range(10):
     data["cost_per_metre"] = cols[8].number_input("Cost/metre (p/metre)", min_value=0.0, value=data.get("cost_per_metre", 0.0), key=f"cpm_{i}")
 
     # final prices
-    if isinstance(data.get("supplier_standing"), (float, int)) and isinstance(data.get("supplier_unit"), (float, int)):
-        final_standing = data["supplier_standing"] + data["stand_uplift"]
-        final_unit = data["supplier_unit"] + data["unit_uplift"]
+    if isinstance(supplier_standing, (float, int)) and isinstance(supplier_unit, (float, int)):
+        final_standing = supplier_standing + data["stand_uplift"]
+        final_unit = supplier_unit + data["unit_uplift"]
         annual_cost = (data["aq"] * final_unit / 100) + (365 * final_standing / 100)
 
-    data["final_standing"] = cols[9].text_input("Final Standing (p/day)", value=str(round(final_standing, 4)) if final_standing else "", disabled=True, key=f"fs_{i}")
-    data["final_unit"] = cols[10].text_input("Final Unit (p/kWh)", value=str(round(final_unit, 4)) if final_unit else "", disabled=True, key=f"fu_{i}")
+    data["final_standing"] = final_standing
+    data["final_unit"] = final_unit
+    st.session_state[f"fs_{i}"] = str(round(final_standing, 4)) if final_standing != "" else ""
+    st.session_state[f"fu_{i}"] = str(round(final_unit, 4)) if final_unit != "" else ""
+    cols[9].text_input("Final Standing (p/day)", disabled=True, key=f"fs_{i}")
+    cols[10].text_input("Final Unit (p/kWh)", disabled=True, key=f"fu_{i}")
 
     if annual_cost != "":
         st.write(f"Estimated Annual Cost for Site {i+1}: £{round(annual_cost,2)}")
 
+    # Only this site's cost changes, so the total is refreshed from the stored costs
+    st.session_state.site_costs[i] = annual_cost if annual_cost != "" else None
+    show_total()
+
+
+for i in range(10):
+    site_row(i, tariff_df, carbon_flag)
+
 st.success("Reactive pricing is live. Enter AQ + postcode and supplier costs will appear immediately.")
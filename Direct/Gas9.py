@@ -1,6 +1,16 @@
 import streamlit as st
 import pandas as pd
+import sys
 from datetime import date
+from pathlib import Path
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing.ingest import read_flat_file
+from pricing.postcodes import outcode as postcode_outcode, resolver
+from pricing.tariff_index import date_warning, quote_warning, tariff_index
+from pricing.trace import MatchTrace
 
 st.set_page_config(layout="wide")
 st.title("Dyce Energy Gas Pricing Tool - Debug Mode")
@@ -8,19 +18,25 @@ st.title("Dyce Energy Gas Pricing Tool - Debug Mode")
 st.markdown("""
 Upload the weekly gas tariff pricing file, then enter up to 10 sites to calculate pricing with site-specific uplifts.
 
-**Debug mode prints step-by-step information to help trace matching problems.**
+**Debug mode records how each site was matched, stage by stage, to help trace matching problems.**
 """)
 
-# Load postcode lookup
-postcode_df = pd.read_csv("Clean_PostCode.csv")
+# Postcode lookup, read once per process and shared across sessions
+postcodes = resolver(Path(__file__).resolve().parent / "Clean_PostCode.csv")
 
 # Upload tariff pricing file
 tariff_file = st.file_uploader("Upload Supplier Tariff File (Excel)", type=["xlsx"])
 
 if tariff_file:
-    tariff_df = pd.read_excel(tariff_file, sheet_name=0)
+    tariff_df = read_flat_file(tariff_file, schema="gas_direct")
     st.success("Tariff file loaded successfully.")
     st.dataframe(tariff_df.head())
+    # (LDZ, carbon) -> AQ and date window index, built once per tariff file
+    index = tariff_index(tariff_df)
+    if quote_warning(index):
+        st.warning(quote_warning(index))
+    if date_warning(index):
+        st.warning(date_warning(index))
 else:
     tariff_df = None
 
@@ -30,6 +46,7 @@ customer_name = st.text_input("Customer Name")
 contract_start_date = st.date_input("Contract Start Date", value=date.today())
 carbon_offset = st.selectbox("Carbon Offset", ["Standard", "Green"])
 carbon_flag = True if carbon_offset == "Green" else False
+trace_matches = st.checkbox("Trace tariff matching", value=True)
 
 st.header("Site Details (up to 10 sites)")
 
@@ -58,37 +75,21 @@ for i in range(10):
 # Process button
 if st.button("Calculate Pricing"):
     if tariff_df is not None:
+        # Per-site match stages, recorded compactly and shown collapsed below the results
+        trace = MatchTrace(tariff_df, enabled=trace_matches)
         results = []
         for site in site_data:
             if site["mprn"] != "" and site["postcode"] != "":
-                st.write("---")
-                st.write(f"Checking site: {site['site_name']}")
-                st.write(f"Postcode entered: {site['postcode']}")
-
-                cleaned = site["postcode"].replace(" ", "").upper()
-                outcode = cleaned[:-3]
-                st.write(f"Extracted outcode: {outcode}")
-
-                ldz_lookup = postcode_df[postcode_df["Outcode"] == outcode]
-                st.write("LDZ Lookup result:")
-                st.write(ldz_lookup)
-
-                if not ldz_lookup.empty:
-                    ldz = ldz_lookup.iloc[0]["LDZ"]
-                    st.write(f"Matched LDZ: {ldz}")
-
-                    band = tariff_df[
-                        (tariff_df["Minimum_Annual_Consumption"] <= site["aq"]) &
-                        (tariff_df["Maximum_Annual_Consumption"] >= site["aq"]) &
-                        (tariff_df["Carbon_Offset"] == carbon_flag) &
-                        (tariff_df["LDZ"] == ldz)
-                    ]
-
-                    st.write("Filtered tariff band:")
-                    st.write(band)
-
-                    if not band.empty:
-                        match = band.iloc[0]
+                outcode = postcode_outcode(site["postcode"])
+
+                ldz, level = postcodes.resolve(site["postcode"])
+                position = None
+
+                if ldz is not None:
+                    position = index.lookup(ldz, carbon_flag, site["aq"], contract_start_date)
+
+                    if position is not None:
+                        match = tariff_df.iloc[position]
                         supplier_standing = match["Standing_Charge"]
                         supplier_unit = match["Unit_Rate"]
 
@@ -110,7 +111,6 @@ if st.button("Calculate Pricing"):
                             "Cost per Metre (p/metre)": site["cost_per_metre"]
                         })
                     else:
-                        st.write("No matching tariff found for this AQ/LDZ/Carbon combination.")
                         results.append({
                             "MPRN": site["mprn"],
                             "Site Name": site["site_name"],
@@ -124,7 +124,6 @@ if st.button("Calculate Pricing"):
                             "Cost per Metre (p/metre)": site["cost_per_metre"]
                         })
                 else:
-                    st.write("No LDZ found for this postcode outcode.")
                     results.append({
                         "MPRN": site["mprn"],
                         "Site Name": site["site_name"],
@@ -137,11 +136,21 @@ if st.button("Calculate Pricing"):
                         "Annual Cost (£)": "No LDZ Found",
                         "Cost per Metre (p/metre)": site["cost_per_metre"]
                     })
+                trace.record(
+                    site["site_name"], site["postcode"], outcode, ldz, level, site["aq"], carbon_flag, position,
+                    start_date=contract_start_date,
+                    straddles=level == "outcode" and postcodes.straddles(outcode),
+                )
         results_df = pd.DataFrame(results)
         st.success("Pricing calculation complete.")
         st.dataframe(results_df)
 
-        grand_total = results_df[results_df["Annual Cost (£)"] != "No Match"]["Annual Cost (£)"].sum()
+        # Unpriced sites carry a "No Match" / "No LDZ Found" label instead of a cost
+        grand_total = pd.to_numeric(results_df["Annual Cost (£)"], errors="coerce").sum()
         st.write(f"**Grand Total for all sites: £{round(grand_total,2)}**")
+
+        if len(trace):
+            with st.expander(f"Match trace ({len(trace)} sites)"):
+                st.dataframe(trace.to_frame(), hide_index=True)
     else:
         st.error("Please upload the tariff file first.")
@@ -1,6 +1,13 @@
 import streamlit as st
 import pandas as pd
+import sys
 from datetime import date
+from pathlib import Path
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing.postcodes import resolver
 
 st.set_page_config(layout="wide")
 st.title("Dyce Energy Gas Pricing Tool - Reactive Mode")
@@ -10,8 +17,8 @@ As you enter AQ and postcode, the supplier prices will automatically display.
 Then you can enter uplifts, and the final prices and annual cost will recalculate instantly.
 """)
 
-# Load postcode lookup
-postcode_df = pd.read_csv("Clean_PostCode.csv")
+# Postcode lookup, read once per process and shared across sessions
+postcodes = resolver(Path(__file__).resolve().parent / "Clean_PostCode.csv")
 
 # Upload tariff pricing file
 tariff_file = st.file_uploader("Upload Supplier Tariff File (Excel)", type=["xlsx"])
@@ -58,10 +65,9 @@ for i in range(10):
         cleaned = data["postcode"].replace(" ", "").upper()
         outcode = cleaned[:-3]
 
-        ldz_lookup = postcode_df[postcode_df["Outcode"] == outcode]
+        ldz = postcodes.ldz_for_outcode(outcode)
 
-        if not ldz_lookup.empty:
-            ldz = ldz_lookup.iloc[0]["LDZ"]
+        if ldz is not None:
             band = tariff_df[
                 (tariff_df["Minimum_Annual_Consumption"] <= data["aq"]) &
                 (tariff_df["Maximum_Annual_Consumption"] >= data["aq"]) &
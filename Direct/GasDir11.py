@@ -1,6 +1,17 @@
 import streamlit as st
-import pandas as pd
+import sys
 from datetime import date
+from pathlib import Path
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing.cache import config_key
+from pricing.direct import compare_suppliers, price_sites, site_template
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import memory_caption, read_flat_file, read_flat_files
+from pricing.postcodes import outcode, resolver
+from pricing.tariff_index import date_warning, quote_warning, tariff_index
 
 st.set_page_config(layout="wide")
 st.title("Dyce Energy Gas Pricing Tool - Reactive Mode")
@@ -10,17 +21,25 @@ As you enter AQ and postcode, the supplier prices will automatically display.
 Then you can enter uplifts, and the final prices and annual cost will recalculate instantly.
 """)
 
-# Load postcode lookup
-postcode_df = pd.read_csv("Clean_PostCode.csv")
+# Postcode lookup, read once per process and shared across sessions
+postcodes = resolver(Path(__file__).resolve().parent / "Clean_PostCode.csv")
 
 # Upload tariff pricing file
 tariff_file = st.file_uploader("Upload Supplier Tariff File (Excel)", type=["xlsx"])
 
 if tariff_file:
-    tariff_df = pd.read_excel(tariff_file, sheet_name=0)
+    tariff_df = read_flat_file(tariff_file, schema="gas_direct")
     st.success("Tariff file loaded successfully.")
+    st.caption(memory_caption(tariff_df))
+    # (LDZ, carbon) -> AQ and date window index, built once per tariff file
+    index = tariff_index(tariff_df)
+    if quote_warning(index):
+        st.warning(quote_warning(index))
+    if date_warning(index):
+        st.warning(date_warning(index))
 else:
     tariff_df = None
+    index = None
 
 # Customer details
 st.header("Customer Details")
@@ -29,13 +48,131 @@ contract_start_date = st.date_input("Contract Start Date", value=date.today())
 carbon_offset = st.selectbox("Carbon Offset", ["Standard", "Green"])
 carbon_flag = True if carbon_offset == "Green" else False
 
+site_mode = st.radio(
+    "Site Entry",
+    ["Site grid (up to 10 sites)", "Bulk upload (CSV/Excel)", "Supplier comparison"],
+    horizontal=True,
+)
+
+def read_sites(sites_file):
+    kind = "csv" if sites_file.name.lower().endswith(".csv") else "excel"
+    return read_flat_file(sites_file, kind=kind, schema="direct_sites")
+
+
+if site_mode == "Bulk upload (CSV/Excel)":
+    st.header("Bulk Site Upload")
+    st.download_button(
+        "Download Site List Template",
+        data=site_template(),
+        file_name="site_list_template.csv",
+        mime="text/csv",
+    )
+    sites_file = st.file_uploader("Upload Site List (CSV or Excel)", type=["csv", "xlsx"])
+
+    if sites_file and tariff_df is not None:
+        sites_df = read_sites(sites_file)
+        # Every site is resolved and priced in one vectorised join
+        portfolio = price_sites(sites_df, tariff_df, index, postcodes, carbon_flag, contract_start_date)
+        priced = portfolio["Status"] == "Priced"
+
+        st.write(f"Priced {priced.sum():,} of {len(portfolio):,} sites")
+        if not priced.all():
+            st.warning(portfolio.loc[~priced, "Status"].value_counts().to_dict())
+        st.dataframe(portfolio)
+        st.success(f"Grand Total Annual Cost: £{portfolio.loc[priced, 'Annual_Cost'].sum():,.2f}")
+
+        excel_data = lazy_xlsx(
+            lambda portfolio=portfolio: portfolio,
+            (
+                tariff_df.attrs["content_hash"],
+                sites_df.attrs["content_hash"],
+                config_key(carbon_flag, contract_start_date, date.today()),
+            ),
+            sheet_name="Portfolio",
+        )
+        st.download_button(
+            "Download Priced Portfolio",
+            data=excel_data,
+            file_name=f"{customer_name or 'portfolio'}_pricing.xlsx",
+            mime=XLSX_MIME,
+        )
+    elif sites_file:
+        st.warning("Please upload the tariff file to price the site list.")
+
+    st.stop()
+
+if site_mode == "Supplier comparison":
+    st.header("Supplier Comparison")
+    supplier_files = st.file_uploader(
+        "Upload Supplier Tariff Files to compare (Excel)", type=["xlsx"], accept_multiple_files=True
+    )
+    sites_file = st.file_uploader("Upload Site List (CSV or Excel)", type=["csv", "xlsx"])
+
+    if supplier_files and sites_file:
+        # Files not seen before are parsed side by side in worker processes
+        supplier_dfs = read_flat_files(supplier_files, schema="gas_direct")
+        tariffs = {}
+        for supplier_file, supplier_df in zip(supplier_files, supplier_dfs):
+            stem = name = Path(supplier_file.name).stem
+            n = 1
+            while name in tariffs:
+                n += 1
+                name = f"{stem} ({n})"
+            tariffs[name] = (supplier_df, tariff_index(supplier_df))
+            for warning in (quote_warning(tariffs[name][1]), date_warning(tariffs[name][1])):
+                if warning:
+                    st.warning(f"{name}: {warning}")
+
+        sites_df = read_sites(sites_file)
+        matrix, totals = compare_suppliers(sites_df, tariffs, postcodes, carbon_flag, contract_start_date)
+
+        st.subheader("Portfolio Totals per Supplier")
+        st.dataframe(totals, hide_index=True)
+        best = matrix["Best_Cost"].notna()
+        st.success(
+            f"Best-price portfolio: £{matrix.loc[best, 'Best_Cost'].sum():,.2f} "
+            f"across {best.sum():,} of {len(matrix):,} sites"
+        )
+        st.subheader("Best Price per Site")
+        st.dataframe(matrix)
+
+        excel_data = lazy_xlsx(
+            lambda matrix=matrix: matrix,
+            (
+                tuple(supplier_df.attrs["content_hash"] for supplier_df in supplier_dfs),
+                sites_df.attrs["content_hash"],
+                config_key(list(tariffs), carbon_flag, contract_start_date, date.today()),
+            ),
+            sheet_name="Comparison",
+        )
+        st.download_button(
+            "Download Supplier Comparison",
+            data=excel_data,
+            file_name=f"{customer_name or 'portfolio'}_supplier_comparison.xlsx",
+            mime=XLSX_MIME,
+        )
+
+    st.stop()
+
 # Site data reactive state
 if "site_data" not in st.session_state:
     st.session_state.site_data = [{} for _ in range(10)]
+# Annual cost per site, None until priced; the portfolio total sums these
+if "site_costs" not in st.session_state:
+    st.session_state.site_costs = [None] * 10
 
 st.header("Site Details (Reactive, up to 10 sites)")
+total_slot = st.empty()
 
-for i in range(10):
+
+def show_total():
+    priced = [cost for cost in st.session_state.site_costs if cost is not None]
+    total_slot.markdown(f"**Portfolio Total ({len(priced)} sites priced): £{sum(priced):,.2f}**")
+
+
+@st.fragment
+def site_row(i, tariff_df, index, carbon_flag, contract_start_date):
+    """One site's inputs and prices; editing them reruns only this row."""
     st.markdown(f"**Site {i+1}**")
     cols = st.columns(11)
 
@@ -53,46 +190,32 @@ for i in range(10):
     annual_cost = ""
 
     if data["postcode"] != "" and data["aq"] > 0 and tariff_df is not None:
-        cleaned = data["postcode"].replace(" ", "").upper()
-        outcode = cleaned[:-3]
-
-        ldz_lookup = postcode_df[postcode_df["Outcode"] == outcode]
-
-        if not ldz_lookup.empty:
-            ldz = ldz_lookup.iloc[0]["LDZ"]
-            band = tariff_df[
-                (tariff_df["Minimum_Annual_Consumption"] <= data["aq"]) &
-                (tariff_df["Maximum_Annual_Consumption"] >= data["aq"]) &
-                (tariff_df["Carbon_Offset"] == carbon_flag) &
-                (tariff_df["LDZ"] == ldz)
-            ]
-            if not band.empty:
-                match = band.iloc[0]
+        # Full postcode and sector overrides take precedence over the outcode
+        ldz, level = postcodes.resolve(data["postcode"])
+        if level == "outcode" and postcodes.straddles(outcode(data["postcode"])):
+            st.caption(f"⚠️ {outcode(data['postcode'])} spans more than one LDZ; using {ldz}")
+
+        if ldz is not None:
+            position = index.lookup(ldz, carbon_flag, data["aq"], contract_start_date)
+            if position is not None:
+                match = tariff_df.iloc[position]
                 supplier_standing = match["Standing_Charge"]
                 supplier_unit = match["Unit_Rate"]
-
-                data["supplier_standing"] = supplier_standing
-                data["supplier_unit"] = supplier_unit
             else:
-                data["supplier_standing"] = "No Match"
-                data["supplier_unit"] = "No Match"
+                supplier_standing = "No Match"
+                supplier_unit = "No Match"
         else:
-            data["supplier_standing"] = "No LDZ"
-            data["supplier_unit"] = "No LDZ"
-
-    # display supplier rates (readonly)
-    data["supplier_standing"] = cols[4].text_input(
-        "Supplier Standing (p/day)",
-        value=str(data.get("supplier_standing", "")),
-        disabled=True,
-        key=f"ss_{i}"
-    )
-    data["supplier_unit"] = cols[5].text_input(
-        "Supplier Unit (p/kWh)",
-        value=str(data.get("supplier_unit", "")),
-        disabled=True,
-        key=f"su_{i}"
-    )
+            supplier_standing = "No LDZ"
+            supplier_unit = "No LDZ"
+
+    data["supplier_standing"] = supplier_standing
+    data["supplier_unit"] = supplier_unit
+
+    # display supplier rates (readonly); keyed widgets take their value from session state
+    st.session_state[f"ss_{i}"] = str(supplier_standing)
+    st.session_state[f"su_{i}"] = str(supplier_unit)
+    cols[4].text_input("Supplier Standing (p/day)", disabled=True, key=f"ss_{i}")
+    cols[5].text_input("Supplier Unit (p/kWh)", disabled=True, key=f"su_{i}")
 
     # uplifts
     data["stand_uplift"] = cols[6].number_input(
@@ -117,25 +240,27 @@ for i in range(10):
     )
 
     # final prices
-    if isinstance(data.get("supplier_standing"), (float, int)) and isinstance(data.get("supplier_unit"), (float, int)):
-        final_standing = data["supplier_standing"] + data["stand_uplift"]
-        final_unit = data["supplier_unit"] + data["unit_uplift"]
+    if isinstance(supplier_standing, (float, int)) and isinstance(supplier_unit, (float, int)):
+        final_standing = supplier_standing + data["stand_uplift"]
+        final_unit = supplier_unit + data["unit_uplift"]
         annual_cost = (data["aq"] * final_unit / 100) + (365 * final_standing / 100)
 
-    data["final_standing"] = cols[9].text_input(
-        "Final Standing (p/day)",
-        value=str(round(final_standing, 4)) if final_standing else "",
-        disabled=True,
-        key=f"fs_{i}"
-    )
-    data["final_unit"] = cols[10].text_input(
-        "Final Unit (p/kWh)",
-        value=str(round(final_unit, 4)) if final_unit else "",
-        disabled=True,
-        key=f"fu_{i}"
-    )
+    data["final_standing"] = final_standing
+    data["final_unit"] = final_unit
+    st.session_state[f"fs_{i}"] = str(round(final_standing, 4)) if final_standing != "" else ""
+    st.session_state[f"fu_{i}"] = str(round(final_unit, 4)) if final_unit != "" else ""
+    cols[9].text_input("Final Standing (p/day)", disabled=True, key=f"fs_{i}")
+    cols[10].text_input("Final Unit (p/kWh)", disabled=True, key=f"fu_{i}")
 
     if annual_cost != "":
         st.write(f"Estimated Annual Cost for Site {i+1}: £{round(annual_cost,2)}")
 
+    # Only this site's cost changes, so the total is refreshed from the stored costs
+    st.session_state.site_costs[i] = annual_cost if annual_cost != "" else None
+    show_total()
+
+
+for i in range(10):
+    site_row(i, tariff_df, index, carbon_flag, contract_start_date)
+
 st.success("Reactive pricing is live. Enter AQ + postcode and supplier costs will appear immediately.")
@@ -1,6 +1,13 @@
 import streamlit as st
 import pandas as pd
+import sys
 from datetime import date
+from pathlib import Path
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing.postcodes import resolver
 
 st.set_page_config(layout="wide")
 st.title("Dyce Energy Gas Pricing Tool")
@@ -10,8 +17,8 @@ Upload the weekly gas tariff pricing file, then enter up to 10 sites to calculat
 This version uses a **static Clean_PostCode.csv** for postcode-to-LDZ lookup.
 """)
 
-# Load postcode lookup from static CSV
-postcode_df = pd.read_csv("Clean_PostCode.csv")
+# Postcode lookup, read once per process and shared across sessions
+postcodes = resolver(Path(__file__).resolve().parent / "Clean_PostCode.csv")
 
 # Upload tariff pricing file
 tariff_file = st.file_uploader("Upload Supplier Tariff File (Excel)", type=["xlsx"])
@@ -41,7 +48,7 @@ for i in range(10):
     postcode = cols[3].text_input("Postcode", key=f"pc_{i}")
     stand_uplift = cols[4].number_input("Standing Uplift (p/day)", min_value=0.0, value=0.0, step=0.1, key=f"su_{i}")
     unit_uplift = cols[5].number_input("Unit Uplift (p/kWh)", min_value=0.0, value=0.0, step=0.1, key=f"uu_{i}")
-    cost_per_metre = cols[6].number_input("Cost per Metre (p/metre)", min_value=0.0, value=0.0, key=f\"cpm_{i}\")
+    cost_per_metre = cols[6].number_input("Cost per Metre (p/metre)", min_value=0.0, value=0.0, key=f"cpm_{i}")
 
     site_data.append({
         "mprn": mprn,
@@ -60,10 +67,9 @@ if st.button("Calculate Pricing"):
         for site in site_data:
             if site["mprn"] != "" and site["postcode"] != "":
                 outcode = site["postcode"].split()[0].upper()
-                ldz_lookup = postcode_df[postcode_df["Outcode"] == outcode]
+                ldz = postcodes.ldz_for_outcode(outcode)
 
-                if not ldz_lookup.empty:
-                    ldz = ldz_lookup.iloc[0]["LDZ"]
+                if ldz is not None:
 
                     band = tariff_df[
                         (tariff_df["Minimum_Annual_Consumption"] <= site["aq"]) &
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
-import io
+
+from pricing.cache import config_key
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import cache_caption, read_flat_file
 
 st.set_page_config(page_title="Energy Pricing Uplift Tool", layout="wide")
 st.title("🔹 Energy Pricing Uplift Tool")
@@ -9,14 +12,14 @@ st.title("🔹 Energy Pricing Uplift Tool")
 uploaded_file = st.file_uploader("Upload your pricing CSV file:", type="csv")
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    # Unnamed columns (17–29) are never parsed, see the gas_csv schema
+    df = read_flat_file(uploaded_file, kind="csv", schema="gas_csv")
+    tariff_hash = df.attrs["content_hash"]
+    st.caption(cache_caption())
     df.columns = [col.strip().replace(" ", "").lower() for col in df.columns]
 
     st.success("✅ File loaded successfully")
 
-    # Remove Unnamed columns (17–29)
-    df = df.loc[:, ~df.columns.str.contains('^unnamed')]
-
     st.markdown("---")
     st.subheader("Step 1 – Enter Uplifts (p / kWh and p / day)")
 
@@ -30,29 +33,36 @@ if uploaded_file:
         {"Min": 293000, "Max": 731999},
     ]
 
-    band_inputs = []
-    with st.expander("Edit uplift bands", expanded=True):
-        for i, band in enumerate(default_bands):
-            st.markdown(f"**Band {i+1}: {band['Min']} - {band['Max']} kWh**")
-            cols = st.columns(6)
-            entry = {
-                "Min": band["Min"],
-                "Max": band["Max"],
-                "1yr_unit_noncarbon": cols[0].number_input(f"1yr Unit (NC)", value=1.0, key=f"1u_nc_{i}"),
-                "1yr_standing_noncarbon": cols[1].number_input(f"1yr Stand (NC)", value=1.0, key=f"1s_nc_{i}"),
-                "2yr_unit_noncarbon": cols[2].number_input(f"2yr Unit (NC)", value=1.0, key=f"2u_nc_{i}"),
-                "2yr_standing_noncarbon": cols[3].number_input(f"2yr Stand (NC)", value=1.0, key=f"2s_nc_{i}"),
-                "3yr_unit_noncarbon": cols[4].number_input(f"3yr Unit (NC)", value=1.0, key=f"3u_nc_{i}"),
-                "3yr_standing_noncarbon": cols[5].number_input(f"3yr Stand (NC)", value=1.0, key=f"3s_nc_{i}")
-            }
-            entry["1yr_unit_carbon"] = cols[0].number_input(f"1yr Unit (C)", value=1.5, key=f"1u_c_{i}")
-            entry["1yr_standing_carbon"] = cols[1].number_input(f"1yr Stand (C)", value=1.5, key=f"1s_c_{i}")
-            entry["2yr_unit_carbon"] = cols[2].number_input(f"2yr Unit (C)", value=1.5, key=f"2u_c_{i}")
-            entry["2yr_standing_carbon"] = cols[3].number_input(f"2yr Stand (C)", value=1.5, key=f"2s_c_{i}")
-            entry["3yr_unit_carbon"] = cols[4].number_input(f"3yr Unit (C)", value=1.5, key=f"3u_c_{i}")
-            entry["3yr_standing_carbon"] = cols[5].number_input(f"3yr Stand (C)", value=1.5, key=f"3s_c_{i}")
-
-            band_inputs.append(entry)
+    # One editor row per band; non-carbon uplifts default to 1.0, carbon to 1.5
+    uplift_columns = {}
+    for carbon, tag, default in (("noncarbon", "NC", 1.0), ("carbon", "C", 1.5)):
+        for years in (1, 2, 3):
+            for kind, label in (("unit", "Unit"), ("standing", "Stand")):
+                uplift_columns[f"{years}yr_{kind}_{carbon}"] = (f"{years}yr {label} ({tag})", default)
+
+    default_table = pd.DataFrame([
+        {"Min": band["Min"], "Max": band["Max"], **{name: default for name, (_, default) in uplift_columns.items()}}
+        for band in default_bands
+    ])
+
+    # Edits are held in the form until applied, so pricing runs once per change set
+    with st.form("uplift_form"):
+        band_table = st.data_editor(
+            default_table,
+            column_config={
+                "Min": st.column_config.NumberColumn("Min (kWh)"),
+                "Max": st.column_config.NumberColumn("Max (kWh)"),
+                **{name: st.column_config.NumberColumn(label) for name, (label, _) in uplift_columns.items()},
+            },
+            disabled=["Min", "Max"],
+            hide_index=True,
+            num_rows="fixed",
+            key="uplift_table",
+        )
+        st.form_submit_button("Apply Uplifts")
+
+    # Cleared cells count as no uplift
+    band_inputs = band_table.fillna(0.0).to_dict("records")
 
     annual_consumption = st.number_input("Annual Consumption (kWh)", min_value=1, value=20000)
 
@@ -106,13 +116,15 @@ if uploaded_file:
     st.subheader("✅ Price List Preview")
     st.dataframe(df_final.head())
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df_final.to_excel(writer, index=False, sheet_name="PriceList")
+    # Excel output, only built when the download is clicked and memoised per configuration
+    excel_data = lazy_xlsx(
+        lambda df_final=df_final: df_final,
+        (tariff_hash, config_key(band_inputs, annual_consumption)),
+    )
 
     st.download_button(
         "⬇️ Download Broker Price List (Excel)",
-        data=output.getvalue(),
+        data=excel_data,
         file_name="broker_pricelist.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=XLSX_MIME
     )
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
-import io
+
+from pricing.cache import config_key
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import cache_caption, read_flat_file
 
 st.set_page_config(page_title="Gas Pricing Uplift Tool", layout="wide")
 st.title("🔹 Gas Pricing Uplift Tool")
@@ -8,7 +11,9 @@ st.title("🔹 Gas Pricing Uplift Tool")
 uploaded_file = st.file_uploader("Upload your pricing XLSX file:", type="xlsx")
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    df = read_flat_file(uploaded_file)
+    tariff_hash = df.attrs["content_hash"]
+    st.caption(cache_caption())
 
     df.columns = [col.strip().replace(" ", "_").lower() for col in df.columns]
 
@@ -111,14 +116,15 @@ if uploaded_file:
     st.subheader("✅ Price List Preview")
     st.dataframe(output_df.head())
 
-    # Prepare Excel
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        output_df.to_excel(writer, index=False, sheet_name="PriceList")
+    # Excel output, only built when the download is clicked and memoised per configuration
+    excel_data = lazy_xlsx(
+        lambda output_df=output_df: output_df,
+        (tariff_hash, config_key(band_inputs, annual_consumption)),
+    )
 
     st.download_button(
         "⬇️ Download Broker Price List",
-        data=output.getvalue(),
+        data=excel_data,
         file_name="broker_pricelist.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=XLSX_MIME
     )
@@ -1,5 +1,7 @@
 import streamlit as st
-import pandas as pd
+
+from pricing.export import XLSX_MIME, xlsx_bytes
+from pricing.ingest import cache_caption, read_flat_file
 
 st.set_page_config(page_title="Gas Pricing Uplift Tool", layout="wide")
 
@@ -9,10 +11,9 @@ st.title("📈 Gas Pricing Uplift Tool")
 uploaded_file = st.file_uploader("Upload your pricing Excel file (.xlsx):", type=["xlsx"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-
-    # Exclude unwanted credit score columns
-    df = df.drop(columns=["Minimum_Credit_Score", "Maximum_Credit_Score"], errors="ignore")
+    # Only the price list columns are parsed, credit score columns never load
+    df = read_flat_file(uploaded_file, schema="gas_price_list")
+    st.caption(cache_caption())
 
     # Show preview
     st.subheader("📋 File Preview")
@@ -93,16 +94,15 @@ if uploaded_file:
         # Download link
         @st.cache_data
         def convert_df_to_excel(df):
-            from io import BytesIO
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False, sheet_name="Price List")
-            return output.getvalue()
+            return xlsx_bytes(df, sheet_name="Price List", column_formats={
+                "Standing Charge (pence/day)": "0.0000",
+                "Unit Rate (p/kWh)": "0.0000",
+            })
 
         excel_data = convert_df_to_excel(output_df)
         st.download_button(
             label="⬇️ Download Price List as Excel",
             data=excel_data,
             file_name="uplifted_price_list.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
         )
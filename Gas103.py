@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-import io
+
+from pricing.cache import config_key
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import cache_caption, read_flat_file
+from pricing.price_list import PRICE_LIST_FORMATS
 
 st.set_page_config(page_title="Gas Pricing Uplift Tool", layout="wide")
 st.title("🔹 Gas Pricing Uplift Tool")
@@ -9,11 +13,10 @@ st.title("🔹 Gas Pricing Uplift Tool")
 uploaded_file = st.file_uploader("Upload your pricing XLSX file:", type="xlsx")
 
 if uploaded_file:
-    # Read Excel
-    df = pd.read_excel(uploaded_file)
-
-    # Drop unwanted credit score columns if they exist
-    df = df.drop(columns=[col for col in ["Minimum_Credit_Score", "Maximum_Credit_Score"] if col in df.columns])
+    # Read Excel (price list columns only, credit score columns are never parsed)
+    df = read_flat_file(uploaded_file, schema="gas_price_list")
+    tariff_hash = df.attrs["content_hash"]
+    st.caption(cache_caption())
 
     # Show preview
     st.subheader("File Preview")
@@ -120,14 +123,16 @@ if uploaded_file:
     st.subheader("✅ Price List Preview")
     st.dataframe(df_final[columns_to_keep].head())
 
-    # Excel output
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df_final[columns_to_keep].to_excel(writer, index=False, sheet_name="PriceList")
+    # Excel output, only built when the download is clicked and memoised per configuration
+    excel_data = lazy_xlsx(
+        lambda df_final=df_final: df_final[columns_to_keep],
+        (tariff_hash, config_key(band_inputs)),
+        column_formats=PRICE_LIST_FORMATS,
+    )
 
     st.download_button(
         "⬇️ Download Broker Price List",
-        data=output.getvalue(),
+        data=excel_data,
         file_name="broker_pricelist.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=XLSX_MIME
     )
@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
-import io
+
+from pricing.cache import config_key
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import cache_caption, read_flat_file
+from pricing.price_list import PRICE_LIST_FORMATS
+from pricing.uplifts import IncrementalPricer
 
 st.set_page_config(page_title="Gas Pricing Uplift Tool", layout="wide")
 st.title("🔹 Gas Pricing Uplift Tool")
@@ -9,11 +13,10 @@ st.title("🔹 Gas Pricing Uplift Tool")
 uploaded_file = st.file_uploader("Upload your pricing XLSX file:", type="xlsx")
 
 if uploaded_file:
-    # Read Excel
-    df = pd.read_excel(uploaded_file)
-
-    # Drop unwanted credit score columns if present
-    df = df.drop(columns=[col for col in ["Minimum_Credit_Score", "Maximum_Credit_Score"] if col in df.columns])
+    # Read Excel (price list columns only, credit score columns are never parsed)
+    df = read_flat_file(uploaded_file, schema="gas_price_list")
+    tariff_hash = df.attrs["content_hash"]
+    st.caption(cache_caption())
 
     # Show preview
     st.subheader("File Preview")
@@ -66,58 +69,29 @@ if uploaded_file:
             }
             band_inputs.append(entry)
 
-    # Compute uplift logic
-    def get_band_uplift(row):
-        consumption = row.get("Minimum_Annual_Consumption", 0)
-        contract_duration = str(row.get("Contract_Duration", "")).strip().lower()
-        # Match duration label to dropdown text
-        duration_label = (
-            "1 Year" if "1" in contract_duration else
-            "2 Year" if "2" in contract_duration else
-            "3 Year"
-        )
-
-        # Find matching band and duration
-        band = next(
-            (
-                b for b in band_inputs
-                if b["Min"] <= consumption <= b["Max"]
-                and b["Duration"] == duration_label
-            ),
-            None
-        )
-
-        if band is None:
-            return pd.Series({"Uplift_Unit": 0.0, "Uplift_Standing": 0.0})
-
-        carbon_raw = str(row.get("Carbon_Offset", "")).strip().lower()
-        carbon = carbon_raw in ["y", "yes", "true", "1"]
-
-        if carbon:
-            unit_uplift = band["Carbon_Unit"]
-            standing_uplift = band["Carbon_Standing"]
-        else:
-            unit_uplift = band["Standard_Unit"]
-            standing_uplift = band["Standard_Standing"]
-
-        return pd.Series({
-            "Uplift_Unit": unit_uplift,
-            "Uplift_Standing": standing_uplift
-        })
-
-    uplift_df = df.apply(get_band_uplift, axis=1)
-    df_final = pd.concat([df, uplift_df], axis=1)
-
-    # Compute uplifted rates
-    df_final["Unit Rate"] = df_final["Unit_Rate"] + df_final["Uplift_Unit"]
-    # Convert standing charge to pence (e.g., £1.05 → 105p)
-    df_final["Standing Charge"] = df_final["Standing_Charge"] * 100 + df_final["Uplift_Standing"]
-
-    # Compute total annual cost
-    df_final["Total Annual Cost (£)"] = (
-        (df_final["Standing Charge"] * 365) +
-        (df_final["Unit Rate"] * df_final["Minimum_Annual_Consumption"])
-    ) / 100
+    # Compute uplifted rates for the given row positions
+    def price_rows(df_final, rows):
+        priced = df_final.loc[rows]
+        unit_rate = priced["Unit_Rate"] + priced["Uplift_Unit"]
+        # Convert standing charge to pence (e.g., £1.05 → 105p)
+        standing_charge = priced["Standing_Charge"] * 100 + priced["Uplift_Standing"]
+        df_final.loc[rows, "Unit Rate"] = unit_rate
+        df_final.loc[rows, "Standing Charge"] = standing_charge
+
+        # Compute total annual cost
+        df_final.loc[rows, "Total Annual Cost (£)"] = (
+            (standing_charge * 365) +
+            (unit_rate * priced["Minimum_Annual_Consumption"])
+        ) / 100
+
+    # Rows only take a band's uplift when its duration matches the band dropdown.
+    # The priced file is kept between reruns so an uplift edit only reprices its band.
+    pricer = st.session_state.get("pricer")
+    if pricer is None or pricer.tariff_hash != tariff_hash:
+        pricer = IncrementalPricer(df, price_rows, duration_col="Contract_Duration", fallback_last=False)
+        st.session_state.pricer = pricer
+    df_final = pricer.price(band_inputs)
+    st.caption(f"Repriced {pricer.last_rows_priced:,} of {len(df_final):,} rows")
 
     # Columns for output
     columns_to_keep = [
@@ -145,14 +119,19 @@ if uploaded_file:
     st.subheader("✅ Price List Preview")
     st.dataframe(df_final[columns_to_keep].head())
 
-    # Excel output
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df_final[columns_to_keep].to_excel(writer, index=False, sheet_name="PriceList")
+    # Excel output, only built when the download is clicked and memoised per
+    # configuration; the pricer reprices df_final in place on later reruns,
+    # so the download builds from a copy of this run's prices
+    export_df = df_final[columns_to_keep].copy()
+    excel_data = lazy_xlsx(
+        lambda: export_df,
+        (tariff_hash, config_key(band_inputs)),
+        column_formats=PRICE_LIST_FORMATS,
+    )
 
     st.download_button(
         "⬇️ Download Broker Price List",
-        data=output.getvalue(),
+        data=excel_data,
         file_name="broker_pricelist.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=XLSX_MIME
     )
@@ -2,13 +2,18 @@ import streamlit as st
 import pandas as pd
 import io
 
+from pricing.cache import config_key
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.hh import cost_profiles, profile_template, profile_usage
+from pricing.ingest import read_flat_file
+
 st.title("NHH Pricing Calculator")
 
 # Upload file each time
 uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    df = read_flat_file(uploaded_file, schema="nhh")
 
     # Show the first few rows to confirm
     st.write("Flat file loaded successfully. Preview:")
@@ -32,6 +37,61 @@ if uploaded_file is not None:
     uplift_night = st.number_input("Night Rate Uplift (p/kWh)", value=0.0, step=0.1)
     uplift_evw = st.number_input("Evening & Weekend Uplift (p/kWh)", value=0.0, step=0.1)
 
+    consumption_source = st.radio(
+        "Consumption Source",
+        ["Percentage split of EAC", "Half-hourly profile upload"]
+    )
+
+    if consumption_source == "Half-hourly profile upload":
+        st.subheader("Half-Hourly Profiles")
+        st.download_button(
+            "Download Profile Template",
+            data=profile_template(),
+            file_name="hh_profile_template.csv",
+            mime="text/csv",
+        )
+        profile_file = st.file_uploader("Upload Half-Hourly Consumption (CSV or Excel)", type=["csv", "xlsx"])
+
+        if profile_file:
+            kind = "csv" if profile_file.name.lower().endswith(".csv") else "excel"
+            profile = read_flat_file(profile_file, kind=kind, schema="hh_profile")
+
+            # Bucketing a profile into Day/Night/EVW is the slow part, so keep it between reruns
+            usage = st.session_state.get("hh_usage")
+            if usage is None or usage.attrs.get("content_hash") != profile.attrs["content_hash"]:
+                usage = profile_usage(profile)
+                usage.attrs["content_hash"] = profile.attrs["content_hash"]
+                st.session_state.hh_usage = usage
+
+            uplifts = {
+                "uplift_standing": uplift_standing,
+                "uplift_day": uplift_day,
+                "uplift_night": uplift_night,
+                "uplift_evw": uplift_evw,
+            }
+            costed = cost_profiles(usage, df, contract_duration, uplifts)
+            priced = costed["Status"] == "Priced"
+
+            st.write(f"Costed {priced.sum():,} of {len(costed):,} meters")
+            if not priced.all():
+                st.warning("No matching tariff found for some meters' EAC and contract duration.")
+            st.dataframe(costed)
+            st.success(f"Total Cost: £{costed.loc[priced, 'Total Cost (£)'].sum():,.2f}")
+
+            excel_data = lazy_xlsx(
+                lambda costed=costed: costed,
+                (df.attrs["content_hash"], profile.attrs["content_hash"], config_key(contract_duration, uplifts)),
+                sheet_name="HH Costs",
+            )
+            st.download_button(
+                "Download Meter Costs",
+                data=excel_data,
+                file_name="hh_meter_costs.xlsx",
+                mime=XLSX_MIME,
+            )
+
+        st.stop()
+
     st.subheader("Consumption Split (%)")
     day_pct = st.slider("Day %", 0, 100, 70)
     night_pct = st.slider("Night %", 0, 100, 20)
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import io
 
+from pricing.ingest import read_flat_file
+from pricing.nhh import BANDS, book_sheets, full_price_book, price_book
+
 # Make app full-width
 st.set_page_config(layout="wide")
 
@@ -11,41 +14,34 @@ st.title("NHH Pricing Tool")
 uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    df = read_flat_file(uploaded_file, schema="nhh")
 
     st.write("Flat file loaded successfully. Preview:")
     st.dataframe(df.head())
 
-    # Standard or Green selection
-    green_option = st.selectbox(
-        "Select Tariff Type:",
-        options=["Standard", "Green"]
-    )
+    # Every duration and tariff type in one workbook, or a single sheet
+    full_book = st.checkbox("Full price book (all contract durations, Standard and Green)")
 
-    # Contract duration selection
-    contract_duration = st.selectbox(
-        "Select Contract Duration (Months):",
-        options=[12, 24, 36]
-    )
+    if not full_book:
+        # Standard or Green selection
+        green_option = st.selectbox(
+            "Select Tariff Type:",
+            options=["Standard", "Green"]
+        )
 
-    st.subheader("Uplifts per Consumption Band")
+        # Contract duration selection
+        contract_duration = st.selectbox(
+            "Select Contract Duration (Months):",
+            options=[12, 24, 36]
+        )
 
-    # Define bandings
-    bands = [
-        (1000, 3000),
-        (3001, 12500),
-        (12501, 26000),
-        (26001, 100000),
-        (100001, 175000),
-        (175001, 225000),
-        (225001, 300000)
-    ]
+    st.subheader("Uplifts per Consumption Band")
 
     # Prepare storage for uplifts
     uplift_inputs = []
 
     # Dynamic grid inputs
-    for idx, (min_val, max_val) in enumerate(bands):
+    for idx, (min_val, max_val) in enumerate(BANDS):
         st.markdown(f"**Band {idx+1}: {min_val:,} – {max_val:,} kWh**")
         cols = st.columns(4)
         uplift_standing = cols[0].number_input(
@@ -73,47 +69,21 @@ if uploaded_file is not None:
     report_title = st.text_input("Enter Report Filename (without .xlsx):", value="nhh_price_book")
 
     if st.button("Generate Excel Price Book"):
-        output_rows = []
-
-        for band in uplift_inputs:
-            # Filter matching rows
-            filtered = df[
-                (df["Minimum_Annual_Consumption"] <= band["max"]) &
-                (df["Maximum_Annual_Consumption"] >= band["min"]) &
-                (df["Contract_Duration"] == contract_duration) &
-                (
-                    (df["Green_Energy"].str.upper() == "YES") if green_option == "Green" else
-                    (df["Green_Energy"].str.upper() == "NO")
-                )
-            ]
-
-            if filtered.empty:
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": "N/A",
-                    "Day Rate (p/kWh)": "N/A",
-                    "Night Rate (p/kWh)": "N/A",
-                    "Evening & Weekend Rate (p/kWh)": "N/A"
-                })
-            else:
-                row = filtered.iloc[0]
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": row["Standing_Charge"] + band["uplift_standing"],
-                    "Day Rate (p/kWh)": row["Day_Rate"] + band["uplift_day"],
-                    "Night Rate (p/kWh)": row["Night_Rate"] + band["uplift_night"],
-                    "Evening & Weekend Rate (p/kWh)": row["Evening_And_Weekend_Rate"] + band["uplift_evw"]
-                })
-
-        # Prepare DataFrame
-        result_df = pd.DataFrame(output_rows)
+        # All bands resolved against the tariff in one interval join
+        if full_book:
+            result_df = full_price_book(df, uplift_inputs)
+            sheets = book_sheets(result_df)
+        else:
+            result_df = price_book(df, uplift_inputs, contract_duration, green_option == "Green")
+            sheets = {"Price Book": result_df}
 
         st.success("Excel file prepared. Preview:")
         st.dataframe(result_df)
 
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            result_df.to_excel(writer, index=False, sheet_name="Price Book")
+            for sheet_name, sheet_df in sheets.items():
+                sheet_df.to_excel(writer, index=False, sheet_name=sheet_name)
 
         processed_data = output.getvalue()
 
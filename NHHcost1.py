@@ -2,18 +2,27 @@ import streamlit as st
 import pandas as pd
 import io
 
+from pricing.cache import config_key
+from pricing.cost_stack import apply_cost_stack, cost_stacked_tariff
+from pricing.export import XLSX_MIME, lazy_xlsx
+from pricing.ingest import read_flat_file
+from pricing.nhh import BANDS, band_usage, book_sheets, customer_template, full_price_book, price_book
+
 st.set_page_config(layout="wide")
 st.title("NHH Pricing Tool with Cost Stack")
 
 uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    df = read_flat_file(uploaded_file, schema="nhh")
     st.write("Flat file loaded successfully. Preview:")
     st.dataframe(df.head())
 
-    green_option = st.selectbox("Select Tariff Type:", options=["Standard", "Green"])
-    contract_duration = st.selectbox("Select Contract Duration (Months):", options=[12, 24, 36])
+    # Every duration and tariff type in one workbook, or a single sheet
+    full_book = st.checkbox("Full price book (all contract durations, Standard and Green)")
+    if not full_book:
+        green_option = st.selectbox("Select Tariff Type:", options=["Standard", "Green"])
+        contract_duration = st.selectbox("Select Contract Duration (Months):", options=[12, 24, 36])
 
     st.subheader("Cost Stack Inputs")
     bad_debt = st.number_input("Bad Debt Provision (p/kWh)", value=0.0, step=0.1)
@@ -21,20 +30,31 @@ if uploaded_file is not None:
     customer_service = st.number_input("Customer Service Cost (p/day)", value=0.0, step=0.1)
     regulatory_cost = st.number_input("Regulatory/Admin Cost (p/day)", value=0.0, step=0.1)
     margin = st.number_input("Margin (p/kWh)", value=0.0, step=0.1)
+    costs = {
+        "bad_debt": bad_debt,
+        "billing_cost": billing_cost,
+        "customer_service": customer_service,
+        "regulatory_cost": regulatory_cost,
+        "margin": margin,
+    }
+
+    # Cost-stacked rates for every product row, recomputed as soon as a cost input changes
+    published = cost_stacked_tariff(df, costs)
+    st.caption(f"Cost stack applied to all {len(published):,} tariff rows")
+    st.download_button(
+        "Download Cost-Stacked Tariff",
+        data=lazy_xlsx(
+            lambda published=published: published,
+            (df.attrs["content_hash"], config_key(costs)),
+            sheet_name="Cost Stacked Tariff",
+        ),
+        file_name="nhh_cost_stacked_tariff.xlsx",
+        mime=XLSX_MIME,
+    )
 
     st.subheader("Uplifts per Consumption Band")
-    bands = [
-        (1000, 3000),
-        (3001, 12500),
-        (12501, 26000),
-        (26001, 100000),
-        (100001, 175000),
-        (175001, 225000),
-        (225001, 300000)
-    ]
-
     uplift_inputs = []
-    for idx, (min_val, max_val) in enumerate(bands):
+    for idx, (min_val, max_val) in enumerate(BANDS):
         st.markdown(f"**Band {idx+1}: {min_val:,} – {max_val:,} kWh**")
         cols = st.columns(4)
         uplift_standing = cols[0].number_input(
@@ -54,62 +74,46 @@ if uploaded_file is not None:
             "uplift_evw": uplift_evw
         })
 
+    st.subheader("Customer Distribution")
+    st.download_button(
+        "Download Customer Distribution Template",
+        data=customer_template(),
+        file_name="customer_distribution_template.csv",
+        mime="text/csv",
+    )
+    customers_file = st.file_uploader(
+        "Upload Customer EACs and Rate Splits (CSV or Excel, optional)", type=["csv", "xlsx"]
+    )
+    bands = pd.DataFrame(uplift_inputs)
+    if customers_file:
+        kind = "csv" if customers_file.name.lower().endswith(".csv") else "excel"
+        customers = read_flat_file(customers_file, kind=kind, schema="nhh_customers")
+        # Annual cost per band is the mean over the customers whose EAC falls in it
+        bands = bands.join(band_usage(customers, bands))
+        st.caption(f"Annual costs weighted over {bands['Customers'].sum():,.0f} customers")
+    else:
+        st.caption("Annual costs estimated at mid-band consumption on the day rate")
+
     report_title = st.text_input("Enter Report Filename (without .xlsx):", value="nhh_price_book")
 
     if st.button("Generate Excel Price Book"):
-        output_rows = []
-
-        for band in uplift_inputs:
-            filtered = df[
-                (df["Minimum_Annual_Consumption"] <= band["max"]) &
-                (df["Maximum_Annual_Consumption"] >= band["min"]) &
-                (df["Contract_Duration"] == contract_duration) &
-                ((df["Green_Energy"].str.upper() == "YES") if green_option == "Green" else (df["Green_Energy"].str.upper() == "NO"))
-            ]
-
-            if filtered.empty:
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": "N/A",
-                    "Day Rate (p/kWh)": "N/A",
-                    "Night Rate (p/kWh)": "N/A",
-                    "Evening & Weekend Rate (p/kWh)": "N/A",
-                    "Total Annual Cost (£)": "N/A"
-                })
-            else:
-                row = filtered.iloc[0]
-
-                base_standing = row["Standing_Charge"] + billing_cost + customer_service + regulatory_cost
-                base_day = row["Day_Rate"] + bad_debt + margin
-                base_night = row["Night_Rate"] + bad_debt + margin
-                base_evw = row["Evening_And_Weekend_Rate"] + bad_debt + margin
-
-                final_standing = base_standing + band["uplift_standing"]
-                final_day = base_day + band["uplift_day"]
-                final_night = base_night + band["uplift_night"]
-                final_evw = base_evw + band["uplift_evw"]
-
-                # estimate total annual cost based on midband consumption
-                mid_consumption = (band['min'] + band['max']) / 2
-                annual_cost = (mid_consumption * final_day / 100) + (365 * final_standing / 100)
-
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": round(final_standing, 4),
-                    "Day Rate (p/kWh)": round(final_day, 4),
-                    "Night Rate (p/kWh)": round(final_night, 4),
-                    "Evening & Weekend Rate (p/kWh)": round(final_evw, 4),
-                    "Total Annual Cost (£)": round(annual_cost, 2)
-                })
-
-        result_df = pd.DataFrame(output_rows)
+        stacked = apply_cost_stack(df, costs)
+
+        # All bands resolved against the tariff in one interval join
+        if full_book:
+            result_df = full_price_book(stacked, bands, annual_cost=True)
+            sheets = book_sheets(result_df)
+        else:
+            result_df = price_book(stacked, bands, contract_duration, green_option == "Green", annual_cost=True)
+            sheets = {"Price Book": result_df}
 
         st.success("Excel file prepared. Preview:")
         st.dataframe(result_df)
 
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            result_df.to_excel(writer, index=False, sheet_name="Price Book")
+            for sheet_name, sheet_df in sheets.items():
+                sheet_df.to_excel(writer, index=False, sheet_name=sheet_name)
 
         processed_data = output.getvalue()
 
@@ -0,0 +1,91 @@
+"""Headless Gas105 price lists for a batch of supplier flat files.
+
+    python batch_price.py --config uplifts.json flat_files/*.xlsx --output-dir price_lists
+    python batch_price.py --manifest weekly.csv --workers 8
+
+With --config every flat file is priced with the same uplifts. A manifest
+is a CSV with flat_file and config columns (and optionally output) for one
+broker per row. Files are priced in parallel across a process pool and
+each price list is streamed straight to disk.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from pricing.export import write_xlsx
+from pricing.ingest import read_flat_file
+from pricing.price_list import PRICE_LIST_FORMATS, load_band_inputs, price_list
+
+
+def price_file(flat_file, config, output):
+    start = time.perf_counter()
+    kind = "csv" if Path(flat_file).suffix.lower() == ".csv" else "excel"
+    df = read_flat_file(Path(flat_file).read_bytes(), kind=kind, schema="gas_price_list")
+    result = price_list(df, load_band_inputs(config))
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    write_xlsx(result, output, sheet_name="PriceList", column_formats=PRICE_LIST_FORMATS)
+    return len(result), time.perf_counter() - start
+
+
+def jobs_from_args(args):
+    if args.manifest:
+        with open(args.manifest, newline="") as f:
+            rows = list(csv.DictReader(f))
+        base = Path(args.manifest).parent
+        return [
+            (
+                base / row["flat_file"],
+                base / row["config"],
+                base / row["output"] if row.get("output") else
+                args.output_dir / f"{Path(row['flat_file']).stem}_pricelist.xlsx",
+            )
+            for row in rows
+        ]
+    return [
+        (Path(flat_file), args.config, args.output_dir / f"{Path(flat_file).stem}_pricelist.xlsx")
+        for flat_file in args.flat_files
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("flat_files", nargs="*", help="supplier flat files (.xlsx or .csv)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--config", type=Path, help="JSON uplift configuration for every flat file")
+    source.add_argument("--manifest", type=Path, help="CSV of flat_file,config[,output] jobs")
+    parser.add_argument("--output-dir", type=Path, default=Path("price_lists"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    if args.config and not args.flat_files:
+        parser.error("--config needs at least one flat file")
+    if args.manifest and args.flat_files:
+        parser.error("--manifest takes its flat files from the manifest, not the command line")
+
+    jobs = jobs_from_args(args)
+    failures = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(price_file, *job): job for job in jobs}
+        for future in as_completed(futures):
+            flat_file, _, output = futures[future]
+            try:
+                rows, seconds = future.result()
+            except Exception as exc:
+                failures += 1
+                print(f"FAILED {flat_file}: {exc}", file=sys.stderr)
+            else:
+                print(f"{flat_file} -> {output} ({rows:,} rows, {seconds:.1f}s)")
+
+    print(f"{len(jobs) - failures}/{len(jobs)} price lists in {time.perf_counter() - start:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Time the Gas10x pricing pipeline on synthetic flat files.
+
+    python -m benchmarks.run --rows 10000 200000
+    python -m benchmarks.run --rows 10000 200000 --save-baseline
+    python -m benchmarks.run --rows 2000000 --stages uplift cost --no-memory
+
+Each stage reports wall time, throughput and peak Python/NumPy memory
+(measured in a second, traced run of the stage). The read stages go
+through pricing.ingest.read_flat_file as the apps do, against a throwaway
+tariff store: "read" is a file's first upload (full parse and snapshot),
+"reread" a new process reading the same file (snapshot reload; Excel
+only) and "cached" a repeat upload served from the frame cache.
+With a stored baseline, stages slower than baseline by more than the
+tolerance (and by more than a small absolute slack) are flagged and the run exits with status 1.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import band_inputs, flat_file
+from pricing import tariff_store
+from pricing.export import XLSX_MAX_ROWS, xlsx_bytes
+from pricing.ingest import frame_cache, read_flat_file
+from pricing.price_list import PRICE_LIST_COLUMNS, price_rows
+from pricing.uplifts import band_uplifts
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+STAGES = ["read", "reread", "cached", "uplift", "cost", "export"]
+READ_STAGES = ["read", "reread", "cached"]
+
+
+def measure(func, memory=True):
+    """Wall time of an untraced call, then peak traced memory of a second call.
+
+    tracemalloc slows Python-heavy stages such as openpyxl parsing several
+    times over, so timings never come from the traced run.
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+
+    peak = float("nan")
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def read_stages(data, kind, stages, memory=True):
+    """Time read_flat_file cold, from the tariff store and from the frame cache."""
+    def read():
+        return read_flat_file(data, kind=kind, schema="gas_price_list")
+
+    def cold():
+        frame_cache.clear()
+        for snapshot in tariff_store.STORE_DIR.glob("*.arrow"):
+            snapshot.unlink()
+        return read()
+
+    def reread():
+        frame_cache.clear()
+        return read()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as store:
+        default_store, tariff_store.STORE_DIR = tariff_store.STORE_DIR, Path(store)
+        try:
+            # Each stage leaves the snapshot and cached frame the next one reads
+            _, seconds, peak = measure(cold, memory)
+            if "read" in stages:
+                results["read"] = (seconds, peak)
+            if "reread" in stages and kind == "excel":
+                _, seconds, peak = measure(reread, memory)
+                results["reread"] = (seconds, peak)
+            if "cached" in stages:
+                _, seconds, peak = measure(read, memory)
+                results["cached"] = (seconds, peak)
+        finally:
+            tariff_store.STORE_DIR = default_store
+            frame_cache.clear()
+    return results
+
+
+def run_size(rows, stages, memory=True, seed=0):
+    df = flat_file(rows, seed)
+    bands = band_inputs(seed)
+    results = {}
+
+    if any(stage in stages for stage in READ_STAGES):
+        # Excel can't hold more rows than this, larger files are supplied as CSV
+        if rows < XLSX_MAX_ROWS:
+            data, kind = xlsx_bytes(df), "excel"
+        else:
+            data, kind = df.to_csv(index=False).encode(), "csv"
+        results.update(read_stages(data, kind, stages, memory))
+
+    if "uplift" in stages or "cost" in stages or "export" in stages:
+        uplifts, seconds, peak = measure(lambda: band_uplifts(df, bands), memory)
+        df[["Uplift_Unit", "Uplift_Standing"]] = uplifts
+        if "uplift" in stages:
+            results["uplift"] = (seconds, peak)
+
+    if "cost" in stages or "export" in stages:
+        _, seconds, peak = measure(lambda: price_rows(df, df.index), memory)
+        if "cost" in stages:
+            results["cost"] = (seconds, peak)
+
+    if "export" in stages and rows < XLSX_MAX_ROWS:
+        _, seconds, peak = measure(lambda: xlsx_bytes(df[PRICE_LIST_COLUMNS]), memory)
+        results["export"] = (seconds, peak)
+
+    return {
+        stage: {"seconds": seconds, "rows_per_s": rows / seconds, "peak_mb": peak}
+        for stage, (seconds, peak) in results.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak memory pass")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging, 0.25 = 25%%")
+    parser.add_argument("--slack", type=float, default=0.05,
+                        help="seconds of slowdown always tolerated, so millisecond stages don't flap")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    report = {}
+    regressions = 0
+
+    print(f"{'rows':>10} {'stage':<7} {'seconds':>9} {'rows/s':>12} {'peak MB':>9}  vs baseline")
+    for rows in args.rows:
+        report[str(rows)] = run_size(rows, args.stages, memory=not args.no_memory)
+        for stage, result in report[str(rows)].items():
+            base = baseline.get(str(rows), {}).get(stage)
+            note = ""
+            if base:
+                change = result["seconds"] / base["seconds"] - 1
+                note = f"{change:+.0%}"
+                if change > args.tolerance and result["seconds"] - base["seconds"] > args.slack:
+                    note += "  REGRESSION"
+                    regressions += 1
+            print(
+                f"{rows:>10,} {stage:<7} {result['seconds']:>9.3f} "
+                f"{result['rows_per_s']:>12,.0f} {result['peak_mb']:>9.1f}  {note}"
+            )
+
+    if args.save_baseline:
+        baseline.update(report)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
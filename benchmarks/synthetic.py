@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+POSTCODE_FILE = Path(__file__).resolve().parent.parent / "Clean_PostCode.csv"
+
+# AQ bands used by the Gas10x uplift tools
+BANDS = [
+    (1000, 24999),
+    (25000, 49999),
+    (50000, 73199),
+    (73200, 124999),
+    (125000, 292999),
+    (293000, 449999),
+    (450000, 731999),
+]
+DURATIONS = [1, 2, 3]
+CARBON = ["Y", "N"]
+SALE_TYPES = ["Acquisition", "Renewal"]
+
+
+def ldzs():
+    return sorted(pd.read_csv(POSTCODE_FILE)["LDZ"].dropna().unique())
+
+
+def flat_file(rows, seed=0, production_date="2025-06-02"):
+    """Synthetic gas supplier flat file with the columns of the weekly files.
+
+    Rows cycle through every LDZ x band x duration x carbon combination;
+    further repeats get later weekly contract start windows, other brokers and
+    new product names, as the larger weekly files do.
+    """
+    rng = np.random.default_rng(seed)
+    all_ldzs = ldzs()
+
+    grid = pd.MultiIndex.from_product(
+        [all_ldzs, range(len(BANDS)), DURATIONS, CARBON], names=["LDZ", "band", "duration", "carbon"]
+    ).to_frame(index=False)
+    repeat = np.arange(rows) // len(grid)
+    cell = grid.iloc[np.arange(rows) % len(grid)].reset_index(drop=True)
+
+    band_min = np.array([b[0] for b in BANDS])[cell["band"]]
+    band_max = np.array([b[1] for b in BANDS])[cell["band"]]
+    start = pd.Timestamp(production_date) + pd.to_timedelta((repeat % 26) * 7, unit="D")
+    produced = pd.Timestamp(production_date)
+
+    # Rates fall with AQ and rise with duration, with some per-row noise
+    unit_rate = 8.0 - cell["band"] * 0.35 + cell["duration"] * 0.12 + (cell["carbon"] == "Y") * 0.08
+    standing = 0.3 + (len(BANDS) - cell["band"]) * 0.15
+
+    return pd.DataFrame({
+        "Broker_ID": "BRK" + (repeat % 5).astype(str),
+        "Production_Date": produced,
+        "Utility": "Gas",
+        "LDZ": cell["LDZ"],
+        "Exit_Zone": cell["LDZ"] + "1",
+        "Sale_Type": np.array(SALE_TYPES)[repeat % len(SALE_TYPES)],
+        "Contract_Duration": cell["duration"],
+        "Minimum_Annual_Consumption": band_min,
+        "Maximum_Annual_Consumption": band_max,
+        "Minimum_Contract_Start_Date": start,
+        "Maximum_Contract_Start_Date": start + pd.Timedelta(days=6),
+        "Minimum_Valid_Quote_Date": produced,
+        "Maximum_Valid_Quote_Date": produced + pd.Timedelta(days=6),
+        "Product_Name": "Fixed " + cell["duration"].astype(str) + "yr v" + (repeat % 10).astype(str),
+        "Carbon_Offset": cell["carbon"],
+        "Minimum_Credit_Score": 0,
+        "Maximum_Credit_Score": 100,
+        "Unit_Rate": (unit_rate + rng.normal(0, 0.05, rows)).round(4),
+        "Standing_Charge": (standing + rng.normal(0, 0.02, rows)).round(4),
+    })
+
+
+def band_inputs(seed=0):
+    """Random Gas105-style uplift configuration."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "Min": low,
+            "Max": high,
+            "Contract": int(rng.choice(DURATIONS)),
+            "Standard_Unit": round(float(rng.uniform(0, 2)), 3),
+            "Standard_Standing": round(float(rng.uniform(0, 20)), 4),
+            "Carbon_Unit": round(float(rng.uniform(0, 2)), 3),
+            "Carbon_Standing": round(float(rng.uniform(0, 20)), 4),
+        }
+        for low, high in BANDS
+    ]
@@ -0,0 +1 @@
+# Shared pricing helpers used by the Streamlit tools
@@ -0,0 +1,73 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def frame_size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class SizedLRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values."""
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._values = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self):
+        return sum(self._sizes.values())
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._values:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._values.move_to_end(key)
+            return self._values[key]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            self._values[key] = value
+            self._sizes[key] = size
+            self._values.move_to_end(key)
+            # Evict least recently used values, always keeping the newest one
+            while len(self._values) > 1 and self.size_bytes > self.max_bytes:
+                old_key, _ = self._values.popitem(last=False)
+                del self._sizes[old_key]
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._sizes.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._values),
+                "size_mb": self.size_bytes / 1024 ** 2,
+            }
+
+
+def config_key(*parts):
+    """Stable digest of plain-Python configuration (band inputs, options, ...)."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from pricing.nhh import RATES
+
+# NHHcost1 cost stack inputs, in the order they are added: per-day costs go
+# on the standing charge and per-kWh costs on every unit rate
+STANDING_COSTS = ["billing_cost", "customer_service", "regulatory_cost"]
+UNIT_COSTS = ["bad_debt", "margin"]
+UNIT_RATES = ["Day_Rate", "Night_Rate", "Evening_And_Weekend_Rate"]
+
+# Product columns carried into the published tariff, when present
+PRODUCT_COLUMNS = [
+    "Rate_Structure",
+    "Contract_Duration",
+    "Minimum_Annual_Consumption",
+    "Maximum_Annual_Consumption",
+    "Green_Energy",
+]
+
+
+def apply_cost_stack(df, costs):
+    """Tariff with the cost stack added to every row's rates.
+
+    costs maps the STANDING_COSTS and UNIT_COSTS fields to p/day and p/kWh
+    (missing ones count as 0). The standing charge column and the matrix
+    of unit rate columns take one broadcast add per cost, so a change of
+    cost inputs reprices the whole file in a few array operations.
+    """
+    standing = df["Standing_Charge"].to_numpy(dtype=float)
+    for field in STANDING_COSTS:
+        standing = standing + costs.get(field, 0.0)
+    unit = df[UNIT_RATES].to_numpy(dtype=float)
+    for field in UNIT_COSTS:
+        unit = unit + costs.get(field, 0.0)
+    return df.assign(Standing_Charge=standing, **dict(zip(UNIT_RATES, unit.T)))
+
+
+def cost_stacked_tariff(df, costs):
+    """Every product row with its supplier rates and cost-stacked rates (4 dp)."""
+    stacked = apply_cost_stack(df, costs)
+    published = df[[column for column in PRODUCT_COLUMNS if column in df.columns]].reset_index(drop=True)
+    for rate, _, column in RATES:
+        published[f"Supplier {column}"] = df[rate].to_numpy(dtype=float)
+        published[column] = np.round(stacked[rate].to_numpy(dtype=float), 4)
+    return published
@@ -0,0 +1,29 @@
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+# Flat files hold dates as Excel dates, ISO text (as to_csv writes them,
+# "2025-06-02 00:00:00") or UK day-first text ("02/06/2025")
+
+
+def blank(values):
+    """True where a date cell is empty: missing or whitespace-only text."""
+    values = pd.Series(values).astype(object)
+    return values.where(values.notna(), "").astype(str).str.strip().eq("").to_numpy()
+
+
+def parse_dates(values):
+    """Datetime Series of values, NaT where blank or not a date.
+
+    ISO text is read as year-month-day and only text that isn't ISO is read
+    day first, so "2025-06-02" and "02/06/2025" are both 2 June.
+    """
+    values = pd.Series(values)
+    if is_datetime64_any_dtype(values):
+        return values
+    values = values.astype(object)
+    parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+    rest = parsed.isna().to_numpy() & ~blank(values)
+    if rest.any():
+        text = values[rest].astype(str)
+        parsed[rest] = pd.to_datetime(text, format="mixed", dayfirst=True, errors="coerce").to_numpy()
+    return parsed
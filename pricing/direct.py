@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# Bulk site list columns, as in the direct_sites schema
+SITE_COLUMNS = ["MPRN", "Site_Name", "AQ", "Postcode", "Standing_Uplift", "Unit_Uplift"]
+PORTFOLIO_COLUMNS = SITE_COLUMNS + [
+    "LDZ", "Status",
+    "Supplier_Standing", "Supplier_Unit",
+    "Final_Standing", "Final_Unit",
+    "Annual_Cost",
+]
+
+
+def site_template():
+    """Empty site list in the layout the bulk upload expects, as CSV bytes."""
+    return pd.DataFrame(columns=SITE_COLUMNS).to_csv(index=False).encode("utf-8")
+
+
+def _site_inputs(sites, postcodes):
+    """Site list with numeric AQ/uplifts, completeness mask and resolved LDZs."""
+    portfolio = sites.reindex(columns=SITE_COLUMNS).reset_index(drop=True)
+    postcode = portfolio["Postcode"].astype(object).fillna("").astype(str).str.strip()
+    numeric = {
+        column: pd.to_numeric(portfolio[column], errors="coerce").fillna(0.0).to_numpy()
+        for column in ("AQ", "Standing_Uplift", "Unit_Uplift")
+    }
+    portfolio = portfolio.assign(**numeric)
+    complete = (postcode != "").to_numpy() & (numeric["AQ"] > 0)
+    return portfolio, complete, postcodes.ldz_many(postcode).where(complete)
+
+
+def _supplier_rates(tariff_df, index, portfolio, complete, ldz, carbon, start_date):
+    """Supplier standing and unit rates per site (NaN where unmatched)."""
+    positions = index.lookup_many(ldz.to_numpy(dtype=object), carbon, portfolio["AQ"].to_numpy(), start_date)
+    positions[~complete] = -1
+    matched = positions >= 0
+
+    supplier_standing = np.full(len(portfolio), np.nan)
+    supplier_unit = np.full(len(portfolio), np.nan)
+    supplier_standing[matched] = tariff_df["Standing_Charge"].to_numpy(dtype=float)[positions[matched]]
+    supplier_unit[matched] = tariff_df["Unit_Rate"].to_numpy(dtype=float)[positions[matched]]
+    return supplier_standing, supplier_unit, matched
+
+
+def _final_rates(portfolio, supplier_standing, supplier_unit):
+    """Uplifted standing and unit rates and the annual cost they give."""
+    final_standing = supplier_standing + portfolio["Standing_Uplift"].to_numpy()
+    final_unit = supplier_unit + portfolio["Unit_Uplift"].to_numpy()
+    annual_cost = (portfolio["AQ"].to_numpy() * final_unit / 100) + (365 * final_standing / 100)
+    return final_standing, final_unit, annual_cost
+
+
+def price_sites(sites, tariff_df, index, postcodes, carbon, start_date=None):
+    """Price a whole site list against a Direct tariff in one pass.
+
+    sites needs MPRN, AQ and Postcode (see SITE_COLUMNS); missing uplifts
+    count as 0. LDZs come from the postcode resolver and tariff rows from
+    TariffIndex.lookup_many, so the result matches pricing each site in
+    the reactive grid. With a contract start date, tariff rows must also
+    accept that start and be quotable today. Status is "Priced", "No LDZ",
+    "No Match" or "Incomplete" (no postcode or no AQ); only priced sites
+    carry rates.
+    """
+    portfolio, complete, ldz = _site_inputs(sites, postcodes)
+    supplier_standing, supplier_unit, matched = _supplier_rates(
+        tariff_df, index, portfolio, complete, ldz, carbon, start_date
+    )
+    final_standing, final_unit, annual_cost = _final_rates(portfolio, supplier_standing, supplier_unit)
+
+    return portfolio.assign(
+        LDZ=ldz,
+        Status=np.select(
+            [~complete, ldz.isna().to_numpy(), ~matched],
+            ["Incomplete", "No LDZ", "No Match"],
+            "Priced",
+        ),
+        Supplier_Standing=supplier_standing,
+        Supplier_Unit=supplier_unit,
+        Final_Standing=np.round(final_standing, 4),
+        Final_Unit=np.round(final_unit, 4),
+        Annual_Cost=np.round(annual_cost, 2),
+    )[PORTFOLIO_COLUMNS]
+
+
+def compare_suppliers(sites, tariffs, postcodes, carbon, start_date=None):
+    """Annual cost of every site with every supplier, and the cheapest.
+
+    tariffs maps supplier name to (tariff_df, index). Postcodes are
+    resolved once and each supplier is priced with one lookup_many call.
+    Returns (matrix, totals): matrix has the site columns, LDZ, one annual
+    cost column per supplier (NaN where it cannot price the site),
+    Best_Supplier and Best_Cost; totals has one row per supplier with the
+    sites it prices, their total cost and how many sites it is cheapest
+    for.
+    """
+    if not tariffs:
+        raise ValueError("compare_suppliers needs at least one supplier tariff")
+    portfolio, complete, ldz = _site_inputs(sites, postcodes)
+    names = list(tariffs)
+    costs = np.full((len(portfolio), len(names)), np.nan)
+    for j, name in enumerate(names):
+        tariff_df, index = tariffs[name]
+        supplier_standing, supplier_unit, _ = _supplier_rates(
+            tariff_df, index, portfolio, complete, ldz, carbon, start_date
+        )
+        costs[:, j] = np.round(_final_rates(portfolio, supplier_standing, supplier_unit)[2], 2)
+
+    priced = ~np.isnan(costs)
+    best = np.where(priced, costs, np.inf).argmin(axis=1)
+    has_best = priced.any(axis=1)
+
+    matrix = portfolio[["MPRN", "Site_Name", "AQ", "Postcode"]].assign(LDZ=ldz)
+    matrix = pd.concat([matrix, pd.DataFrame(costs, columns=names)], axis=1)
+    matrix["Best_Supplier"] = np.where(has_best, np.asarray(names, dtype=object)[best], None)
+    matrix["Best_Cost"] = np.where(has_best, costs[np.arange(len(portfolio)), best], np.nan)
+
+    totals = pd.DataFrame({
+        "Supplier": names,
+        "Sites_Priced": priced.sum(axis=0),
+        "Total_Annual_Cost": np.nansum(costs, axis=0),
+        "Cheapest_For": [int((has_best & (best == j)).sum()) for j in range(len(names))],
+    })
+    return matrix, totals
@@ -0,0 +1,77 @@
+import tempfile
+
+import xlsxwriter
+
+from pricing.cache import SizedLRUCache
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Excel's sheet limit, including the header row
+XLSX_MAX_ROWS = 1_048_576
+
+# Rows converted to Python values per batch while streaming
+CHUNK_ROWS = 10_000
+# Workbooks larger than this spill from memory to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 ** 2
+# Finished workbooks kept per process, keyed by tariff hash and uplift config
+MAX_ARTIFACT_BYTES = 256 * 1024 ** 2
+
+artifact_cache = SizedLRUCache(MAX_ARTIFACT_BYTES)
+
+
+def write_xlsx(df, target, sheet_name="PriceList", column_formats=None):
+    """Stream df into an XLSX workbook at target (path or binary file object).
+
+    Uses xlsxwriter's constant_memory mode, so only the current row is held
+    as cell objects. column_formats maps column name -> Excel number format
+    and is applied once per column rather than per cell.
+    """
+    if len(df) + 1 > XLSX_MAX_ROWS:
+        # xlsxwriter silently drops rows past the limit
+        raise ValueError(f"{len(df):,} rows do not fit on one Excel sheet")
+
+    workbook = xlsxwriter.Workbook(target, {
+        "constant_memory": True,
+        "nan_inf_to_errors": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    # Same header style pandas uses for to_excel
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for col, name in enumerate(df.columns):
+        num_format = (column_formats or {}).get(name)
+        if num_format:
+            worksheet.set_column(col, col, None, workbook.add_format({"num_format": num_format}))
+        worksheet.write(0, col, name, header_format)
+
+    row = 1
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS].astype(object)
+        # Missing values become blank cells, as with to_excel
+        for values in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+            worksheet.write_row(row, 0, values)
+            row += 1
+
+    workbook.close()
+
+
+def xlsx_bytes(df, sheet_name="PriceList", column_formats=None):
+    """Streamed XLSX export returned as bytes for st.download_button."""
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        write_xlsx(df, spool, sheet_name, column_formats)
+        spool.seek(0)
+        return spool.read()
+
+
+def lazy_xlsx(build_df, key, sheet_name="PriceList", column_formats=None):
+    """Deferred download data: the workbook is only built when clicked.
+
+    build_df returns the frame to export. Workbooks are memoised by key,
+    normally (tariff content hash, config_key(uplift inputs)), so repeat
+    downloads of the same configuration are served from memory.
+    """
+    def data():
+        return artifact_cache.get_or_build(
+            key, lambda: xlsx_bytes(build_df(), sheet_name, column_formats)
+        )
+    return data
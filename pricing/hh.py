@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+from pricing.dates import parse_dates
+from pricing.nhh import RATES, match_bands
+
+# Half-hour reading columns of a wide profile, one row per meter and day
+HH_COLUMNS = [f"HH{period:02d}" for period in range(1, 49)]
+# Long profiles carry one reading per row instead; Timestamp is the start
+# of the half hour, in UK local time
+PROFILE_COLUMNS = ["MPAN", "Timestamp", "kWh"]
+
+# Time-of-use periods, in the order of RATES after the standing charge
+PERIODS = ["Day", "Night", "Evening & Weekend"]
+DAY, NIGHT, EVW = range(3)
+# Night runs 00:00-07:00 every day; Day is 07:00-20:00 on weekdays and
+# the rest of the week is Evening & Weekend. Bank holidays count as weekdays.
+NIGHT_END_HOUR = 7
+DAY_END_HOUR = 20
+
+
+def _tou_table():
+    """Period of each half hour (columns) on weekdays (row 0) and weekends (row 1)."""
+    hours = np.arange(48) / 2
+    weekday = np.where(hours < NIGHT_END_HOUR, NIGHT, np.where(hours < DAY_END_HOUR, DAY, EVW))
+    weekend = np.where(hours < NIGHT_END_HOUR, NIGHT, EVW)
+    return np.stack([weekday, weekend])
+
+
+TOU_TABLE = _tou_table()
+# _minutes of a date that can't be read
+NAT_MINUTES = np.datetime64("NaT").astype(np.int64)
+
+
+def profile_template():
+    """Empty wide profile (MPAN, Date, HH01-HH48) as CSV bytes."""
+    return pd.DataFrame(columns=["MPAN", "Date"] + HH_COLUMNS).to_csv(index=False).encode("utf-8")
+
+
+def _minutes(values):
+    """Minutes since 1970-01-01, local time, parsing each distinct date once.
+
+    Text that isn't a date gives NAT_MINUTES.
+    """
+    values = pd.Series(values)
+    if not is_datetime64_any_dtype(values):
+        # Profiles repeat the same dates for every meter
+        codes, unique = pd.factorize(values)
+        values = parse_dates(unique).take(codes)
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert("Europe/London").dt.tz_localize(None)
+    return values.to_numpy(dtype="datetime64[m]").astype(np.int64)
+
+
+def _readings(profile):
+    """(meter codes, meters, day number, half hour, kWh) from a long or wide profile."""
+    # Readings without a meter or a readable date are skipped
+    if "Timestamp" in profile.columns:
+        profile = profile.dropna(subset=["MPAN", "Timestamp"])
+        minutes = _minutes(profile["Timestamp"])
+        profile, minutes = profile[minutes != NAT_MINUTES], minutes[minutes != NAT_MINUTES]
+        codes, meters = pd.factorize(profile["MPAN"])
+        return codes, meters, minutes // 1440, minutes % 1440 // 30, profile["kWh"].to_numpy(dtype=float)
+
+    profile = profile.dropna(subset=["MPAN", "Date"])
+    minutes = _minutes(profile["Date"])
+    profile, days = profile[minutes != NAT_MINUTES], minutes[minutes != NAT_MINUTES] // 1440
+    codes, meters = pd.factorize(profile["MPAN"])
+    values = profile.reindex(columns=HH_COLUMNS).to_numpy(dtype=float)
+    return (
+        np.repeat(codes, 48),
+        meters,
+        np.repeat(days, 48),
+        np.tile(np.arange(48), len(profile)),
+        values.ravel(),
+    )
+
+
+def tou_periods(days, half_hours):
+    """DAY, NIGHT or EVW for each reading, from day numbers since 1970-01-01."""
+    # 1970-01-01 was a Thursday, so (day + 3) % 7 counts from Monday
+    weekend = (days + 3) % 7 >= 5
+    return TOU_TABLE[weekend.astype(np.intp), half_hours]
+
+
+def profile_usage(profile):
+    """Consumption per meter and time-of-use period from half-hourly readings.
+
+    profile is either long (PROFILE_COLUMNS, one reading per row) or wide
+    (MPAN, Date and HH01-HH48, one day per row); missing readings count
+    as 0. Days is the span from each meter's first to last reading, which
+    the standing charge is paid on, and EAC scales its consumption to a
+    year. Readings are classified with one lookup into TOU_TABLE and
+    summed with one bincount, so files of many meter-years cost a few
+    array passes.
+    """
+    codes, meters, day, half_hour, kwh = _readings(profile)
+    period = tou_periods(day, half_hour)
+
+    usage = np.bincount(
+        codes * len(PERIODS) + period, weights=np.nan_to_num(kwh), minlength=len(meters) * len(PERIODS)
+    ).reshape(len(meters), len(PERIODS))
+    span = pd.Series(day).groupby(codes).agg(["min", "max"])
+    days = (span["max"] - span["min"] + 1).to_numpy()
+
+    result = pd.DataFrame({"MPAN": np.asarray(meters, dtype=str), "Days": days})
+    for i, name in enumerate(PERIODS):
+        result[f"{name} (kWh)"] = usage[:, i]
+    result["EAC (kWh)"] = usage.sum(axis=1) * 365 / days
+    return result
+
+
+def cost_profiles(usage, df, duration, uplifts, rate_structure="NHH"):
+    """Price every meter of profile_usage against the NHH flat file.
+
+    Each meter takes the first tariff row whose AQ range holds its EAC,
+    for the contract duration and rate structure, found for all meters in
+    one match_bands call. uplifts maps the uplift fields of RATES to
+    p/day and p/kWh additions. Costs cover the profile's days; meters
+    with no matching row are "No Match" with blank rates and costs.
+    """
+    eac = usage["EAC (kWh)"].to_numpy(dtype=float)
+    positions = match_bands(df, eac, eac, duration, rate_structure=rate_structure)
+    matched = positions >= 0
+
+    costed = usage.assign(Status=np.where(matched, "Priced", "No Match"))
+    # Standing charges accrue per day, the other rates per kWh of their period
+    quantities = [usage["Days"]] + [usage[f"{name} (kWh)"] for name in PERIODS]
+    costs = []
+    for (rate, uplift, column), quantity in zip(RATES, quantities):
+        values = np.full(len(usage), np.nan)
+        values[matched] = df[rate].to_numpy(dtype=float)[positions[matched]] + uplifts.get(uplift, 0.0)
+        costed[column] = values
+        costs.append(quantity.to_numpy(dtype=float) * values / 100)
+
+    costed["Standing Cost (£)"] = np.round(costs[0], 2)
+    for name, cost in zip(PERIODS, costs[1:]):
+        costed[f"{name} Cost (£)"] = np.round(cost, 2)
+    costed["Total Cost (£)"] = np.round(np.sum(costs, axis=0), 2)
+    return costed
@@ -0,0 +1,184 @@
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_object_dtype, is_string_dtype
+
+from pricing import tariff_store
+from pricing.cache import SizedLRUCache, frame_size
+from pricing.schemas import SCHEMAS, TARIFF_COLUMNS, apply_schema, column_filter, dtype_hints
+
+# Parsed flat files kept per process, shared by every session
+MAX_CACHE_BYTES = 512 * 1024 ** 2
+
+READERS = {
+    "excel": pd.read_excel,
+    "csv": pd.read_csv,
+}
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# AQ band and duration columns, matched ignoring case, spaces and underscores
+INT32_COLUMNS = {"minimumannualconsumption", "maximumannualconsumption", "contractduration"}
+
+frame_cache = SizedLRUCache(MAX_CACHE_BYTES, sizeof=frame_size)
+
+
+def file_bytes(uploaded_file):
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    return uploaded_file.getvalue()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def compact_frame(df):
+    """Shrink a parsed flat file in place of its heavily repeated values.
+
+    Repeated text (Broker_ID, LDZ, Exit_Zone, Product_Name, Carbon_Offset,
+    ...) becomes categorical and whole-number AQ band and duration columns
+    become int32. Rates keep float64 so uplifted prices are unchanged.
+    """
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        key = str(name).replace(" ", "").replace("_", "").lower()
+        if (is_object_dtype(col) or is_string_dtype(col)) and len(col):
+            if col.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(col):
+                columns[name] = col.astype("category")
+        elif key in INT32_COLUMNS and is_numeric_dtype(col) and not is_bool_dtype(col):
+            values = col.to_numpy()
+            if (
+                col.notna().all()
+                and np.array_equal(values, np.round(values))
+                and np.abs(values).max(initial=0) < 2 ** 31
+            ):
+                columns[name] = col.astype("int32")
+
+    compact = df.assign(**columns) if columns else df.copy()
+    compact.attrs["memory_before"] = frame_size(df)
+    compact.attrs["memory_after"] = frame_size(compact)
+    return compact
+
+
+def _parse(data, digest, kind, schema, kwargs):
+    spec = SCHEMAS[schema] if schema else None
+    wanted = list(spec["columns"]) if spec and spec.get("columns") else None
+
+    # Tariff files are parsed once with the columns of every tariff schema,
+    # snapshotted to disk and shared across apps; each schema then only
+    # loads its own columns from the snapshot.
+    if kind == "excel" and not kwargs and spec and spec.get("tariff") and tariff_store.available():
+        df = tariff_store.load(digest, columns=wanted)
+        if df is None:
+            read = READERS[kind](io.BytesIO(data), usecols=lambda column: column in TARIFF_COLUMNS,
+                                 dtype=dtype_hints(spec))
+            df = compact_frame(read)
+            df.attrs["content_hash"] = digest
+            tariff_store.save(df, digest)
+    else:
+        if spec:
+            kwargs = {"usecols": column_filter(spec), "dtype": dtype_hints(spec), **kwargs}
+        df = compact_frame(READERS[kind](io.BytesIO(data), **kwargs))
+
+    if spec:
+        df = apply_schema(df, spec)
+    df.attrs["content_hash"] = digest
+    return df
+
+
+def _cache_key(digest, kind, schema, kwargs):
+    return (digest, kind, schema, repr(sorted(kwargs.items())))
+
+
+def read_flat_file(uploaded_file, kind="excel", schema=None, **kwargs):
+    """Parse an uploaded flat file once per distinct content.
+
+    schema names an entry of pricing.schemas.SCHEMAS; only its columns are
+    parsed, with its dtype hints, except that the first Excel parse of a
+    tariff file keeps the columns of every tariff schema (TARIFF_COLUMNS)
+    for the on-disk tariff store. Misses are served from the store when a
+    snapshot of the same bytes exists, so only the first upload of a file
+    pays for openpyxl. Frames are stored compacted (see
+    compact_frame).
+
+    Returns a private copy so callers can modify it freely; the content
+    hash is available as df.attrs["content_hash"].
+    """
+    data = file_bytes(uploaded_file)
+    digest = content_hash(data)
+    key = _cache_key(digest, kind, schema, kwargs)
+
+    df = frame_cache.get(key)
+    if df is None:
+        df = _parse(data, digest, kind, schema, kwargs)
+        frame_cache.put(key, df)
+
+    return df.copy()
+
+
+def read_flat_files(uploaded_files, kind="excel", schema=None, max_workers=None):
+    """read_flat_file for several uploads, parsing the misses concurrently.
+
+    Excel files with no snapshot in the tariff store need a full openpyxl
+    parse, which holds the GIL, so two or more of those are spread over a
+    process pool when there is more than one CPU; everything else is parsed
+    in this process. Results go through the same cache and come back in
+    input order.
+    """
+    data = [file_bytes(uploaded_file) for uploaded_file in uploaded_files]
+    digests = [content_hash(item) for item in data]
+    keys = [_cache_key(digest, kind, schema, {}) for digest in digests]
+
+    frames = {}
+    pending = {}
+    for i, key in enumerate(keys):
+        df = frame_cache.get(key)
+        if df is not None:
+            frames[key] = df
+        elif key not in pending:
+            pending[key] = i
+
+    slow = [
+        key for key, i in pending.items()
+        if kind == "excel" and not (tariff_store.available() and tariff_store.snapshot_path(digests[i]))
+    ]
+    workers = min(len(slow), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        # spawn, as forking a threaded Streamlit server is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {
+                key: pool.submit(_parse, data[pending[key]], digests[pending[key]], kind, schema, {})
+                for key in slow
+            }
+            frames.update({key: future.result() for key, future in futures.items()})
+
+    for key, i in pending.items():
+        if key not in frames:
+            frames[key] = _parse(data[i], digests[i], kind, schema, {})
+        frame_cache.put(key, frames[key])
+
+    return [frames[key].copy() for key in keys]
+
+
+def cache_caption():
+    stats = frame_cache.stats()
+    return (
+        f"Ingest cache: {stats['hits']} hits / {stats['misses']} misses, "
+        f"{stats['entries']} files ({stats['size_mb']:.1f} MB), {stats['evictions']} evicted"
+    )
+
+
+def memory_caption(df):
+    after = frame_size(df) / 1024 ** 2
+    before = df.attrs.get("memory_before")
+    if before is None:
+        return f"Tariff in memory: {after:.1f} MB"
+    return f"Tariff in memory: {before / 1024 ** 2:.1f} MB as parsed, {after:.1f} MB compacted"
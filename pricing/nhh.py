@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+from pricing.uplifts import assign_bands
+
+# Consumption bands of the NHH price book tools
+BANDS = [
+    (1000, 3000),
+    (3001, 12500),
+    (12501, 26000),
+    (26001, 100000),
+    (100001, 175000),
+    (175001, 225000),
+    (225001, 300000),
+]
+
+# Tariff rate column, band uplift field and price book column, in output order
+RATES = [
+    ("Standing_Charge", "uplift_standing", "Standing Charge (p/day)"),
+    ("Day_Rate", "uplift_day", "Day Rate (p/kWh)"),
+    ("Night_Rate", "uplift_night", "Night Rate (p/kWh)"),
+    ("Evening_And_Weekend_Rate", "uplift_evw", "Evening & Weekend Rate (p/kWh)"),
+]
+
+
+# Customer EAC distribution for NHHcost1 annual costs: one row per customer (or
+# group of Customers), rate splits in any scale and normalised per row
+CUSTOMER_COLUMNS = ["EAC", "Day_Split", "Night_Split", "Evening_And_Weekend_Split", "Customers"]
+# Mean consumption per customer of each band, one column per unit rate of RATES
+USAGE_COLUMNS = ["day_kwh", "night_kwh", "evw_kwh"]
+
+# Options of a full price book, one sheet each
+DURATIONS = [12, 24, 36]
+TARIFF_TYPES = ["Standard", "Green"]
+BOOK_KEYS = ["Contract Duration (Months)", "Tariff"]
+
+
+def band_labels(bands):
+    """Price book band labels, such as "1,000 – 3,000", from min and max columns."""
+    return [f"{low:,} – {high:,}" for low, high in zip(bands["min"], bands["max"])]
+
+
+def match_bands(df, band_min, band_max, duration, green=None, rate_structure=None):
+    """Position of the first tariff row overlapping each band, -1 if none.
+
+    A row matches a band when its [Minimum, Maximum]_Annual_Consumption
+    range overlaps the band and it has the contract duration asked for,
+    and the green flag and rate structure when those are given, as the
+    old per-band mask filter and iloc[0] did; a band with min == max is a
+    point lookup. duration and green may be single values or one per
+    band. Rows are reduced once to their distinct (duration, flag, AQ
+    range) keys, first row of each kept, so the join is one bands x keys
+    comparison however many bands, durations and flags are priced.
+    """
+    band_min = np.asarray(band_min, dtype=float)
+    band_max = np.asarray(band_max, dtype=float)
+    duration = np.broadcast_to(np.asarray(duration, dtype=float), band_min.shape)
+    durations = df["Contract_Duration"].to_numpy(dtype=float)
+    keep = np.isin(durations, duration)
+    if green is not None:
+        green = np.broadcast_to(np.asarray(green, dtype=bool), band_min.shape)
+        flags = df["Green_Energy"].to_numpy(dtype=object)
+        keep &= np.isin(flags, np.where(np.unique(green), "YES", "NO"))
+    if rate_structure is not None:
+        keep &= (df["Rate_Structure"] == rate_structure).to_numpy()
+    rows = np.flatnonzero(keep)
+    ranges = pd.DataFrame({
+        "duration": durations[rows],
+        "green": flags[rows] == "YES" if green is not None else False,
+        "min": df["Minimum_Annual_Consumption"].to_numpy(dtype=float)[rows],
+        "max": df["Maximum_Annual_Consumption"].to_numpy(dtype=float)[rows],
+        "row": rows,
+    }).drop_duplicates(["duration", "green", "min", "max"])
+
+    overlaps = (
+        (ranges["min"].to_numpy() <= band_max[:, None])
+        & (ranges["max"].to_numpy() >= band_min[:, None])
+        & (ranges["duration"].to_numpy() == duration[:, None])
+    )
+    if green is not None:
+        overlaps &= ranges["green"].to_numpy() == green[:, None]
+    first = np.where(overlaps, ranges["row"].to_numpy(), len(df)).min(axis=1, initial=len(df))
+    return np.where(first < len(df), first, -1)
+
+
+def customer_template():
+    """Empty customer distribution in the layout band_usage expects, as CSV bytes."""
+    return pd.DataFrame(columns=CUSTOMER_COLUMNS).to_csv(index=False).encode("utf-8")
+
+
+def band_usage(customers, bands):
+    """Customer count and mean Day/Night/EVW consumption for each band.
+
+    customers has an EAC per row, optional Day/Night/Evening_And_Weekend
+    splits (a row without any split is all day rate) and an optional
+    Customers weight (default 1). Each customer is placed in the band
+    holding its EAC, and the totals are a handful of bincounts, so
+    millions of customers aggregate in one pass. Returns a frame aligned
+    with bands holding Customers and USAGE_COLUMNS, NaN for empty bands.
+    """
+    bands = pd.DataFrame(bands)
+    customers = customers.reindex(columns=CUSTOMER_COLUMNS)
+    eac = pd.to_numeric(customers["EAC"], errors="coerce").to_numpy(dtype=float)
+    weight = pd.to_numeric(customers["Customers"], errors="coerce").fillna(1.0).to_numpy(dtype=float)
+    splits = customers[CUSTOMER_COLUMNS[1:4]].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    splits = splits.to_numpy(dtype=float, copy=True)
+    total = splits.sum(axis=1)
+    splits[total <= 0] = [1.0, 0.0, 0.0]
+    splits /= splits.sum(axis=1, keepdims=True)
+
+    band = assign_bands(
+        eac, [{"Min": low, "Max": high} for low, high in zip(bands["min"], bands["max"])], fallback_last=False
+    )
+    placed = (band >= 0) & (weight > 0)
+    band, weight, eac, splits = band[placed], weight[placed], eac[placed], splits[placed]
+
+    counts = np.bincount(band, weights=weight, minlength=len(bands))
+    usage = pd.DataFrame({"Customers": counts}, index=bands.index)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i, column in enumerate(USAGE_COLUMNS):
+            usage[column] = np.bincount(band, weights=weight * eac * splits[:, i], minlength=len(bands)) / counts
+    return usage
+
+
+def _book(df, bands, positions, annual_cost):
+    """Band labels and uplifted rates of the matched rows, NaN where unmatched."""
+    matched = positions >= 0
+    book = pd.DataFrame({"Band": band_labels(bands)})
+    for rate, uplift, column in RATES:
+        values = np.full(len(bands), np.nan)
+        values[matched] = (
+            df[rate].to_numpy(dtype=float)[positions[matched]] + bands[uplift].to_numpy(dtype=float)[matched]
+        )
+        book[column] = values
+
+    if annual_cost:
+        standing = book["Standing Charge (p/day)"].to_numpy()
+        if all(column in bands.columns for column in USAGE_COLUMNS):
+            # Mean cost of the band's customers at their own consumption and rate split
+            book.insert(1, "Customers", bands["Customers"].to_numpy())
+            cost = 365 * standing / 100
+            for (_, _, column), usage in zip(RATES[1:], USAGE_COLUMNS):
+                cost = cost + bands[usage].to_numpy(dtype=float) * book[column].to_numpy() / 100
+        else:
+            # Without a customer distribution: mid-band consumption, all at the day rate
+            mid_consumption = (bands["min"].to_numpy(dtype=float) + bands["max"].to_numpy(dtype=float)) / 2
+            cost = (mid_consumption * book["Day Rate (p/kWh)"].to_numpy() / 100) + (365 * standing / 100)
+        book[[column for _, _, column in RATES]] = book[[column for _, _, column in RATES]].round(4)
+        book["Total Annual Cost (£)"] = np.round(cost, 2)
+
+    # Bands with no tariff row (or no customers) print as "N/A"
+    return book.astype(object).where(book.notna(), "N/A")
+
+
+def price_book(df, bands, duration, green, annual_cost=False):
+    """Uplifted NHH rates per band, "N/A" where no tariff row matches.
+
+    bands is a frame (or list of dicts) with min, max and the uplift fields
+    of RATES; any number of bands is resolved in one match_bands call.
+    With annual_cost, rates are rounded to 4 dp and a Total Annual Cost is
+    added, as NHHcost1 prints them: the mean over the band's customers
+    when bands carries band_usage columns, else at mid-band consumption.
+    """
+    bands = pd.DataFrame(bands)
+    positions = match_bands(df, bands["min"], bands["max"], duration, green)
+    return _book(df, bands, positions, annual_cost)
+
+
+def full_price_book(df, bands, durations=DURATIONS, annual_cost=False):
+    """price_book for every contract duration and tariff type at once.
+
+    Every band x duration x Standard/Green combination is matched in one
+    match_bands call. Returns one frame with Contract Duration (Months)
+    and Tariff columns ahead of the price_book columns.
+    """
+    options = pd.DataFrame(
+        [(duration, tariff) for duration in durations for tariff in TARIFF_TYPES],
+        columns=BOOK_KEYS,
+    )
+    grid = options.merge(pd.DataFrame(bands), how="cross")
+    positions = match_bands(
+        df, grid["min"], grid["max"], grid[BOOK_KEYS[0]], (grid[BOOK_KEYS[1]] == "Green").to_numpy()
+    )
+    return pd.concat([grid[BOOK_KEYS], _book(df, grid, positions, annual_cost)], axis=1)
+
+
+def book_sheets(book):
+    """Workbook sheets for a full_price_book: the whole book, then one per option."""
+    sheets = {"Full Book": book}
+    for (duration, tariff), part in book.groupby(BOOK_KEYS, sort=False):
+        sheets[f"{duration} Months {tariff}"] = part.drop(columns=BOOK_KEYS).reset_index(drop=True)
+    return sheets
@@ -0,0 +1,173 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Outcode to LDZ lookup shipped with the Direct apps
+POSTCODE_FILE = Path(__file__).resolve().parent.parent / "Clean_PostCode.csv"
+# Optional finer-grained entries (Postcode, LDZ): full postcodes such as
+# "AB10 1AA", sectors such as "AB10 1" and outcodes such as "AB10"
+OVERRIDES_FILE = Path(os.environ.get(
+    "POSTCODE_OVERRIDES_FILE", Path(__file__).resolve().parent.parent / "Postcode_Overrides.csv"
+))
+
+# Longest canonical key, "SW1A 1AA"; a table holding longer keys is widened
+KEY_WIDTH = 8
+
+_resolvers = {}
+_lock = threading.Lock()
+
+
+def normalise(code):
+    """Upper-case a postcode or outcode and drop all whitespace."""
+    return "".join(str(code).split()).upper()
+
+
+def split_postcode(postcode):
+    """(outward, inward) parts of a postcode; inward is "" for a bare outcode.
+
+    "AB10 1AA" and "ab101aa" both give ("AB10", "1AA") and a sector "AB10 1"
+    gives ("AB10", "1"). The inward code is always one digit and two
+    letters, so unspaced postcodes longer than an outcode lose their last
+    three characters.
+    """
+    parts = str(postcode).upper().split()
+    if len(parts) >= 2:
+        return parts[0], "".join(parts[1:])
+    text = parts[0] if parts else ""
+    if len(text) > 4:
+        return text[:-3], text[-3:]
+    return text, ""
+
+
+def outcode(postcode):
+    """Outward code of a postcode, written with or without the space."""
+    return split_postcode(postcode)[0]
+
+
+class SortedLookup:
+    """Exact-match string -> label table held as two flat NumPy arrays.
+
+    Keys are fixed-width byte strings kept sorted, so a lookup is one
+    binary search; labels are stored once and referenced by the smallest
+    integer code that fits (uint8 for the LDZs), so an entry costs about
+    9 bytes and a million postcodes fit in under 10 MB. Keys are KEY_WIDTH
+    bytes wide unless a longer one is loaded, which widens every key
+    rather than truncating it onto a different postcode.
+    """
+
+    def __init__(self, keys, labels):
+        encoded = [str(key).encode("ascii", "ignore") for key in keys]
+        self.width = max(KEY_WIDTH, max(map(len, encoded), default=0))
+        keys = np.asarray(encoded, dtype=f"S{self.width}")
+        # np.unique returns the first occurrence of each key, so earlier rows win
+        self.keys, first = np.unique(keys, return_index=True)
+        self.labels, codes = np.unique(np.asarray(labels, dtype=object)[first].astype(str), return_inverse=True)
+        self.codes = codes.astype(np.min_scalar_type(len(self.labels)))
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.codes.nbytes
+
+    def get(self, key):
+        key = key.encode("ascii", "ignore")
+        if len(key) > self.width:
+            return None
+        i = np.searchsorted(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return str(self.labels[self.codes[i]])
+        return None
+
+
+def _canonical_keys(postcodes):
+    """Vectorised "OUTCODE INWARD" form of a Series of postcodes and sectors."""
+    text = postcodes.astype(str).str.strip().str.upper().str.replace(r"\s+", " ", regex=True)
+    unspaced = ~text.str.contains(" ") & (text.str.len() > 4)
+    text[unspaced] = text[unspaced].str[:-3] + " " + text[unspaced].str[-3:]
+    return text
+
+
+class PostcodeResolver:
+    """Hierarchical postcode to LDZ lookup, built once per process.
+
+    Outcodes come from the CSV into a dict; where an outcode straddles two
+    LDZs the first row in the file wins, as the old `postcode_df[...].iloc[0]`
+    filter did, and the outcode is listed in `straddling`. An optional
+    overrides file pins full postcodes and sectors (held in a SortedLookup)
+    or replaces outcode entries. The most specific entry wins.
+    """
+
+    def __init__(self, path=POSTCODE_FILE, overrides=None):
+        lookup = pd.read_csv(path, usecols=["Outcode", "LDZ"], dtype=str).dropna()
+        codes = lookup["Outcode"].map(normalise)
+        ldzs = lookup["LDZ"].str.strip()
+        first = ~codes.duplicated()
+        self.path = str(path)
+        self.ldzs = dict(zip(codes[first], ldzs[first]))
+        spread = ldzs.groupby(codes.to_numpy()).nunique()
+        self.straddling = frozenset(spread.index[spread > 1])
+
+        self.overrides = None
+        if overrides is not None:
+            self._load_overrides(overrides)
+
+    def _load_overrides(self, path):
+        table = pd.read_csv(path, usecols=["Postcode", "LDZ"], dtype=str).dropna()
+        keys = _canonical_keys(table["Postcode"])
+        ldzs = table["LDZ"].str.strip()
+        outcodes = ~keys.str.contains(" ")
+        self.ldzs.update(dict(zip(keys[outcodes][::-1], ldzs[outcodes][::-1])))
+        self.overrides = SortedLookup(keys[~outcodes].to_numpy(), ldzs[~outcodes].to_numpy())
+
+    def __len__(self):
+        return len(self.ldzs) + (len(self.overrides) if self.overrides is not None else 0)
+
+    def ldz_for_outcode(self, code):
+        return self.ldzs.get(normalise(code))
+
+    def straddles(self, code):
+        """True when the outcode maps to more than one LDZ in the CSV."""
+        return normalise(code) in self.straddling
+
+    def resolve(self, postcode):
+        """(LDZ, level) for a postcode, level being "postcode", "sector" or "outcode".
+
+        Returns (None, None) when nothing matches.
+        """
+        out, inward = split_postcode(postcode)
+        if inward and self.overrides is not None:
+            for key, level in ((f"{out} {inward}", "postcode"), (f"{out} {inward[0]}", "sector")):
+                ldz = self.overrides.get(key)
+                if ldz is not None:
+                    return ldz, level
+        ldz = self.ldzs.get(out)
+        return (ldz, "outcode") if ldz is not None else (None, None)
+
+    def ldz(self, postcode):
+        """LDZ for a full postcode, or None when nothing matches."""
+        return self.resolve(postcode)[0]
+
+    def ldz_many(self, postcodes):
+        """LDZ for each postcode of a Series, None where unknown."""
+        codes = pd.Series(postcodes, dtype=object).fillna("").astype(str)
+        unique = codes.unique()
+        return codes.map(dict(zip(unique, map(self.ldz, unique))))
+
+
+def resolver(path=POSTCODE_FILE, overrides=OVERRIDES_FILE):
+    """Process-wide resolver for a postcode file, shared by every session.
+
+    The CSV (and the overrides file, when it exists) is read on first use
+    only; later reruns reuse the same lookup.
+    """
+    overrides = Path(overrides) if overrides is not None and Path(overrides).is_file() else None
+    key = (str(Path(path).resolve()), str(overrides.resolve()) if overrides else None)
+    with _lock:
+        if key not in _resolvers:
+            _resolvers[key] = PostcodeResolver(key[0], key[1])
+        return _resolvers[key]
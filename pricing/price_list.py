@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+from pricing.uplifts import UPLIFT_FIELDS, band_uplifts
+
+# Consumption bands of the Gas105 uplift tool
+BANDS = [
+    {"Min": 1000, "Max": 24999},
+    {"Min": 25000, "Max": 49999},
+    {"Min": 50000, "Max": 73199},
+    {"Min": 73200, "Max": 124999},
+    {"Min": 125000, "Max": 292999},
+    {"Min": 293000, "Max": 449999},
+    {"Min": 450000, "Max": 731999},
+]
+
+# Band keys a JSON uplift configuration may set besides the uplifts
+BAND_KEYS = {"Min", "Max", "Contract", "Duration"}
+
+CREDIT_SCORE_COLUMNS = ["Minimum_Credit_Score", "Maximum_Credit_Score"]
+
+# Columns of the broker price list, in output order
+PRICE_LIST_COLUMNS = [
+    "Broker_ID",
+    "Production_Date",
+    "Utility",
+    "LDZ",
+    "Exit_Zone",
+    "Sale_Type",
+    "Contract_Duration",
+    "Minimum_Annual_Consumption",
+    "Maximum_Annual_Consumption",
+    "Minimum_Contract_Start_Date",
+    "Maximum_Contract_Start_Date",
+    "Minimum_Valid_Quote_Date",
+    "Maximum_Valid_Quote_Date",
+    "Product_Name",
+    "Carbon_Offset",
+    "Unit Rate",
+    "Standing Charge",
+    "Total Annual Cost (£)"
+]
+# Excel number formats of the priced columns in price list exports
+PRICE_LIST_FORMATS = {
+    "Unit Rate": "0.0000",
+    "Standing Charge": "0.0000",
+    "Total Annual Cost (£)": "£#,##0.00",
+}
+
+
+def price_rows(df_final, rows):
+    """Uplifted Unit Rate, Standing Charge and Total Annual Cost for the given rows."""
+    priced = df_final.loc[rows]
+    unit_rate = (priced["Unit_Rate"] + priced["Uplift_Unit"]).round(4)
+    standing_charge = (priced["Standing_Charge"] + priced["Uplift_Standing"]).round(4)
+    df_final.loc[rows, "Unit Rate"] = unit_rate
+    df_final.loc[rows, "Standing Charge"] = standing_charge
+    df_final.loc[rows, "Total Annual Cost (£)"] = (
+        (standing_charge * 365) + (unit_rate * priced["Minimum_Annual_Consumption"])
+    ) / 100
+
+
+def price_list(df, band_inputs):
+    """Full Gas105 price list for a flat file in one pass."""
+    df_final = df.drop(columns=CREDIT_SCORE_COLUMNS, errors="ignore").reset_index(drop=True)
+    df_final[["Uplift_Unit", "Uplift_Standing"]] = band_uplifts(df_final, band_inputs)
+    price_rows(df_final, df_final.index)
+    return df_final[PRICE_LIST_COLUMNS]
+
+
+def load_band_inputs(path):
+    """Band inputs from a JSON uplift configuration.
+
+    The file holds one entry per band, either as a list or under "bands":
+
+        {"bands": [{"Standard_Unit": 0.5, "Standard_Standing": 5,
+                    "Carbon_Unit": 0.7, "Carbon_Standing": 5}, ...]}
+
+    Min/Max default to BANDS and missing uplifts to 0. Unknown keys, such
+    as a misspelt uplift that would otherwise price at 0, raise ValueError.
+    """
+    config = json.loads(Path(path).read_text())
+    bands = config.get("bands") if isinstance(config, dict) else config
+    if not isinstance(bands, list):
+        raise ValueError(f'{path}: expected a list of bands, or one under "bands"')
+    if len(bands) != len(BANDS):
+        raise ValueError(f"{path}: expected {len(BANDS)} bands, found {len(bands)}")
+
+    uplifts = [field for fields in UPLIFT_FIELDS.values() for field in fields]
+    band_inputs = []
+    for i, (default, band) in enumerate(zip(BANDS, bands), start=1):
+        if not isinstance(band, dict):
+            raise ValueError(f"{path}: band {i} is not an object of uplifts")
+        unknown = sorted(set(band) - set(uplifts) - BAND_KEYS)
+        if unknown:
+            raise ValueError(f"{path}: band {i} has unknown key(s) {', '.join(unknown)}")
+        entry = {**default, "Contract": 1}
+        entry.update({field: 0.0 for field in uplifts})
+        entry.update(band)
+        for field in uplifts:
+            if isinstance(entry[field], bool) or not isinstance(entry[field], (int, float)):
+                raise ValueError(f"{path}: band {i} {field} must be a number, not {entry[field]!r}")
+        band_inputs.append(entry)
+    return band_inputs
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+
+class RateCard:
+    """Dense LDZ x carbon x duration x AQ band cube of tariff row positions.
+
+    A regular flat file is a grid: every row sits in one of a few shared,
+    non-overlapping AQ bands. The cube holds, for every cell, the first
+    file row in it (-1 when empty), and a last duration slot holding the
+    first row over all durations, so pricing a site is a band search over
+    a handful of edges plus integer indexing, and a million sites are
+    priced with whole-array indexing.
+
+    Use build(), which returns None for irregular files (overlapping or
+    unshared bands); those keep the row-table lookups of TariffIndex.
+    """
+
+    def __init__(self, ldz_index, durations, band_min, band_max, cube):
+        self.ldz_index = ldz_index
+        self.ldz_codes = {value: i for i, value in enumerate(ldz_index)}
+        self.durations = durations
+        self.band_min = band_min
+        self.band_max = band_max
+        self.cube = cube
+
+    @classmethod
+    def build(cls, ldz, carbon, duration, mins, maxs, rows):
+        """Pivot row arrays (rows being their file positions, ascending)."""
+        bands = np.unique(np.stack([mins, maxs], axis=1), axis=0)
+        if len(bands) and (bands[1:, 0] <= bands[:-1, 1]).any():
+            return None
+        band_min, band_max = bands[:, 0], bands[:, 1]
+
+        ldz_codes, ldz_index = pd.factorize(pd.Series(ldz, dtype=object))
+        duration_codes, duration_values = pd.factorize(pd.Series(duration, dtype=float), sort=True)
+        band = np.searchsorted(band_min, mins)
+        any_duration = len(duration_values)
+        shape = (len(ldz_index), 2, any_duration + 1, len(band_min))
+        cube = np.full(shape, -1, dtype=np.int32)
+
+        keep = ldz_codes >= 0
+        carbon = np.asarray(carbon, dtype=np.int64)
+        for durations in (duration_codes, np.full(len(rows), any_duration)):
+            placed = keep & (durations >= 0)
+            cells = np.ravel_multi_index(
+                (ldz_codes[placed], carbon[placed], durations[placed], band[placed]), shape
+            )
+            # np.unique returns first occurrences, i.e. the earliest file row per cell
+            cells, first = np.unique(cells, return_index=True)
+            cube.flat[cells] = np.asarray(rows)[placed][first]
+
+        durations = {value: i for i, value in enumerate(duration_values)}
+        return cls(ldz_index, durations, band_min, band_max, cube)
+
+    @property
+    def nbytes(self):
+        return self.cube.nbytes + self.band_min.nbytes + self.band_max.nbytes
+
+    def _duration(self, duration):
+        if duration is None:
+            return len(self.durations)
+        return self.durations.get(float(duration), -1)
+
+    def lookup(self, ldz, carbon, aq, duration=None):
+        """Position of the first tariff row for this site, or None."""
+        if np.isnan(aq):
+            return None
+        l = self.ldz_codes.get(ldz, -1)
+        d = self._duration(duration)
+        j = np.searchsorted(self.band_min, aq, side="right") - 1
+        if l < 0 or d < 0 or j < 0 or aq > self.band_max[j]:
+            return None
+        position = self.cube[l, int(bool(carbon)), d, j]
+        return None if position < 0 else int(position)
+
+    def lookup_many(self, ldzs, carbon, aqs, duration=None):
+        """Positions for many sites at once, -1 where unmatched."""
+        aqs = np.asarray(aqs, dtype=float)
+        positions = np.full(len(aqs), -1, dtype=np.int64)
+        d = self._duration(duration)
+        if d < 0 or not len(self.band_min):
+            return positions
+        l = self.ldz_index.get_indexer(pd.Index(np.asarray(ldzs, dtype=object)))
+        j = np.searchsorted(self.band_min, aqs, side="right") - 1
+        found = (l >= 0) & (j >= 0)
+        found[found] = aqs[found] <= self.band_max[j[found]]
+        positions[found] = self.cube[l[found], int(bool(carbon)), d, j[found]]
+        return positions
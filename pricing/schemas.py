@@ -0,0 +1,124 @@
+# Columns each app parses from a flat file, with dtype hints (None = infer).
+# A schema with "drop_unnamed" keeps every column except blank "Unnamed: n" ones.
+# "upper" lists flag columns normalised to stripped upper case once at ingest.
+# "tariff" marks supplier tariff files, which are snapshotted to the tariff store.
+
+_GAS_PRICE_LIST_COLUMNS = {
+    "Broker_ID": "category",
+    "Production_Date": None,
+    "Utility": "category",
+    "LDZ": "category",
+    "Exit_Zone": "category",
+    "Sale_Type": "category",
+    "Contract_Duration": None,
+    "Minimum_Annual_Consumption": None,
+    "Maximum_Annual_Consumption": None,
+    "Minimum_Contract_Start_Date": None,
+    "Maximum_Contract_Start_Date": None,
+    "Minimum_Valid_Quote_Date": None,
+    "Maximum_Valid_Quote_Date": None,
+    "Product_Name": "category",
+    "Carbon_Offset": "category",
+    "Unit_Rate": "float64",
+    "Standing_Charge": "float64",
+}
+
+SCHEMAS = {
+    # Gas102-Gas105 and batch_price.py: the price list columns plus base rates
+    "gas_price_list": {"columns": _GAS_PRICE_LIST_COLUMNS, "tariff": True},
+    # Gas100 exports whatever the supplier sends, minus the blank columns 17-29
+    "gas_csv": {"drop_unnamed": True},
+    # Direct site pricing
+    "gas_direct": {"columns": {
+        "LDZ": "category",
+        "Contract_Duration": None,
+        "Minimum_Annual_Consumption": None,
+        "Maximum_Annual_Consumption": None,
+        "Minimum_Contract_Start_Date": None,
+        "Maximum_Contract_Start_Date": None,
+        "Minimum_Valid_Quote_Date": None,
+        "Maximum_Valid_Quote_Date": None,
+        "Product_Name": "category",
+        "Carbon_Offset": None,
+        "Unit_Rate": "float64",
+        "Standing_Charge": "float64",
+    }, "tariff": True},
+    # Direct bulk site lists; uplift columns are optional and default to 0
+    "direct_sites": {"columns": {
+        "MPRN": "string",
+        "Site_Name": "string",
+        "AQ": "float64",
+        "Postcode": "string",
+        "Standing_Uplift": "float64",
+        "Unit_Uplift": "float64",
+    }},
+    # NHH10, NHHcost1 and HH4
+    "nhh": {"columns": {
+        "Rate_Structure": "category",
+        "Contract_Duration": None,
+        "Minimum_Annual_Consumption": None,
+        "Maximum_Annual_Consumption": None,
+        "Green_Energy": "category",
+        "Standing_Charge": "float64",
+        "Day_Rate": "float64",
+        "Night_Rate": "float64",
+        "Evening_And_Weekend_Rate": "float64",
+    }, "upper": ["Rate_Structure", "Green_Energy"], "tariff": True},
+    # NHHcost1 customer EAC distributions; splits and Customers are optional
+    "nhh_customers": {"columns": {
+        "EAC": "float64",
+        "Day_Split": "float64",
+        "Night_Split": "float64",
+        "Evening_And_Weekend_Split": "float64",
+        "Customers": "float64",
+    }},
+    # HH4 half-hourly profiles: long (MPAN, Timestamp, kWh) or wide (MPAN, Date, HH01-HH48)
+    "hh_profile": {"columns": {
+        "MPAN": "string",
+        "Timestamp": None,
+        "kWh": "float64",
+        "Date": None,
+        **{f"HH{period:02d}": "float64" for period in range(1, 49)},
+    }},
+}
+
+
+# Every column some tariff schema uses: what a tariff snapshot holds
+TARIFF_COLUMNS = {
+    column for schema in SCHEMAS.values() if schema.get("tariff") for column in schema["columns"]
+}
+
+
+def is_unnamed(column):
+    return str(column).strip().lower().startswith("unnamed")
+
+
+def column_filter(schema):
+    """usecols callable for pd.read_excel / pd.read_csv."""
+    columns = schema.get("columns")
+
+    def keep(column):
+        if columns is not None and column not in columns:
+            return False
+        return not (schema.get("drop_unnamed") and is_unnamed(column))
+
+    return keep
+
+
+def dtype_hints(schema):
+    return {column: dtype for column, dtype in (schema.get("columns") or {}).items() if dtype}
+
+
+def apply_schema(df, schema):
+    """Restrict an already parsed frame to the schema and apply its dtype hints."""
+    df = df[[column for column in df.columns if column_filter(schema)(column)]]
+    hints = {
+        column: dtype for column, dtype in dtype_hints(schema).items()
+        if column in df.columns and str(df[column].dtype) != dtype
+    }
+    df = df.astype(hints) if hints else df
+    flags = {
+        column: df[column].str.strip().str.upper().astype("category")
+        for column in schema.get("upper", ()) if column in df.columns
+    }
+    return df.assign(**flags) if flags else df
@@ -0,0 +1,331 @@
+import heapq
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from pricing.cache import SizedLRUCache
+from pricing.dates import blank, parse_dates
+from pricing.rate_card import RateCard
+from pricing.uplifts import carbon_mask
+
+# Built indexes kept per process, keyed by tariff content hash
+MAX_INDEX_BYTES = 64 * 1024 ** 2
+
+# Inclusive date windows of a Direct tariff row: contract start, then quote date
+START_COLUMNS = ("Minimum_Contract_Start_Date", "Maximum_Contract_Start_Date")
+QUOTE_COLUMNS = ("Minimum_Valid_Quote_Date", "Maximum_Valid_Quote_Date")
+EPOCH = pd.Timestamp("1970-01-01")
+EPOCH_ORDINAL = EPOCH.toordinal()
+# Rate cards kept per index, one per (contract start, quote date) pair looked up
+MAX_RATE_CARDS = 16
+# Cells of one key's dense window table (int32, so 4 bytes each); keys with
+# more distinct AQ, start and quote bounds search their rows instead
+MAX_WINDOW_CELLS = 2 * 1024 ** 2
+
+
+def day_numbers(values, missing):
+    """Dates as float day numbers since EPOCH.
+
+    Blank bounds are open-ended and take the value missing; text that is
+    not a date is NaN, which never compares true, so its row never matches.
+    """
+    days = (parse_dates(values).dt.normalize() - EPOCH).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    return np.where(blank(values), missing, days)
+
+
+def day_number(value):
+    """Day number of a date, datetime or date string such as "today"."""
+    if isinstance(value, date):
+        return float(value.toordinal() - EPOCH_ORDINAL)
+    return float(np.datetime64(value, "D").astype(np.int64))
+
+
+def _segment_starts(mins, maxs):
+    # A segment starts at every minimum and just after every maximum
+    return np.unique(np.concatenate([mins, np.nextafter(maxs, np.inf)]))
+
+
+class TariffIndex:
+    """(LDZ, carbon) -> AQ interval lookup over a supplier tariff file.
+
+    Regular files, whose rows fall into shared non-overlapping AQ bands, are
+    served from RateCard cubes: one for undated lookups and one per contract
+    start and quote date pair, built from the rows open on those dates.
+    Lookups are then integer indexing and return the same rows as below.
+
+    For irregular files each (LDZ, carbon) key holds the sorted start points of the elementary AQ segments
+    formed by its rows' inclusive [Minimum, Maximum]_Annual_Consumption
+    bounds, and for every segment the first file row covering it. A site
+    lookup is one dict access plus one binary search and returns the same
+    row as filtering the file with masks and taking iloc[0].
+
+    When the file carries contract start and quote validity dates, each key
+    also holds `windows`: the elementary segments of the AQ, start date and
+    quote date axes and a 3-D table of the first row covering each cell, so
+    a dated lookup is three binary searches. Keys whose table would exceed
+    MAX_WINDOW_CELLS keep their rows' bounds in `boxes` instead: a lookup
+    filters those rows by date and takes the first covering the AQ.
+    """
+
+    def __init__(self, df, ldz_col="LDZ", carbon_col="Carbon_Offset",
+                 min_col="Minimum_Annual_Consumption", max_col="Maximum_Annual_Consumption",
+                 duration_col="Contract_Duration"):
+        mins = df[min_col].to_numpy(dtype=float)
+        maxs = df[max_col].to_numpy(dtype=float)
+        keys = pd.DataFrame({
+            "ldz": df[ldz_col].astype(object).to_numpy(),
+            "carbon": carbon_mask(df, carbon_col),
+        })
+        valid = ~(np.isnan(mins) | np.isnan(maxs))
+
+        self.dated = dated = all(column in df.columns for column in START_COLUMNS + QUOTE_COLUMNS)
+        bounds = [mins, maxs]
+        self.bad_dates = 0
+        if dated:
+            bounds += [
+                day_numbers(df[column], missing)
+                for column, missing in zip(START_COLUMNS + QUOTE_COLUMNS, [-np.inf, np.inf] * 2)
+            ]
+            # Rows with a date that doesn't parse are left out rather than left open
+            undated = np.isnan(bounds[2:]).any(axis=0)
+            self.bad_dates = int((valid & undated).sum())
+            valid &= ~undated
+            quote_min, quote_max = bounds[4][np.isfinite(bounds[4])], bounds[5][np.isfinite(bounds[5])]
+            self.quote_window = (
+                EPOCH + pd.Timedelta(days=quote_min.min()) if len(quote_min) else None,
+                EPOCH + pd.Timedelta(days=quote_max.max()) if len(quote_max) else None,
+            )
+        else:
+            self.quote_window = None
+
+        self.segments = {}
+        self.windows = {}
+        self.boxes = {}
+        self.rate_cards = {}
+        self._lock = threading.Lock()
+        self._columns = None
+
+        if duration_col in df.columns:
+            duration = pd.to_numeric(df[duration_col], errors="coerce").to_numpy(dtype=float)
+        else:
+            duration = np.full(len(df), np.nan)
+        columns = (keys["ldz"].to_numpy(), keys["carbon"].to_numpy(), duration, bounds)
+        card = self._build_card(columns, valid)
+        if card is not None:
+            self._columns = columns
+            self._valid = valid
+            self.rate_cards[None] = card
+            return
+
+        for key, positions in keys[valid].groupby(["ldz", "carbon"], sort=False).indices.items():
+            rows = np.flatnonzero(valid)[positions]
+            self.segments[key] = self._build(mins[rows], maxs[rows], rows)
+            if dated:
+                key_bounds = [bound[rows] for bound in bounds]
+                windows = self._build_windows(key_bounds, rows)
+                if windows is None:
+                    self.boxes[key] = (key_bounds, rows)
+                else:
+                    self.windows[key] = windows
+
+    @staticmethod
+    def _build_windows(bounds, rows):
+        axes = [_segment_starts(lo, hi) for lo, hi in zip(bounds[::2], bounds[1::2])]
+        if np.prod([len(axis) for axis in axes], dtype=float) > MAX_WINDOW_CELLS:
+            return None
+        first = np.full([len(axis) for axis in axes], -1, dtype=np.int32)
+        lows = [np.searchsorted(axis, lo) for axis, lo in zip(axes, bounds[::2])]
+        highs = [np.searchsorted(axis, np.nextafter(hi, np.inf)) for axis, hi in zip(axes, bounds[1::2])]
+        # Fill each row's box in reverse file order so the first covering row wins
+        for r in range(len(rows) - 1, -1, -1):
+            first[lows[0][r]:highs[0][r], lows[1][r]:highs[1][r], lows[2][r]:highs[2][r]] = rows[r]
+        return axes, first
+
+    @staticmethod
+    def _build_card(columns, rows):
+        ldz, carbon, duration, bounds = columns
+        rows = np.flatnonzero(rows)
+        return RateCard.build(ldz[rows], carbon[rows], duration[rows], bounds[0][rows], bounds[1][rows], rows)
+
+    @staticmethod
+    def _build(mins, maxs, rows):
+        starts = _segment_starts(mins, maxs)
+        first = np.full(len(starts), -1, dtype=np.int64)
+        lows = np.searchsorted(starts, mins)
+        highs = np.searchsorted(starts, np.nextafter(maxs, np.inf))
+        # Sweep the segments in order with a heap of the rows covering the
+        # current one; rows are in file order, so the smallest is the first
+        order = np.argsort(lows, kind="stable").tolist()
+        lows, highs = lows.tolist(), highs.tolist()
+        covering = []
+        k = 0
+        for j in range(len(starts)):
+            while k < len(order) and lows[order[k]] <= j:
+                heapq.heappush(covering, order[k])
+                k += 1
+            while covering and highs[covering[0]] <= j:
+                heapq.heappop(covering)
+            if covering:
+                first[j] = rows[covering[0]]
+        return starts, first
+
+    @staticmethod
+    def _open_rows(entry, start, quote):
+        """Bounds and positions of a boxes entry's rows open on these dates."""
+        bounds, rows = entry
+        open_rows = (bounds[2] <= start) & (start <= bounds[3]) & (bounds[4] <= quote) & (quote <= bounds[5])
+        return bounds[0][open_rows], bounds[1][open_rows], rows[open_rows]
+
+    @property
+    def nbytes(self):
+        flat = sum(starts.nbytes + first.nbytes for starts, first in self.segments.values())
+        dated = sum(
+            first.nbytes + sum(axis.nbytes for axis in axes) for axes, first in self.windows.values()
+        ) + sum(
+            rows.nbytes + sum(bound.nbytes for bound in bounds) for bounds, rows in self.boxes.values()
+        )
+        cards = MAX_RATE_CARDS * max((card.nbytes for card in self.rate_cards.values()), default=0)
+        if self._columns is not None:
+            ldz, carbon, duration, bounds = self._columns
+            cards += ldz.nbytes + carbon.nbytes + duration.nbytes + sum(bound.nbytes for bound in bounds)
+        return flat + dated + cards
+
+    def _dated(self, start_date, quote_date):
+        """Day numbers to look up, or None for an AQ-only lookup."""
+        if start_date is None or not self.dated:
+            return None
+        return day_number(start_date), day_number("today" if quote_date is None else quote_date)
+
+    def rate_card(self, start_date=None, quote_date=None):
+        """RateCard of the rows open on these dates, or None for irregular files."""
+        if self._columns is None:
+            return None
+        dated = self._dated(start_date, quote_date)
+        card = self.rate_cards.get(dated)
+        if card is None:
+            rows = self._valid
+            if dated is not None:
+                start, quote = dated
+                bounds = self._columns[3]
+                rows = rows & (bounds[2] <= start) & (start <= bounds[3]) & (bounds[4] <= quote) & (quote <= bounds[5])
+            card = self._build_card(self._columns, rows)
+            with self._lock:
+                if len(self.rate_cards) >= MAX_RATE_CARDS:
+                    del self.rate_cards[next(key for key in self.rate_cards if key is not None)]
+                self.rate_cards[dated] = card
+        return card
+
+    def lookup(self, ldz, carbon, aq, start_date=None, quote_date=None):
+        """Position of the first tariff row for this site, or None.
+
+        Given a contract start date, the row must also accept that start and
+        be quotable on quote_date (default today).
+        """
+        card = self.rate_card(start_date, quote_date)
+        if card is not None:
+            return card.lookup(ldz, carbon, aq)
+
+        dated = self._dated(start_date, quote_date)
+        if dated is not None:
+            entry = self.windows.get((ldz, bool(carbon)))
+            if entry is None:
+                entry = self.boxes.get((ldz, bool(carbon)))
+                if entry is None:
+                    return None
+                mins, maxs, rows = self._open_rows(entry, *dated)
+                covering = np.flatnonzero((mins <= aq) & (aq <= maxs))
+                return int(rows[covering[0]]) if len(covering) else None
+            (aq_axis, start_axis, quote_axis), first = entry
+            cell = (
+                np.searchsorted(aq_axis, aq, side="right") - 1,
+                np.searchsorted(start_axis, dated[0], side="right") - 1,
+                np.searchsorted(quote_axis, dated[1], side="right") - 1,
+            )
+            if min(cell) < 0 or first[cell] < 0:
+                return None
+            return int(first[cell])
+
+        entry = self.segments.get((ldz, bool(carbon)))
+        if entry is None:
+            return None
+        starts, first = entry
+        j = np.searchsorted(starts, aq, side="right") - 1
+        if j < 0 or first[j] < 0:
+            return None
+        return int(first[j])
+
+    def lookup_many(self, ldzs, carbon, aqs, start_date=None, quote_date=None):
+        """Vectorised lookup for many sites: positions, -1 where unmatched.
+
+        With a rate card this is whole-array indexing; otherwise one binary
+        search per LDZ group, so a portfolio costs as many searchsorted calls
+        as it has distinct LDZs. Dates are shared by all sites and work as in
+        lookup.
+        """
+        card = self.rate_card(start_date, quote_date)
+        if card is not None:
+            return card.lookup_many(ldzs, carbon, aqs)
+
+        ldzs = np.asarray(ldzs, dtype=object)
+        aqs = np.asarray(aqs, dtype=float)
+        positions = np.full(len(aqs), -1, dtype=np.int64)
+        dated = self._dated(start_date, quote_date)
+        for ldz in pd.unique(ldzs):
+            sites = np.flatnonzero(ldzs == ldz)
+            if dated is not None and (ldz, bool(carbon)) in self.boxes:
+                # AQ segments of just the rows open on these dates
+                starts, first = self._build(*self._open_rows(self.boxes[ldz, bool(carbon)], *dated))
+            elif dated is not None:
+                entry = self.windows.get((ldz, bool(carbon)))
+                if entry is None:
+                    continue
+                axes, first = entry
+                start, quote = (int(np.searchsorted(axis, value, side="right")) - 1
+                                for axis, value in zip(axes[1:], dated))
+                if start < 0 or quote < 0:
+                    continue
+                starts, first = axes[0], first[:, start, quote]
+            else:
+                entry = self.segments.get((ldz, bool(carbon)))
+                if entry is None:
+                    continue
+                starts, first = entry
+            j = np.searchsorted(starts, aqs[sites], side="right") - 1
+            found = j >= 0
+            positions[sites[found]] = first[j[found]]
+        return positions
+
+
+index_cache = SizedLRUCache(MAX_INDEX_BYTES, sizeof=lambda index: index.nbytes)
+
+
+def tariff_index(df):
+    """TariffIndex for a frame from read_flat_file, built once per tariff file."""
+    digest = df.attrs.get("content_hash")
+    if digest is None:
+        return TariffIndex(df)
+    return index_cache.get_or_build(digest, lambda: TariffIndex(df))
+
+
+def date_warning(index):
+    """Message when tariff rows were left out for dates that don't parse."""
+    if not index.bad_dates:
+        return None
+    return (
+        f"{index.bad_dates:,} tariff row(s) have contract start or quote dates that can't be read "
+        "and will never match; check those columns in the tariff file."
+    )
+
+
+def quote_warning(index, quote_date=None):
+    """Message when quote_date (default today) falls outside every quote window."""
+    if index.quote_window is None:
+        return None
+    first, last = index.quote_window
+    day = pd.Timestamp("today" if quote_date is None else quote_date).normalize()
+    if (first is None or first <= day) and (last is None or day <= last):
+        return None
+    span = " – ".join(f"{bound:%d/%m/%Y}" if bound is not None else "open" for bound in (first, last))
+    return f"Quotes in this tariff file are valid {span}; sites will only match inside that window."
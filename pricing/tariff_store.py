@@ -0,0 +1,102 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from pricing.dates import parse_dates
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # snapshots are an optimisation, Excel parsing still works
+    pa = None
+    feather = None
+
+# Uncompressed Arrow IPC files so snapshots can be memory-mapped on reload
+STORE_DIR = Path(os.environ.get("TARIFF_STORE_DIR", Path(__file__).resolve().parent.parent / "tariff_store"))
+# Snapshots kept on disk; loading one marks it as recently used
+MAX_SNAPSHOTS = 32
+
+
+def available():
+    return feather is not None
+
+
+def production_date(df):
+    if "Production_Date" not in df.columns or df.empty:
+        return "undated"
+    value = parse_dates(df["Production_Date"].iloc[:1]).iloc[0]
+    return "undated" if pd.isna(value) else value.strftime("%Y-%m-%d")
+
+
+def snapshot_path(digest):
+    matches = sorted(STORE_DIR.glob(f"*_{digest}.arrow"))
+    return matches[0] if matches else None
+
+
+def _evict():
+    """Remove the least recently used snapshots beyond MAX_SNAPSHOTS."""
+    snapshots = []
+    for path in STORE_DIR.glob("*_*.arrow"):
+        try:
+            snapshots.append((path.stat().st_mtime, path))
+        except FileNotFoundError:  # evicted by another session
+            pass
+    for _, path in sorted(snapshots, reverse=True)[MAX_SNAPSHOTS:]:
+        path.unlink(missing_ok=True)
+
+
+def load(digest, columns=None):
+    """Read the snapshot for this content hash, or None if there isn't one.
+
+    The file is memory-mapped, so only the requested columns are read from
+    disk, but to_pandas still copies them into the returned frame.
+    """
+    if not available():
+        return None
+    path = snapshot_path(digest)
+    if path is None:
+        return None
+    try:
+        if columns is not None:
+            # Only read the requested columns this snapshot actually has
+            with pa.memory_map(str(path)) as source:
+                stored = pa.ipc.open_file(source).schema.names
+            columns = [column for column in columns if column in stored]
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        path.touch()
+    except FileNotFoundError:  # evicted since snapshot_path found it
+        return None
+    df = table.to_pandas()
+    df.attrs["content_hash"] = digest
+    return df
+
+
+def save(df, digest):
+    """Write a snapshot once per content hash; returns its path or None."""
+    if not available():
+        return None
+    existing = snapshot_path(digest)
+    if existing is not None:
+        return existing
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        # Mixed-type object columns can't be stored, keep using Excel for this file
+        return None
+
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    path = STORE_DIR / f"{production_date(df)}_{digest}.arrow"
+    # Write to a temp file first so concurrent sessions never see a partial snapshot
+    fd, tmp = tempfile.mkstemp(dir=STORE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _evict()
+    return path
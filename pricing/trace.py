@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from pricing.tariff_index import QUOTE_COLUMNS, START_COLUMNS, day_number, day_numbers
+from pricing.uplifts import carbon_mask
+
+# Filters applied to the tariff file, in order; the last two only for dated lookups
+STAGES = ("LDZ", "Carbon", "AQ band", "Contract start", "Quote date")
+TRACE_COLUMNS = (
+    ["Site", "Postcode", "Outcode", "LDZ Found", "Matched By", "Straddles LDZ", "AQ (kWh)"]
+    + list(STAGES)
+    + ["Row", "Standing_Charge", "Unit_Rate", "Result"]
+)
+
+
+class MatchTrace:
+    """Compact per-site record of how Direct sites were matched to tariff rows.
+
+    Each record holds the postcode, outcode, resolved LDZ, how many tariff
+    rows remain after each filter in STAGES and the chosen row (position
+    and rates), rather than the intermediate frames. The tariff columns
+    the counts need are extracted on the first record only, and a disabled
+    trace returns straight away, so tracing off costs one method call per
+    site.
+    """
+
+    def __init__(self, tariff_df, enabled=True):
+        self.tariff_df = tariff_df
+        self.enabled = enabled
+        self.records = []
+        self._columns = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _tariff_columns(self):
+        if self._columns is None:
+            df = self.tariff_df
+            self._columns = {
+                "ldz": df["LDZ"].astype(object).to_numpy(),
+                "carbon": carbon_mask(df),
+                "min": df["Minimum_Annual_Consumption"].to_numpy(dtype=float),
+                "max": df["Maximum_Annual_Consumption"].to_numpy(dtype=float),
+            }
+            if all(column in df.columns for column in START_COLUMNS + QUOTE_COLUMNS):
+                self._columns["dates"] = [
+                    day_numbers(df[column], missing)
+                    for column, missing in zip(START_COLUMNS + QUOTE_COLUMNS, [-np.inf, np.inf] * 2)
+                ]
+        return self._columns
+
+    def _candidates(self, ldz, carbon, aq, start_date, quote_date):
+        """Rows left after each filter stage, as {stage: count}."""
+        columns = self._tariff_columns()
+        mask = columns["ldz"] == ldz
+        counts = {"LDZ": int(mask.sum())}
+        mask &= columns["carbon"] == bool(carbon)
+        counts["Carbon"] = int(mask.sum())
+        mask &= (columns["min"] <= aq) & (columns["max"] >= aq)
+        counts["AQ band"] = int(mask.sum())
+        if start_date is not None and "dates" in columns:
+            start_min, start_max, quote_min, quote_max = columns["dates"]
+            start = day_number(start_date)
+            quote = day_number("today" if quote_date is None else quote_date)
+            mask &= (start_min <= start) & (start <= start_max)
+            counts["Contract start"] = int(mask.sum())
+            mask &= (quote_min <= quote) & (quote <= quote_max)
+            counts["Quote date"] = int(mask.sum())
+        return counts
+
+    def record(self, site_name, postcode, outcode, ldz, level, aq, carbon, position,
+               start_date=None, quote_date=None, straddles=False):
+        """Add one site's match; ldz and position are None when unmatched."""
+        if not self.enabled:
+            return
+        record = {
+            "Site": site_name,
+            "Postcode": postcode,
+            "Outcode": outcode,
+            "LDZ Found": ldz,
+            "Matched By": level,
+            "Straddles LDZ": straddles,
+            "AQ (kWh)": aq,
+        }
+        if ldz is not None:
+            record.update(self._candidates(ldz, carbon, aq, start_date, quote_date))
+        if position is not None:
+            match = self.tariff_df.iloc[position]
+            record.update({
+                "Row": position,
+                "Standing_Charge": match["Standing_Charge"],
+                "Unit_Rate": match["Unit_Rate"],
+            })
+        record["Result"] = "Matched" if position is not None else ("No Match" if ldz is not None else "No LDZ")
+        self.records.append(record)
+
+    def to_frame(self):
+        """One row per traced site; stages a site never reached are blank."""
+        frame = pd.DataFrame(self.records, columns=TRACE_COLUMNS)
+        # Dated stages only apply when a contract start date was looked up
+        unused = [stage for stage in STAGES[3:] if frame[stage].isna().all()]
+        counts = {column: frame[column].astype("Int64") for column in list(STAGES) + ["Row"]}
+        return frame.assign(**counts).drop(columns=unused)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+CARBON_TRUE = ["yes", "y", "true", "1"]
+
+# Band input fields holding the uplifts for standard (False) and carbon (True) rows
+UPLIFT_FIELDS = {
+    False: ("Standard_Unit", "Standard_Standing"),
+    True: ("Carbon_Unit", "Carbon_Standing"),
+}
+
+
+def carbon_mask(df, column="Carbon_Offset"):
+    """Boolean array, True where the row is a carbon neutral product."""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[column].astype(str).str.strip().str.lower().isin(CARBON_TRUE).to_numpy()
+
+
+def duration_labels(df, column="Contract_Duration"):
+    """Duration label ("1 Year", "2 Year" or "3 Year") per row, as in the band dropdowns."""
+    if column not in df.columns:
+        return np.full(len(df), "3 Year", dtype=object)
+    raw = df[column].astype(str).str.strip().str.lower()
+    return np.select(
+        [raw.str.contains("1", regex=False), raw.str.contains("2", regex=False)],
+        ["1 Year", "2 Year"],
+        "3 Year",
+    ).astype(object)
+
+
+def assign_bands(consumption, bands, fallback_last=True):
+    """Index of the band each consumption falls in (-1 if none).
+
+    Bands are dicts with inclusive "Min"/"Max" and must be sorted by "Min".
+    With fallback_last, unmatched rows go to the last band like the
+    original next(..., band_inputs[-1]) lookup.
+    """
+    mins = np.array([b["Min"] for b in bands], dtype=float)
+    maxs = np.array([b["Max"] for b in bands], dtype=float)
+    values = np.asarray(consumption, dtype=float)
+
+    idx = np.searchsorted(mins, values, side="right") - 1
+    safe = np.clip(idx, 0, len(bands) - 1)
+    matched = (idx >= 0) & (values <= maxs[safe])
+
+    return np.where(matched, safe, len(bands) - 1 if fallback_last else -1)
+
+
+def lookup_uplifts(band_inputs, band_idx, carbon, durations=None):
+    """Unit and standing uplift arrays for rows already assigned to bands.
+
+    When durations is given, a row only takes its band's uplift if the
+    band's "Duration" selection matches the row; otherwise it gets 0.
+    """
+    if durations is not None:
+        chosen = np.array([b["Duration"] for b in band_inputs] + [None], dtype=object)
+        band_idx = np.where(chosen[band_idx] == durations, band_idx, -1)
+
+    # Lookup tables with a trailing zero row for unmatched bands (index -1)
+    def table(field):
+        return np.array([b[field] for b in band_inputs] + [0.0], dtype=float)
+
+    unit = np.where(carbon, table("Carbon_Unit")[band_idx], table("Standard_Unit")[band_idx])
+    standing = np.where(carbon, table("Carbon_Standing")[band_idx], table("Standard_Standing")[band_idx])
+    return unit, standing
+
+
+def band_uplifts(df, band_inputs, consumption_col="Minimum_Annual_Consumption",
+                 carbon_col="Carbon_Offset", duration_col=None, fallback_last=True):
+    """Uplift_Unit / Uplift_Standing for every row of the flat file."""
+    band_idx = assign_bands(df[consumption_col], band_inputs, fallback_last)
+    durations = duration_labels(df, duration_col) if duration_col else None
+    unit, standing = lookup_uplifts(band_inputs, band_idx, carbon_mask(df, carbon_col), durations)
+
+    return pd.DataFrame({"Uplift_Unit": unit, "Uplift_Standing": standing}, index=df.index)
+
+
+class IncrementalPricer:
+    """Priced copy of a flat file that only reprices rows whose band inputs changed.
+
+    Rows are grouped once by (consumption band, carbon flag). Each call to
+    price() recomputes the uplifts of the groups whose uplifts or duration
+    changed since the previous call and hands those row positions to
+    price_rows(df, rows) to refresh the derived rate and cost columns.
+    """
+
+    def __init__(self, df, price_rows, consumption_col="Minimum_Annual_Consumption",
+                 carbon_col="Carbon_Offset", duration_col=None, fallback_last=True):
+        self.df = df.reset_index(drop=True)
+        self.tariff_hash = df.attrs.get("content_hash")
+        self.price_rows = price_rows
+        self.consumption_col = consumption_col
+        self.fallback_last = fallback_last
+        self.carbon = carbon_mask(self.df, carbon_col)
+        self.durations = duration_labels(self.df, duration_col) if duration_col else None
+        self.band_inputs = None
+        self.band_idx = None
+        self.groups = {}
+        self.last_rows_priced = 0
+
+    def _index(self, band_inputs):
+        self.band_idx = assign_bands(self.df[self.consumption_col], band_inputs, self.fallback_last)
+        self.groups = {
+            (i, carbon): np.flatnonzero((self.band_idx == i) & (self.carbon == carbon))
+            for i in range(len(band_inputs))
+            for carbon in UPLIFT_FIELDS
+        }
+
+    def _changed_rows(self, band_inputs):
+        parts = []
+        for i, (new, old) in enumerate(zip(band_inputs, self.band_inputs)):
+            duration_changed = new.get("Duration") != old.get("Duration")
+            for carbon, fields in UPLIFT_FIELDS.items():
+                if duration_changed or any(new[f] != old[f] for f in fields):
+                    parts.append(self.groups[(i, carbon)])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=int)
+
+    def price(self, band_inputs):
+        limits = [(b["Min"], b["Max"]) for b in band_inputs]
+        if self.band_inputs is None or limits != [(b["Min"], b["Max"]) for b in self.band_inputs]:
+            self._index(band_inputs)
+            rows = np.arange(len(self.df))
+        else:
+            rows = self._changed_rows(band_inputs)
+
+        if len(rows):
+            durations = self.durations[rows] if self.durations is not None else None
+            unit, standing = lookup_uplifts(band_inputs, self.band_idx[rows], self.carbon[rows], durations)
+            self.df.loc[rows, "Uplift_Unit"] = unit
+            self.df.loc[rows, "Uplift_Standing"] = standing
+            self.price_rows(self.df, rows)
+
+        self.band_inputs = [dict(b) for b in band_inputs]
+        self.last_rows_priced = len(rows)
+        return self.df
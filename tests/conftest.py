@@ -0,0 +1,29 @@
+import io
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+# Shared pricing helpers live in the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pricing import ingest, tariff_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    """Empty tariff store and ingest cache for every test."""
+    monkeypatch.setattr(tariff_store, "STORE_DIR", tmp_path / "tariff_store")
+    ingest.frame_cache.clear()
+    return tmp_path / "tariff_store"
+
+
+def xlsx(rows):
+    """Workbook bytes with rows (header first) on the first sheet."""
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,92 @@
+import json
+
+import pandas as pd
+import pytest
+
+import batch_price
+from benchmarks.synthetic import flat_file
+from pricing.export import xlsx_bytes
+from pricing.price_list import BANDS, PRICE_LIST_COLUMNS, load_band_inputs, price_list
+
+
+def uplifts(unit=0.5):
+    return [
+        {"Standard_Unit": unit * i, "Standard_Standing": 2.0 * i, "Carbon_Unit": unit * i + 0.1, "Carbon_Standing": 3}
+        for i in range(1, len(BANDS) + 1)
+    ]
+
+
+def write_json(path, config):
+    path.write_text(json.dumps(config))
+    return path
+
+
+def test_load_band_inputs_fills_band_limits_and_missing_uplifts(tmp_path):
+    config = uplifts()
+    del config[2]["Carbon_Unit"]
+    config[6]["Max"] = 999999
+    inputs = load_band_inputs(write_json(tmp_path / "uplifts.json", {"bands": config}))
+
+    assert [(band["Min"], band["Max"]) for band in inputs[:6]] == [(b["Min"], b["Max"]) for b in BANDS[:6]]
+    assert inputs[6]["Max"] == 999999
+    assert inputs[2]["Carbon_Unit"] == 0.0
+    assert inputs[0]["Standard_Unit"] == 0.5
+    # A bare list of bands works too
+    assert load_band_inputs(write_json(tmp_path / "list.json", config)) == inputs
+
+
+@pytest.mark.parametrize("config, message", [
+    ({"bands": uplifts()[:6]}, "expected 7 bands, found 6"),
+    ({"band": uplifts()}, 'one under "bands"'),
+    ({"bands": {"Standard_Unit": 0.5}}, 'one under "bands"'),
+    ({"bands": uplifts()[:6] + [0.5]}, "band 7 is not an object"),
+    ({"bands": uplifts()[:3] + [{"Standard_unit": 0.5}] + uplifts()[4:]}, r"band 4 has unknown key\(s\) Standard_unit"),
+    ({"bands": [{**band, "Carbon_Standing": "5p"} for band in uplifts()]}, "band 1 Carbon_Standing must be a number"),
+])
+def test_load_band_inputs_rejects_bad_configs(tmp_path, config, message):
+    path = write_json(tmp_path / "uplifts.json", config)
+
+    with pytest.raises(ValueError, match=message):
+        load_band_inputs(path)
+
+
+def test_main_prices_a_manifest(tmp_path, capsys):
+    week = tmp_path / "week"
+    week.mkdir()
+    df = flat_file(60)
+    (week / "supplier.xlsx").write_bytes(xlsx_bytes(df))
+    write_json(week / "broker_a.json", {"bands": uplifts(0.5)})
+    write_json(week / "broker_b.json", uplifts(0.25))
+    write_json(week / "broken.json", {"bands": uplifts()[:2]})
+    pd.DataFrame({
+        "flat_file": ["supplier.xlsx", "supplier.xlsx", "supplier.xlsx"],
+        "config": ["broker_a.json", "broker_b.json", "broken.json"],
+        "output": ["out/broker_a.xlsx", "", ""],
+    }).to_csv(week / "manifest.csv", index=False)
+
+    status = batch_price.main(["--manifest", str(week / "manifest.csv"), "--workers", "1",
+                               "--output-dir", str(tmp_path / "lists")])
+
+    # The broken config fails on its own; the others are still written
+    assert status == 1
+    assert "FAILED" in capsys.readouterr().err
+    for output, config in [(week / "out" / "broker_a.xlsx", "broker_a.json"),
+                           (tmp_path / "lists" / "supplier_pricelist.xlsx", "broker_b.json")]:
+        got = pd.read_excel(output, sheet_name="PriceList")
+        expected = price_list(df, load_band_inputs(week / config))
+        assert list(got.columns) == PRICE_LIST_COLUMNS
+        assert len(got) == len(df)
+        for column in ["Unit Rate", "Standing Charge", "Total Annual Cost (£)"]:
+            assert got[column].tolist() == pytest.approx(expected[column].tolist())
+        assert got["LDZ"].tolist() == df["LDZ"].tolist()
+
+
+def test_main_needs_flat_files_or_a_manifest(tmp_path, capsys):
+    config = write_json(tmp_path / "uplifts.json", uplifts())
+
+    with pytest.raises(SystemExit):
+        batch_price.main(["--config", str(config)])
+    with pytest.raises(SystemExit):
+        batch_price.main(["--manifest", str(tmp_path / "manifest.csv"), "supplier.xlsx"])
+    with pytest.raises(SystemExit):
+        batch_price.main(["--config", str(config), "--manifest", str(tmp_path / "manifest.csv")])
@@ -0,0 +1,101 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pricing.cache import SizedLRUCache, config_key, frame_size
+
+
+def test_least_recently_used_values_are_evicted():
+    cache = SizedLRUCache(10)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"xxxx")
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == b"xxxx"
+    cache.put("c", b"xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"xxxx" and cache.get("c") == b"xxxx"
+    assert cache.size_bytes == 8
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "entries": 2, "size_mb": 8 / 1024 ** 2}
+
+
+def test_value_larger_than_the_cache_is_kept_alone():
+    cache = SizedLRUCache(10)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"x" * 25)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"x" * 25
+    assert cache.stats()["entries"] == 1
+    # The next value pushes it out again
+    cache.put("c", b"xx")
+    assert cache.get("b") is None and cache.stats()["evictions"] == 2
+
+
+def test_replacing_a_key_counts_its_new_size():
+    cache = SizedLRUCache(10)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"xxxx")
+    cache.put("a", b"xxxxxx")
+
+    assert cache.size_bytes == 10
+    assert cache.stats()["evictions"] == 0
+    cache.put("b", b"xxxxxx")
+    assert cache.get("a") is None and cache.size_bytes == 6
+
+
+def test_get_or_build_builds_on_a_miss_only():
+    cache = SizedLRUCache(100)
+    built = []
+
+    def build():
+        built.append(1)
+        return b"workbook"
+
+    assert cache.get_or_build("key", build) == b"workbook"
+    assert cache.get_or_build("key", build) == b"workbook"
+    assert len(built) == 1
+    cache.clear()
+    assert cache.get_or_build("key", build) == b"workbook"
+    assert len(built) == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_frames_are_sized_by_their_memory_use():
+    cache = SizedLRUCache(9000, sizeof=frame_size)
+    small = pd.DataFrame({"Unit_Rate": np.zeros(100)})
+    large = pd.DataFrame({"Unit_Rate": np.zeros(1000)})
+    cache.put("small", small)
+    cache.put("large", large)
+
+    assert frame_size(large) > 8000
+    assert cache.get("small") is None
+    assert cache.get("large") is large
+
+
+def test_concurrent_puts_stay_within_the_limit():
+    cache = SizedLRUCache(100)
+
+    def fill(worker):
+        for i in range(200):
+            cache.put((worker, i), b"x" * 10)
+            cache.get((worker, i - 1))
+
+    threads = [threading.Thread(target=fill, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.size_bytes <= 100
+    assert cache.stats()["entries"] == 10
+    assert cache.stats()["evictions"] == 4 * 200 - 10
+
+
+def test_config_key_is_stable_and_order_sensitive():
+    bands = [{"Min": 0, "Max": 24999, "Standard_Unit": 0.5}]
+
+    assert config_key(bands, True) == config_key([{"Min": 0, "Max": 24999, "Standard_Unit": 0.5}], True)
+    assert config_key(bands, True) != config_key(bands, False)
+    assert config_key("a", "b") != config_key("b", "a")
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.cost_stack import PRODUCT_COLUMNS, apply_cost_stack, cost_stacked_tariff
+from pricing.nhh import BANDS, price_book
+from pricing.schemas import SCHEMAS, apply_schema
+
+COSTS = {"bad_debt": 0.13, "billing_cost": 1.1, "customer_service": 0.7, "regulatory_cost": 0.35, "margin": 0.9}
+
+
+def flat_file(seed, n=300):
+    rng = np.random.default_rng(seed)
+    mins = rng.integers(0, 300000, n).astype(float)
+    return pd.DataFrame({
+        "Rate_Structure": "NHH",
+        "Contract_Duration": rng.choice([12, 24, 36], n),
+        "Minimum_Annual_Consumption": mins,
+        "Maximum_Annual_Consumption": mins + rng.integers(0, 60000, n),
+        "Green_Energy": rng.choice(["Yes", "No"], n),
+        "Standing_Charge": rng.random(n) * 50,
+        "Day_Rate": rng.random(n) * 30,
+        "Night_Rate": rng.random(n) * 20,
+        "Evening_And_Weekend_Rate": rng.random(n) * 25,
+    })
+
+
+def uplift_inputs(seed):
+    rng = np.random.default_rng(seed)
+    return [
+        {"min": low, "max": high, "uplift_standing": float(rng.random()), "uplift_day": float(rng.random()),
+         "uplift_night": float(rng.random()), "uplift_evw": float(rng.random())}
+        for low, high in BANDS
+    ]
+
+
+def nhhcost1_book(df, uplift_inputs, contract_duration, green_option, costs):
+    """The per-band cost stack loop NHHcost1 ran before apply_cost_stack."""
+    output_rows = []
+    for band in uplift_inputs:
+        filtered = df[
+            (df["Minimum_Annual_Consumption"] <= band["max"]) &
+            (df["Maximum_Annual_Consumption"] >= band["min"]) &
+            (df["Contract_Duration"] == contract_duration) &
+            ((df["Green_Energy"].str.upper() == "YES") if green_option == "Green"
+             else (df["Green_Energy"].str.upper() == "NO"))
+        ]
+        if filtered.empty:
+            output_rows.append([f"{band['min']:,} – {band['max']:,}"] + ["N/A"] * 5)
+            continue
+        row = filtered.iloc[0]
+        base_standing = (
+            row["Standing_Charge"] + costs["billing_cost"] + costs["customer_service"] + costs["regulatory_cost"]
+        )
+        base_day = row["Day_Rate"] + costs["bad_debt"] + costs["margin"]
+        base_night = row["Night_Rate"] + costs["bad_debt"] + costs["margin"]
+        base_evw = row["Evening_And_Weekend_Rate"] + costs["bad_debt"] + costs["margin"]
+        final_standing = base_standing + band["uplift_standing"]
+        final_day = base_day + band["uplift_day"]
+        final_night = base_night + band["uplift_night"]
+        final_evw = base_evw + band["uplift_evw"]
+        mid_consumption = (band["min"] + band["max"]) / 2
+        annual_cost = (mid_consumption * final_day / 100) + (365 * final_standing / 100)
+        output_rows.append([
+            f"{band['min']:,} – {band['max']:,}",
+            round(final_standing, 4), round(final_day, 4), round(final_night, 4), round(final_evw, 4),
+            round(annual_cost, 2),
+        ])
+    return output_rows
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("duration", [12, 24, 36])
+@pytest.mark.parametrize("tariff", ["Standard", "Green"])
+def test_price_book_on_cost_stack_matches_nhhcost1_loop(seed, duration, tariff):
+    raw = flat_file(seed, n=30 + 60 * seed)
+    bands = uplift_inputs(seed)
+
+    stacked = apply_cost_stack(apply_schema(raw, SCHEMAS["nhh"]), COSTS)
+    book = price_book(stacked, bands, duration, tariff == "Green", annual_cost=True)
+    assert book.values.tolist() == nhhcost1_book(raw, bands, duration, tariff, COSTS)
+
+
+def test_cost_stacked_tariff_adds_costs_to_every_row():
+    raw = flat_file(0)
+    published = cost_stacked_tariff(raw, COSTS)
+
+    assert list(published.columns[:len(PRODUCT_COLUMNS)]) == PRODUCT_COLUMNS
+    standing = raw["Standing_Charge"] + COSTS["billing_cost"] + COSTS["customer_service"] + COSTS["regulatory_cost"]
+    assert published["Supplier Standing Charge (p/day)"].tolist() == raw["Standing_Charge"].tolist()
+    assert published["Standing Charge (p/day)"].tolist() == standing.round(4).tolist()
+    for rate, column in [("Day_Rate", "Day Rate (p/kWh)"), ("Night_Rate", "Night Rate (p/kWh)"),
+                         ("Evening_And_Weekend_Rate", "Evening & Weekend Rate (p/kWh)")]:
+        assert published[column].tolist() == (raw[rate] + COSTS["bad_debt"] + COSTS["margin"]).round(4).tolist()
+
+
+def test_missing_costs_count_as_zero():
+    raw = flat_file(1)
+
+    pd.testing.assert_frame_equal(apply_cost_stack(raw, {}), raw)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.direct import compare_suppliers, price_sites
+from pricing.postcodes import PostcodeResolver
+from pricing.tariff_index import TariffIndex
+
+OUTCODES = [("AB10", "SC"), ("AB11", "SC"), ("M1", "NW"), ("M2", "NW")]
+SITES = [
+    # MPRN, site, AQ, postcode
+    ("1001", "Priced", 12000, "AB10 1AA"),
+    ("1002", "Priced, unspaced", 24999, "m11ae"),
+    ("1003", "Band edge", 25000, "AB11 6BB"),
+    ("1004", "No LDZ", 12000, "ZZ9 9ZZ"),
+    ("1005", "No Match", 10_000_000, "AB10 1AA"),
+    ("1006", "No postcode", 12000, ""),
+    ("1007", "No AQ", None, "M2 4WU"),
+    ("1008", "Zero AQ", 0, "M2 4WU"),
+    ("1009", "Text AQ", "n/a", "M2 4WU"),
+]
+
+
+@pytest.fixture
+def postcodes(tmp_path):
+    path = tmp_path / "postcodes.csv"
+    pd.DataFrame(OUTCODES, columns=["Outcode", "LDZ"]).to_csv(path, index=False)
+    return PostcodeResolver(path)
+
+
+def sites():
+    df = pd.DataFrame(SITES, columns=["MPRN", "Site_Name", "AQ", "Postcode"])
+    return df.assign(Standing_Uplift=[1.5] * 8 + [None], Unit_Uplift="0.25")
+
+
+def tariff(overlapping=False, seed=0):
+    """Direct tariff of both LDZs and carbon flags, open to quotes for decades."""
+    rows = []
+    for ldz in ["SC", "NW"]:
+        for carbon in ["Yes", "No"]:
+            for low, high in [(0, 24999), (25000, 73199), (73200, 731999)]:
+                for start_from, start_to in [("2025-01-01", "2026-06-30"), ("2026-07-01", "2027-12-31")]:
+                    rows.append((ldz, carbon, low, high, start_from, start_to))
+    df = pd.DataFrame(rows, columns=[
+        "LDZ", "Carbon_Offset", "Minimum_Annual_Consumption", "Maximum_Annual_Consumption",
+        "Minimum_Contract_Start_Date", "Maximum_Contract_Start_Date",
+    ])
+    if overlapping:
+        # Irregular file: bands overlap, so lookups use the window tables
+        df.loc[df["Minimum_Annual_Consumption"] == 25000, "Minimum_Annual_Consumption"] = 20000
+    rng = np.random.default_rng(seed)
+    return df.assign(
+        Minimum_Valid_Quote_Date="2020-01-01",
+        Maximum_Valid_Quote_Date="2099-12-31",
+        Contract_Duration=12,
+        Standing_Charge=rng.random(len(df)) * 50,
+        Unit_Rate=rng.random(len(df)) * 5,
+    )
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+@pytest.mark.parametrize("start_date", [None, "2026-03-01", "2027-01-15", "2030-01-01"])
+@pytest.mark.parametrize("carbon", [False, True])
+def test_price_sites_matches_lookup_per_site(postcodes, overlapping, start_date, carbon):
+    tariff_df = tariff(overlapping)
+    index = TariffIndex(tariff_df)
+    portfolio = price_sites(sites(), tariff_df, index, postcodes, carbon, start_date)
+
+    assert (index._columns is None) == overlapping
+    for site in portfolio.itertuples(index=False):
+        if site.Status in ("Incomplete", "No LDZ"):
+            continue
+        position = index.lookup(site.LDZ, carbon, site.AQ, start_date)
+        if position is None:
+            assert site.Status == "No Match"
+            assert np.isnan(site.Supplier_Unit) and np.isnan(site.Annual_Cost)
+            continue
+        row = tariff_df.iloc[position]
+        assert site.Status == "Priced"
+        assert site.Supplier_Standing == row["Standing_Charge"]
+        assert site.Supplier_Unit == row["Unit_Rate"]
+        assert site.Final_Standing == round(row["Standing_Charge"] + site.Standing_Uplift, 4)
+        assert site.Final_Unit == round(row["Unit_Rate"] + 0.25, 4)
+        assert site.Annual_Cost == round(
+            site.AQ * (row["Unit_Rate"] + 0.25) / 100 + 365 * (row["Standing_Charge"] + site.Standing_Uplift) / 100, 2
+        )
+
+
+def test_price_sites_statuses(postcodes):
+    tariff_df = tariff()
+    portfolio = price_sites(sites(), tariff_df, TariffIndex(tariff_df), postcodes, False, "2026-03-01")
+
+    assert portfolio["Status"].tolist() == ["Priced"] * 3 + ["No LDZ", "No Match"] + ["Incomplete"] * 4
+    assert portfolio["LDZ"].fillna("-").tolist() == ["SC", "NW", "SC", "-", "SC"] + ["-"] * 4
+    # Only priced sites carry rates; a missing uplift counts as 0
+    assert portfolio["Annual_Cost"].notna().tolist() == [True] * 3 + [False] * 6
+    assert portfolio["Standing_Uplift"].tolist()[-1] == 0.0
+    # No contract window covers 2030: every complete site is unmatched
+    later = price_sites(sites(), tariff_df, TariffIndex(tariff_df), postcodes, False, "2030-01-01")
+    assert later["Status"].tolist()[:5] == ["No Match"] * 3 + ["No LDZ", "No Match"]
+
+
+def suppliers():
+    """Three suppliers: one with no NW rows and one whose bands stop at 24,999."""
+    regular = tariff(seed=1)
+    no_nw = tariff(overlapping=True, seed=2)
+    no_nw = no_nw[no_nw["LDZ"] != "NW"].reset_index(drop=True)
+    small = tariff(seed=3)
+    small = small[small["Maximum_Annual_Consumption"] == 24999].reset_index(drop=True)
+    return {name: (df, TariffIndex(df)) for name, df in
+            [("Regular", regular), ("No NW", no_nw), ("Small", small)]}
+
+
+@pytest.mark.parametrize("start_date", [None, "2026-03-01", "2030-01-01"])
+def test_compare_suppliers_matches_price_sites(postcodes, start_date):
+    tariffs = suppliers()
+    matrix, totals = compare_suppliers(sites(), tariffs, postcodes, False, start_date)
+
+    costs = pd.DataFrame({
+        name: price_sites(sites(), df, index, postcodes, False, start_date)["Annual_Cost"]
+        for name, (df, index) in tariffs.items()
+    })
+    pd.testing.assert_frame_equal(matrix[list(tariffs)], costs)
+    assert matrix["MPRN"].tolist() == [site[0] for site in SITES]
+
+    # The cheapest supplier that can price the site; none when no supplier can
+    priced = costs.notna().any(axis=1)
+    assert matrix["Best_Cost"].tolist() == pytest.approx(costs.min(axis=1).tolist(), nan_ok=True)
+    assert matrix.loc[priced, "Best_Supplier"].tolist() == costs[priced].idxmin(axis=1).tolist()
+    assert matrix.loc[~priced, "Best_Supplier"].isna().all()
+
+    assert totals["Supplier"].tolist() == list(tariffs)
+    assert totals["Sites_Priced"].tolist() == costs.notna().sum().tolist()
+    assert totals["Total_Annual_Cost"].tolist() == pytest.approx(costs.sum().tolist())
+    assert totals["Cheapest_For"].tolist() == [
+        int((matrix["Best_Supplier"] == name).sum()) for name in tariffs
+    ]
+    assert totals["Cheapest_For"].sum() == priced.sum()
+
+
+def test_compare_suppliers_when_one_supplier_has_no_match(postcodes):
+    tariffs = suppliers()
+    matrix, totals = compare_suppliers(sites(), tariffs, postcodes, False, "2026-03-01")
+
+    # Site 1002 is in NW, so "No NW" cannot price it; 1003 is above "Small"'s bands
+    assert np.isnan(matrix.loc[1, "No NW"]) and np.isnan(matrix.loc[2, "Small"])
+    assert matrix.loc[1, "Best_Cost"] == min(matrix.loc[1, "Regular"], matrix.loc[1, "Small"])
+    assert matrix.loc[2, "Best_Cost"] == min(matrix.loc[2, "Regular"], matrix.loc[2, "No NW"])
+    assert totals["Sites_Priced"].tolist() == [3, 2, 2]
+    # Unpriced sites carry no best supplier or cost
+    assert matrix["Best_Supplier"].iloc[3:].isna().all()
+    assert matrix["Best_Cost"].iloc[3:].isna().all()
+
+
+def test_compare_suppliers_needs_a_tariff(postcodes):
+    with pytest.raises(ValueError):
+        compare_suppliers(sites(), {}, postcodes, False)
@@ -0,0 +1,98 @@
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from pricing import export
+from pricing.cache import SizedLRUCache, config_key
+from pricing.export import lazy_xlsx, write_xlsx, xlsx_bytes
+from pricing.price_list import PRICE_LIST_FORMATS
+
+
+def price_list(n=25):
+    return pd.DataFrame({
+        "LDZ": ["SC", "NW", None, "EA", "WS"] * (n // 5),
+        "Minimum_Annual_Consumption": np.arange(n) * 1000,
+        "Unit_Rate": np.linspace(2.5, 7.5, n),
+        "Standing_Charge": [30.123456, np.nan, 28.0, 27.5, 26.0] * (n // 5),
+        "Production_Date": pd.Timestamp("2025-06-02"),
+    })
+
+
+def rows(data):
+    sheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    return sheet, list(sheet.iter_rows(values_only=True))
+
+
+def test_workbook_holds_every_row(monkeypatch):
+    # Several streaming chunks, the last one partial
+    monkeypatch.setattr(export, "CHUNK_ROWS", 7)
+    df = price_list()
+    sheet, values = rows(xlsx_bytes(df, sheet_name="Prices"))
+
+    assert sheet.title == "Prices"
+    assert values[0] == tuple(df.columns)
+    assert len(values) == len(df) + 1
+    assert [row[1] for row in values[1:]] == df["Minimum_Annual_Consumption"].tolist()
+    assert [row[2] for row in values[1:]] == pytest.approx(df["Unit_Rate"].tolist())
+    # Missing values are blank cells and dates stay dates
+    assert values[3][0] is None and values[2][3] is None
+    assert values[1][4] == pd.Timestamp("2025-06-02").to_pydatetime()
+
+
+def test_column_formats_apply_to_whole_columns():
+    df = price_list()
+    formats = {"Unit_Rate": "0.0000", "Standing_Charge": "#,##0.00"}
+    sheet, _ = rows(xlsx_bytes(df, column_formats=formats))
+
+    assert sheet.column_dimensions["C"].number_format == "0.0000"
+    assert sheet.column_dimensions["D"].number_format == "#,##0.00"
+    assert sheet.column_dimensions["B"].number_format == "General"
+    assert {sheet.cell(row, 3).number_format for row in range(2, len(df) + 2)} == {"0.0000"}
+    # Header cells keep the header style
+    assert sheet.cell(1, 3).font.bold
+
+
+def test_price_list_formats_name_price_list_columns():
+    df = pd.DataFrame({column: [1.5] for column in PRICE_LIST_FORMATS})
+    sheet, _ = rows(xlsx_bytes(df, column_formats=PRICE_LIST_FORMATS))
+
+    for col, num_format in enumerate(PRICE_LIST_FORMATS.values(), start=1):
+        assert sheet.cell(2, col).number_format == num_format
+
+
+def test_rows_past_the_sheet_limit_raise(monkeypatch, tmp_path):
+    monkeypatch.setattr(export, "XLSX_MAX_ROWS", 26)
+    target = tmp_path / "prices.xlsx"
+
+    # 25 rows and the header fill the sheet exactly
+    write_xlsx(price_list(25), target)
+    assert len(rows(target.read_bytes())[1]) == 26
+    with pytest.raises(ValueError, match="30 rows do not fit"):
+        write_xlsx(price_list(30), tmp_path / "too_many.xlsx")
+    assert not (tmp_path / "too_many.xlsx").exists()
+
+
+def test_lazy_xlsx_builds_once_per_key(monkeypatch):
+    monkeypatch.setattr(export, "artifact_cache", SizedLRUCache(export.MAX_ARTIFACT_BYTES))
+    built = []
+
+    def build_df():
+        built.append(1)
+        return price_list()
+
+    key = ("tariff-hash", config_key([{"Min": 0, "Max": 24999, "Standard_Unit": 0.5}]))
+    first = lazy_xlsx(build_df, key)
+    assert built == []
+    data = first()
+    # Another rerun of the app with the same key is served from the cache
+    assert lazy_xlsx(build_df, key)() is data
+    assert first() is data
+    assert len(built) == 1
+    assert export.artifact_cache.stats()["hits"] == 2
+
+    other = lazy_xlsx(build_df, ("tariff-hash", config_key([{"Min": 0, "Max": 24999, "Standard_Unit": 0.6}])))
+    assert other() == data
+    assert len(built) == 2
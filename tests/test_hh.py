@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from pricing.hh import HH_COLUMNS, profile_usage
+from pricing.ingest import read_flat_file
+
+# Two Mondays and a Saturday; read day first, 2025-01-06 would be 1 June
+DAYS = ["2025-01-06", "2025-01-13", "2025-01-18"]
+METERS = ["1200000000001", "1200000000002"]
+
+
+def wide(layout):
+    rows = [[meter, day] + [1.0] * 48 for meter in METERS for day in DAYS]
+    df = pd.DataFrame(rows, columns=["MPAN", "Date"] + HH_COLUMNS)
+    return with_layout(df, "Date", layout)
+
+
+def long(layout):
+    stamps = [pd.Timestamp(day) + pd.Timedelta(minutes=30 * i) for day in DAYS for i in range(48)]
+    df = pd.DataFrame([(meter, stamp, 1.0) for meter in METERS for stamp in stamps],
+                      columns=["MPAN", "Timestamp", "kWh"])
+    return with_layout(df, "Timestamp", layout)
+
+
+def with_layout(df, column, layout):
+    """Dates as datetimes, ISO text (as to_csv writes them) or UK day-first text."""
+    dates = pd.to_datetime(df[column])
+    if layout == "iso":
+        df[column] = dates.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif layout == "dmy":
+        df[column] = dates.dt.strftime("%d/%m/%Y %H:%M")
+    else:
+        df[column] = dates
+    return df
+
+
+@pytest.mark.parametrize("build", [wide, long])
+@pytest.mark.parametrize("layout", ["datetime", "iso", "dmy"])
+def test_profile_usage_reads_iso_and_day_first_dates(build, layout):
+    usage = profile_usage(build(layout))
+
+    assert usage["MPAN"].tolist() == METERS
+    # Weekday: 14 night, 26 day and 8 evening half hours; Saturday: 14 night, 34 weekend
+    assert usage["Days"].tolist() == [13, 13]
+    assert usage["Day (kWh)"].tolist() == [52.0, 52.0]
+    assert usage["Night (kWh)"].tolist() == [42.0, 42.0]
+    assert usage["Evening & Weekend (kWh)"].tolist() == [50.0, 50.0]
+
+
+@pytest.mark.parametrize("build", [wide, long])
+def test_profile_usage_after_csv_round_trip(build):
+    data = build("datetime").to_csv(index=False).encode("utf-8")
+    profile = read_flat_file(data, kind="csv", schema="hh_profile")
+
+    pd.testing.assert_frame_equal(profile_usage(profile), profile_usage(build("datetime")))
+
+
+def test_unreadable_dates_are_skipped():
+    profile = long("iso")
+    profile.loc[profile["Timestamp"].str.startswith("2025-01-18"), "Timestamp"] = "not a date"
+    usage = profile_usage(profile)
+
+    assert usage["Days"].tolist() == [8, 8]
+    assert usage["Evening & Weekend (kWh)"].tolist() == [16.0, 16.0]
+
+
+@pytest.mark.parametrize("build", [wide, long])
+def test_rows_without_meter_or_date_are_skipped(build):
+    profile = build("iso")
+    column = "Date" if "Date" in profile.columns else "Timestamp"
+    # A blank MPAN and a missing date on Saturday readings, as from empty cells
+    saturday = profile[column].str.startswith("2025-01-18")
+    profile.loc[saturday & (profile["MPAN"] == METERS[0]), "MPAN"] = None
+    profile.loc[saturday & (profile["MPAN"] == METERS[1]), column] = None
+    usage = profile_usage(profile)
+
+    assert usage["MPAN"].tolist() == METERS
+    assert usage["Days"].tolist() == [8, 8]
+    assert usage["Evening & Weekend (kWh)"].tolist() == [16.0, 16.0]
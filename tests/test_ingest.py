@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from conftest import xlsx
+
+from pricing import ingest
+from pricing.ingest import read_flat_file, read_flat_files
+
+
+def test_identifiers_stay_text():
+    data = xlsx([
+        ["MPRN", "Site_Name", "AQ", "Postcode", "Ignored"],
+        [1234567, "Depot", 12000, "AB10 1AA", "x"],
+        [None, "Office", 30000, "AB10 1AB", "y"],
+        ["0012345", 42, 5000, "AB10 1AD", "z"],
+    ])
+    df = read_flat_file(data, schema="direct_sites")
+
+    assert list(df.columns) == ["MPRN", "Site_Name", "AQ", "Postcode"]
+    assert df["MPRN"].tolist()[::2] == ["1234567", "0012345"]
+    assert df["MPRN"].isna().tolist() == [False, True, False]
+    assert df["Site_Name"].tolist() == ["Depot", "Office", "42"]
+
+
+def test_only_tariff_files_are_snapshotted(isolated_store):
+    sites = xlsx([["MPRN", "AQ"], ["1234567", 12000]])
+    tariff = xlsx([
+        ["Rate_Structure", "Contract_Duration", "Minimum_Annual_Consumption", "Maximum_Annual_Consumption",
+         "Green_Energy", "Standing_Charge", "Day_Rate", "Night_Rate", "Evening_And_Weekend_Rate"],
+        ["nhh ", 12, 1000, 3000, "yes", 25.0, 20.0, 10.0, 15.0],
+    ])
+    read_flat_file(sites, schema="direct_sites")
+    df = read_flat_file(tariff, schema="nhh")
+
+    assert [path.name.split("_")[0] for path in isolated_store.glob("*.arrow")] == ["undated"]
+    assert df["Rate_Structure"].tolist() == ["NHH"]
+    assert df["Green_Energy"].tolist() == ["YES"]
+
+
+def test_tariff_snapshot_holds_only_tariff_columns(isolated_store):
+    tariff = xlsx([
+        ["LDZ", "Carbon_Offset", "Minimum_Credit_Score", "Maximum_Credit_Score", "Unit_Rate", "Standing_Charge"],
+        ["SC", "No", 0, 100, 3.5, 28.0],
+    ])
+    df = read_flat_file(tariff, schema="gas_price_list")
+    snapshot = pd.read_feather(next(isolated_store.glob("*.arrow")))
+
+    assert sorted(snapshot.columns) == ["Carbon_Offset", "LDZ", "Standing_Charge", "Unit_Rate"]
+    assert list(df.columns) == ["LDZ", "Carbon_Offset", "Unit_Rate", "Standing_Charge"]
+
+
+class InlinePool(ThreadPoolExecutor):
+    """Thread pool standing in for the process pool, recording what it parsed."""
+
+    submitted = []
+
+    def __init__(self, max_workers=None, mp_context=None):
+        super().__init__(max_workers=max_workers)
+
+    def submit(self, fn, *args):
+        InlinePool.submitted.append(args[1])
+        return super().submit(fn, *args)
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_read_flat_files_keeps_input_order(monkeypatch, pooled):
+    files = [xlsx([["MPRN", "AQ"], [str(1000 + i), 1000 * i]]) for i in range(4)]
+    # One file already cached and one uploaded twice
+    cached = read_flat_file(files[2], schema="direct_sites")
+    uploads = [files[3], files[0], files[2], files[1], files[0]]
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", InlinePool)
+    InlinePool.submitted = []
+
+    frames = read_flat_files(uploads, schema="direct_sites", max_workers=4 if pooled else 1)
+
+    assert [df["MPRN"].tolist() for df in frames] == [["1003"], ["1000"], ["1002"], ["1001"], ["1000"]]
+    pd.testing.assert_frame_equal(frames[2], cached)
+    # Cached and repeated files are not parsed again
+    assert len(InlinePool.submitted) == (3 if pooled else 0)
+    assert frames[1] is not frames[4]
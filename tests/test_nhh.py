@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.nhh import BANDS, BOOK_KEYS, USAGE_COLUMNS, band_usage, full_price_book, match_bands, price_book
+from pricing.schemas import SCHEMAS, apply_schema
+
+UPLIFTS = {"uplift_standing": 1.0, "uplift_day": 0.5, "uplift_night": 0.25, "uplift_evw": 0.125}
+
+
+def flat_file(n=400, seed=0):
+    """NHH flat file with AQ ranges touching and straddling the BANDS edges."""
+    rng = np.random.default_rng(seed)
+    edges = np.array([edge for band in BANDS for edge in band] + [0, 400000], dtype=float)
+    mins = rng.choice(np.concatenate([edges, edges + 1, edges - 1]), n)
+    df = pd.DataFrame({
+        "Rate_Structure": rng.choice(["NHH", "nhh ", "HH"], n),
+        "Contract_Duration": rng.choice([12, 24, 36], n),
+        "Minimum_Annual_Consumption": mins,
+        "Maximum_Annual_Consumption": mins + rng.choice([0, 1999, 12499, 100000], n),
+        "Green_Energy": rng.choice(["Yes", "No", "yes ", "NO"], n),
+        "Standing_Charge": rng.random(n),
+        "Day_Rate": rng.random(n),
+        "Night_Rate": rng.random(n),
+        "Evening_And_Weekend_Rate": rng.random(n),
+    })
+    df.loc[rng.random(n) < 0.05, "Minimum_Annual_Consumption"] = np.nan
+    return df
+
+
+def reference(raw, band_min, band_max, duration, green=None, rate_structure=None):
+    """First overlapping row per band by mask filter and iloc[0], as the apps did."""
+    positions = []
+    for low, high in zip(band_min, band_max):
+        mask = (
+            (raw["Minimum_Annual_Consumption"] <= high) & (raw["Maximum_Annual_Consumption"] >= low)
+            & (raw["Contract_Duration"] == duration)
+        )
+        if green is not None:
+            mask &= raw["Green_Energy"].str.strip().str.upper() == ("YES" if green else "NO")
+        if rate_structure is not None:
+            mask &= raw["Rate_Structure"].str.strip().str.upper() == rate_structure
+        positions.append(int(np.flatnonzero(mask.to_numpy())[0]) if mask.any() else -1)
+    return positions
+
+
+def bands():
+    return pd.DataFrame([{"min": low, "max": high, **UPLIFTS} for low, high in BANDS])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("duration", [12, 24, 36])
+@pytest.mark.parametrize("green", [None, True, False])
+def test_match_bands_matches_reference(seed, duration, green):
+    raw = flat_file(n=20 + 100 * seed, seed=seed)
+    df = apply_schema(raw, SCHEMAS["nhh"])
+    book = bands()
+
+    got = match_bands(df, book["min"], book["max"], duration, green)
+    assert got.tolist() == reference(raw, book["min"], book["max"], duration, green)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_point_lookups_on_band_edges(seed):
+    raw = flat_file(n=30, seed=seed)
+    df = apply_schema(raw, SCHEMAS["nhh"])
+    eacs = np.array([edge + offset for band in BANDS for edge in band for offset in (-1, 0, 0.5, 1)] + [np.nan])
+
+    got = match_bands(df, eacs, eacs, 12, rate_structure="NHH")
+    assert got.tolist() == reference(raw, eacs, eacs, 12, rate_structure="NHH")
+
+
+def test_price_book_uplifts_matched_rows():
+    raw = flat_file(seed=7)
+    df = apply_schema(raw, SCHEMAS["nhh"])
+    positions = reference(raw, bands()["min"], bands()["max"], 24, True)
+
+    book = price_book(df, bands(), 24, True)
+    for row, position in zip(book.itertuples(index=False), positions):
+        if position < 0:
+            assert row[1:] == ("N/A",) * 4
+        else:
+            match = raw.iloc[position]
+            assert row[1:] == (
+                match["Standing_Charge"] + 1.0,
+                match["Day_Rate"] + 0.5,
+                match["Night_Rate"] + 0.25,
+                match["Evening_And_Weekend_Rate"] + 0.125,
+            )
+
+
+def test_full_price_book_matches_one_book_per_option():
+    df = apply_schema(flat_file(seed=3), SCHEMAS["nhh"])
+
+    full = full_price_book(df, bands(), annual_cost=True)
+    for (duration, tariff), part in full.groupby(BOOK_KEYS, sort=False):
+        single = price_book(df, bands(), duration, tariff == "Green", annual_cost=True)
+        pd.testing.assert_frame_equal(part.drop(columns=BOOK_KEYS).reset_index(drop=True), single)
+
+
+def customers(seed=0, n=200):
+    """Customer EACs on, beside and outside the BANDS edges with assorted splits and weights."""
+    rng = np.random.default_rng(seed)
+    edges = np.array([edge for band in BANDS for edge in band], dtype=float)
+    eacs = rng.choice(np.concatenate([edges, edges + 0.5, edges - 0.5, [0, 999, 400000]]), n)
+    # Nobody in the 175,001 - 225,000 band
+    eacs[(eacs >= 175001) & (eacs <= 225000)] = 500
+    df = pd.DataFrame({
+        "EAC": eacs,
+        "Day_Split": rng.choice([70, 0.5, 0, np.nan], n),
+        "Night_Split": rng.choice([20, 0.3, 0, np.nan], n),
+        "Evening_And_Weekend_Split": rng.choice([10, 0.2, 0, np.nan], n),
+        "Customers": rng.choice([1, 3, 0.5, np.nan], n),
+    })
+    df.loc[:4, "EAC"] = np.nan
+    return df
+
+
+def usage_reference(customers, bands):
+    """Customer count and weighted mean usage per band, one band at a time."""
+    rows = []
+    for low, high in zip(bands["min"], bands["max"]):
+        in_band = customers[(customers["EAC"] >= low) & (customers["EAC"] <= high)]
+        weight = in_band["Customers"].fillna(1.0)
+        splits = in_band[["Day_Split", "Night_Split", "Evening_And_Weekend_Split"]].fillna(0.0)
+        total = splits.sum(axis=1)
+        # No split at all is all day rate
+        splits.loc[total <= 0, "Day_Split"] = 1.0
+        splits = splits.div(splits.sum(axis=1), axis=0)
+        count = weight.sum()
+        row = {"Customers": float(count)}
+        for column, split in zip(USAGE_COLUMNS, splits.columns):
+            row[column] = (weight * in_band["EAC"] * splits[split]).sum() / count if count else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_band_usage_matches_per_band_means(seed):
+    df = customers(seed)
+    usage = band_usage(df, bands())
+
+    expected = usage_reference(df, bands())
+    pd.testing.assert_frame_equal(usage.reset_index(drop=True), expected, check_dtype=False)
+    # The empty band is NaN, not a division error
+    empty = bands()["min"] == 175001
+    assert usage.loc[empty, "Customers"].tolist() == [0.0]
+    assert usage.loc[empty, USAGE_COLUMNS].isna().all(axis=None)
+
+
+def test_band_usage_on_band_edges():
+    df = pd.DataFrame({"EAC": [1000, 3000, 3000.5, 3001, 300000, 300001]})
+    usage = band_usage(df, bands())
+
+    # 3,000.5 falls between two bands and 300,001 is past the last: neither is counted
+    assert usage["Customers"].tolist() == [2, 1, 0, 0, 0, 0, 1]
+    assert usage["day_kwh"].tolist()[:2] == [2000, 3001]
+    assert usage["night_kwh"].tolist()[:2] == [0, 0]
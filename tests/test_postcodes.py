@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from pricing.postcodes import KEY_WIDTH, PostcodeResolver, SortedLookup
+
+# AB10 straddles two LDZs; its first row in the file wins
+OUTCODES = [("AB10", "SC"), ("AB10", "NO"), ("AB11", "SC"), ("M1", "NW"), ("M2", "NW")]
+OVERRIDES = [
+    ("AB10 1AA", "EA"),
+    ("ab101ab", "WS"),
+    ("AB10 1", "NE"),
+    ("AB10 1AA", "SO"),
+    ("M1", "WM"),
+    ("AB11 9", "SE"),
+]
+
+
+@pytest.fixture
+def postcodes(tmp_path):
+    path = tmp_path / "postcodes.csv"
+    pd.DataFrame(OUTCODES, columns=["Outcode", "LDZ"]).to_csv(path, index=False)
+    overrides = tmp_path / "overrides.csv"
+    pd.DataFrame(OVERRIDES, columns=["Postcode", "LDZ"]).to_csv(overrides, index=False)
+    return PostcodeResolver(path, overrides)
+
+
+@pytest.mark.parametrize("postcode, expected", [
+    # A full postcode override beats its sector, and the first duplicate wins
+    ("AB10 1AA", ("EA", "postcode")),
+    ("ab10  1aa", ("EA", "postcode")),
+    ("AB101AB", ("WS", "postcode")),
+    # Same sector, no postcode entry
+    ("AB10 1ZZ", ("NE", "sector")),
+    # Another sector of the straddling outcode falls back to its first LDZ
+    ("AB10 2XX", ("SC", "outcode")),
+    ("AB10", ("SC", "outcode")),
+    ("AB11 9QQ", ("SE", "sector")),
+    ("AB11 8QQ", ("SC", "outcode")),
+    # Outcode overrides replace the CSV entry
+    ("M1 1AE", ("WM", "outcode")),
+    ("M2 4WU", ("NW", "outcode")),
+    ("ZZ9 9ZZ", (None, None)),
+    ("", (None, None)),
+])
+def test_resolve_prefers_the_most_specific_entry(postcodes, postcode, expected):
+    assert postcodes.resolve(postcode) == expected
+    assert postcodes.ldz(postcode) == expected[0]
+
+
+def test_straddling_outcodes(postcodes):
+    assert postcodes.straddling == {"AB10"}
+    assert postcodes.straddles("ab10")
+    assert not postcodes.straddles("AB11")
+    # An outcode override does not change what the CSV straddles
+    assert not postcodes.straddles("M1")
+
+
+def test_ldz_many_matches_ldz(postcodes):
+    codes = pd.Series(["AB10 1AA", "AB10 1ZZ", "AB10 2XX", None, "M1 1AE", "ZZ9 9ZZ", "AB10 1AA"])
+
+    expected = [postcodes.ldz(code) or "-" for code in codes.fillna("")]
+    assert postcodes.ldz_many(codes).fillna("-").tolist() == expected
+
+
+def test_sorted_lookup_keeps_keys_longer_than_key_width():
+    long_key = "SW1A 1AAX"
+    lookup = SortedLookup([long_key, "SW1A 1AA", "AB10 1"], ["NT", "SO", "SC"])
+
+    assert len(long_key) > KEY_WIDTH
+    assert len(lookup) == 3
+    assert lookup.get(long_key) == "NT"
+    assert lookup.get("SW1A 1AA") == "SO"
+    assert lookup.get("SW1A 1AAXY") is None
+    assert lookup.get("AB10 1") == "SC"
+
+
+def test_sorted_lookup_first_duplicate_wins():
+    lookup = SortedLookup(["AB10 1AA", "M1 1AE", "AB10 1AA"], ["EA", "NW", "SO"])
+
+    assert lookup.keys.dtype.itemsize == KEY_WIDTH
+    assert lookup.get("AB10 1AA") == "EA"
+    assert lookup.get("M1 1AE") == "NW"
+    assert lookup.get("M1") is None
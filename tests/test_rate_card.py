@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.rate_card import RateCard
+from pricing.tariff_index import TariffIndex
+
+BANDS = [(0, 24999), (25000, 49999), (50000, 73199), (73200, 124999)]
+# AQs on, between and outside the band edges
+AQS = [-1, 0, 24999, 24999.5, 25000, 49999, 50000, 73199, 73200, 124999, 125000, np.nan]
+
+
+def tariff(overlapping=False):
+    """Direct tariff: every band for two LDZs, carbon flags and durations."""
+    rows = [
+        (ldz, carbon, duration, low, high)
+        for duration in [24, 12]
+        for ldz in ["SC", "NW"]
+        for carbon in ["No", "Yes"]
+        for low, high in BANDS
+    ]
+    df = pd.DataFrame(rows, columns=["LDZ", "Carbon_Offset", "Contract_Duration",
+                                     "Minimum_Annual_Consumption", "Maximum_Annual_Consumption"])
+    if overlapping:
+        df.loc[df["Minimum_Annual_Consumption"] == 50000, "Minimum_Annual_Consumption"] = 40000
+    return df.assign(Unit_Rate=np.arange(len(df)) / 10, Standing_Charge=30.0)
+
+
+def expected(df, ldz, carbon, aq, duration=None):
+    """First row passing the mask filters, as the Direct apps did per site."""
+    mask = (
+        (df["LDZ"] == ldz) & ((df["Carbon_Offset"] == "Yes") == carbon)
+        & (df["Minimum_Annual_Consumption"] <= aq) & (df["Maximum_Annual_Consumption"] >= aq)
+    )
+    if duration is not None:
+        mask &= df["Contract_Duration"] == duration
+    return int(np.flatnonzero(mask.to_numpy())[0]) if mask.any() else None
+
+
+def card(df):
+    return RateCard.build(
+        df["LDZ"].to_numpy(dtype=object), (df["Carbon_Offset"] == "Yes").to_numpy(),
+        df["Contract_Duration"].to_numpy(dtype=float), df["Minimum_Annual_Consumption"].to_numpy(dtype=float),
+        df["Maximum_Annual_Consumption"].to_numpy(dtype=float), np.arange(len(df)),
+    )
+
+
+@pytest.mark.parametrize("duration", [None, 12, 24, 36])
+def test_rate_card_matches_mask_filter(duration):
+    df = tariff()
+    rate_card = card(df)
+
+    for ldz in ["SC", "NW", "WM"]:
+        for carbon in [False, True]:
+            want = [expected(df, ldz, carbon, aq, duration) for aq in AQS]
+            assert [rate_card.lookup(ldz, carbon, aq, duration) for aq in AQS] == want
+            many = rate_card.lookup_many([ldz] * len(AQS), carbon, AQS, duration)
+            assert many.tolist() == [-1 if row is None else row for row in want]
+
+
+def test_nan_aq_matches_nothing():
+    rate_card = card(tariff())
+
+    assert rate_card.lookup("SC", False, np.nan) is None
+    assert rate_card.lookup("SC", False, float("nan"), 12) is None
+    assert rate_card.lookup_many(["SC"], False, [np.nan]).tolist() == [-1]
+
+
+def test_overlapping_bands_have_no_rate_card():
+    assert card(tariff(overlapping=True)) is None
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_tariff_index_matches_mask_filter(overlapping):
+    df = tariff(overlapping)
+    index = TariffIndex(df)
+
+    assert (index._columns is None) == overlapping
+    for ldz in ["SC", "NW", "WM"]:
+        for carbon in [False, True]:
+            want = [expected(df, ldz, carbon, aq) for aq in AQS]
+            assert [index.lookup(ldz, carbon, aq) for aq in AQS] == want
+            many = index.lookup_many([ldz] * len(AQS), carbon, AQS)
+            assert many.tolist() == [-1 if row is None else row for row in want]
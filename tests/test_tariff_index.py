@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.tariff_index import TariffIndex, date_warning, day_numbers, quote_warning
+
+# Two quote weeks of a regular AQ grid; row 4 repeats row 0 and is never first
+ROWS = [
+    # LDZ, min AQ, max AQ, start from, start to, quote from, quote to
+    ("SC", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+    ("SC", 25000, 73199, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+    ("SC", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-09", "2025-06-15"),
+    ("NW", 0, 24999, None, None, "2025-06-02", "2025-06-08"),
+    ("SC", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+]
+DATE_COLUMNS = [
+    "Minimum_Contract_Start_Date",
+    "Maximum_Contract_Start_Date",
+    "Minimum_Valid_Quote_Date",
+    "Maximum_Valid_Quote_Date",
+]
+
+
+def dmy(value):
+    return None if pd.isna(value) else pd.Timestamp(value).strftime("%d/%m/%Y")
+
+
+def tariff(layout="iso", overlapping=False):
+    """Direct tariff with its dates as ISO text, D/M/Y text or Excel dates."""
+    df = pd.DataFrame(ROWS, columns=["LDZ", "Minimum_Annual_Consumption", "Maximum_Annual_Consumption"]
+                      + DATE_COLUMNS)
+    if layout == "dmy":
+        df[DATE_COLUMNS] = df[DATE_COLUMNS].apply(lambda column: column.map(dmy))
+    elif layout == "datetime":
+        df[DATE_COLUMNS] = df[DATE_COLUMNS].apply(pd.to_datetime)
+    if overlapping:
+        # Irregular file: bands overlap, so lookups use the row tables
+        df.loc[1, "Minimum_Annual_Consumption"] = 20000
+    return df.assign(Carbon_Offset="No", Contract_Duration=12, Unit_Rate=3.0, Standing_Charge=30.0)
+
+
+def expected(df, ldz, aq, start, quote):
+    """First row passing the mask filters, as the Direct apps did per site."""
+    dates = [pd.to_datetime(df[column], format="ISO8601") for column in DATE_COLUMNS]
+    start, quote = pd.Timestamp(start), pd.Timestamp(quote)
+    mask = (
+        (df["LDZ"] == ldz)
+        & (df["Minimum_Annual_Consumption"] <= aq) & (df["Maximum_Annual_Consumption"] >= aq)
+        & (dates[0].isna() | (dates[0] <= start)) & (dates[1].isna() | (start <= dates[1]))
+        & (dates[2].isna() | (dates[2] <= quote)) & (quote <= dates[3])
+    )
+    return int(np.flatnonzero(mask.to_numpy())[0]) if mask.any() else None
+
+
+def test_day_numbers_read_iso_and_day_first_text():
+    values = pd.Series(["2025-06-02", "2025-06-02 00:00:00", "02/06/2025", "2025-01-13", "13/01/2025", None, " "])
+    days = day_numbers(values, -np.inf)
+
+    june_2 = (pd.Timestamp("2025-06-02") - pd.Timestamp("1970-01-01")).days
+    january_13 = (pd.Timestamp("2025-01-13") - pd.Timestamp("1970-01-01")).days
+    assert days.tolist() == [june_2] * 3 + [january_13] * 2 + [-np.inf] * 2
+
+
+@pytest.mark.parametrize("layout", ["iso", "dmy", "datetime"])
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_dated_lookups_match_mask_filter(layout, overlapping):
+    df = tariff(layout, overlapping)
+    reference = tariff("iso", overlapping)
+    index = TariffIndex(df)
+
+    assert (index._columns is None) == overlapping
+    for ldz in ["SC", "NW"]:
+        for aq in [0, 24999, 25000, 73199, 73200]:
+            for start, quote in [("2025-06-10", "2025-06-02"), ("2025-06-10", "2025-06-09"),
+                                 ("2025-06-10", "2025-02-06"), ("2025-05-31", "2025-06-05")]:
+                want = expected(reference, ldz, aq, start, quote)
+                assert index.lookup(ldz, False, aq, start, quote) == want
+                many = index.lookup_many([ldz], False, [aq], start, quote)
+                assert many.tolist() == [-1 if want is None else want]
+
+
+def test_quote_window_is_not_day_month_swapped():
+    index = TariffIndex(tariff("iso"))
+
+    assert index.quote_window == (pd.Timestamp("2025-06-02"), pd.Timestamp("2025-06-15"))
+    assert quote_warning(index, "2025-06-10") is None
+    assert "02/06/2025 – 15/06/2025" in quote_warning(index, "2025-02-06")
+
+
+@pytest.mark.parametrize("overlapping", [False, True])
+def test_unparseable_dates_reject_the_row(overlapping):
+    df = tariff("iso", overlapping)
+    df["Maximum_Valid_Quote_Date"] = df["Maximum_Valid_Quote_Date"].astype(object)
+    df.loc[0, "Maximum_Valid_Quote_Date"] = "next week"
+    index = TariffIndex(df)
+
+    assert index.bad_dates == 1
+    assert "1 tariff row(s)" in date_warning(index)
+    # Row 0 is skipped, not treated as open-ended: its duplicate row 4 matches
+    assert index.lookup("SC", False, 1000, "2025-06-10", "2025-06-05") == 4
+    assert index.lookup("SC", False, 1000) == 2
+    assert date_warning(TariffIndex(tariff("dmy"))) is None
+
+
+def days_after(first, offsets):
+    return pd.Timestamp(first) + pd.to_timedelta(offsets, unit="D")
+
+
+def many_windows(n=400, seed=0):
+    """Irregular tariff whose rows each have their own start and quote windows."""
+    rng = np.random.default_rng(seed)
+    start_from = days_after("2025-01-01", rng.integers(0, 365, n))
+    quote_from = days_after("2025-01-01", rng.integers(0, 365, n))
+    mins = rng.integers(0, 50, n) * 1000
+    df = pd.DataFrame({
+        "LDZ": rng.choice(["SC", "NW"], n),
+        "Minimum_Annual_Consumption": mins,
+        "Maximum_Annual_Consumption": mins + rng.integers(0, 20, n) * 1000 + 999,
+        "Minimum_Contract_Start_Date": start_from.strftime("%Y-%m-%d"),
+        "Maximum_Contract_Start_Date": (start_from + pd.to_timedelta(rng.integers(0, 120, n), unit="D"))
+        .strftime("%Y-%m-%d"),
+        "Minimum_Valid_Quote_Date": quote_from.strftime("%Y-%m-%d"),
+        "Maximum_Valid_Quote_Date": (quote_from + pd.to_timedelta(rng.integers(0, 30, n), unit="D"))
+        .strftime("%Y-%m-%d"),
+    })
+    # Some open-ended start windows
+    df.loc[rng.random(n) < 0.1, "Minimum_Contract_Start_Date"] = None
+    return df.assign(Carbon_Offset="No", Contract_Duration=12, Unit_Rate=3.0, Standing_Charge=30.0)
+
+
+def test_many_distinct_windows_match_mask_filter():
+    df = many_windows()
+    index = TariffIndex(df)
+
+    # Hundreds of distinct bounds per axis: above the default cap, every key searches its rows
+    assert index._columns is None
+    assert not index.windows
+    assert sorted(index.boxes) == [("NW", False), ("SC", False)]
+    assert index.nbytes > 0
+
+    rng = np.random.default_rng(1)
+    aqs = rng.integers(0, 70000, 40).astype(float)
+    ldzs = rng.choice(["SC", "NW", "WS"], 40)
+    dates = zip(days_after("2025-01-01", rng.integers(0, 400, 10)), days_after("2025-01-01", rng.integers(0, 400, 10)))
+    matched = 0
+    for start, quote in dates:
+        want = [expected(df, ldz, aq, start, quote) for ldz, aq in zip(ldzs, aqs)]
+        assert [index.lookup(ldz, False, aq, start, quote) for ldz, aq in zip(ldzs, aqs)] == want
+        many = index.lookup_many(ldzs, False, aqs, start, quote)
+        assert many.tolist() == [-1 if row is None else row for row in want]
+        matched += sum(row is not None for row in want)
+    assert matched > 0
+
+
+def test_small_window_tables_stay_dense():
+    df = many_windows(n=40)
+    index = TariffIndex(df)
+
+    assert not index.boxes
+    for start, quote in [("2025-03-01", "2025-03-05"), ("2025-06-10", "2025-06-20")]:
+        for aq in range(0, 70000, 2500):
+            for ldz in ["SC", "NW"]:
+                assert index.lookup(ldz, False, aq, start, quote) == expected(df, ldz, aq, start, quote)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_undated_segments_match_mask_filter(seed):
+    df = many_windows(seed=seed).drop(columns=DATE_COLUMNS)
+    index = TariffIndex(df)
+
+    assert index._columns is None
+    for ldz in ["SC", "NW"]:
+        aqs = np.arange(0, 72000, 500, dtype=float)
+        want = []
+        for aq in aqs:
+            mask = (df["LDZ"] == ldz) & (df["Minimum_Annual_Consumption"] <= aq) & (df["Maximum_Annual_Consumption"] >= aq)
+            want.append(int(np.flatnonzero(mask.to_numpy())[0]) if mask.any() else -1)
+        assert index.lookup_many([ldz] * len(aqs), False, aqs).tolist() == want
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+from pricing.tariff_index import TariffIndex
+from pricing.trace import STAGES, TRACE_COLUMNS, MatchTrace
+
+ROWS = [
+    # LDZ, carbon, min AQ, max AQ, start from, start to, quote from, quote to
+    ("SC", "No", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+    ("SC", "No", 0, 24999, "2026-01-01", "2026-12-31", "2025-06-02", "2025-06-08"),
+    ("SC", "No", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-09", "2025-06-15"),
+    ("SC", "No", 25000, 73199, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+    ("SC", "Yes", 0, 24999, "2025-06-01", "2025-12-31", "2025-06-02", "2025-06-08"),
+    ("NW", "No", 0, 24999, None, None, "2025-06-02", "2025-06-15"),
+]
+
+
+def tariff():
+    df = pd.DataFrame(ROWS, columns=[
+        "LDZ", "Carbon_Offset", "Minimum_Annual_Consumption", "Maximum_Annual_Consumption",
+        "Minimum_Contract_Start_Date", "Maximum_Contract_Start_Date",
+        "Minimum_Valid_Quote_Date", "Maximum_Valid_Quote_Date",
+    ])
+    return df.assign(Contract_Duration=12, Standing_Charge=range(20, 26), Unit_Rate=[3.0, 3.1, 3.2, 3.3, 3.4, 3.5])
+
+
+# Site, postcode, outcode, LDZ, level, AQ
+SITES = [
+    ("Depot", "AB10 1AA", "AB10", "SC", "postcode", 12000),
+    ("Office", "AB10 2BB", "AB10", "SC", "outcode", 30000),
+    ("Shop", "M1 1AE", "M1", "NW", "sector", 500),
+    ("Yard", "AB10 3CC", "AB10", "SC", "outcode", 80000),
+    ("Unknown", "ZZ9 9ZZ", "ZZ9", None, None, 12000),
+]
+
+
+def trace_sites(trace, index, carbon=False, start_date=None, quote_date=None):
+    for site, postcode, outcode, ldz, level, aq in SITES:
+        position = index.lookup(ldz, carbon, aq, start_date, quote_date) if ldz else None
+        trace.record(site, postcode, outcode, ldz, level, aq, carbon, position,
+                     start_date, quote_date, straddles=outcode == "AB10")
+
+
+@pytest.mark.parametrize("carbon", [False, True])
+def test_stage_counts(carbon):
+    df = tariff()
+    trace = MatchTrace(df)
+    trace_sites(trace, TariffIndex(df), carbon, "2025-07-01", "2025-06-05")
+    frame = trace.to_frame().set_index("Site")
+
+    # Rows left after LDZ, carbon, AQ band, contract start and quote date
+    if carbon:
+        assert frame.loc["Depot", list(STAGES)].tolist() == [5, 1, 1, 1, 1]
+        assert frame.loc["Shop", list(STAGES)].tolist() == [1, 0, 0, 0, 0]
+    else:
+        assert frame.loc["Depot", list(STAGES)].tolist() == [5, 4, 3, 2, 1]
+        assert frame.loc["Office", list(STAGES)].tolist() == [5, 4, 1, 1, 1]
+        assert frame.loc["Shop", list(STAGES)].tolist() == [1, 1, 1, 1, 1]
+        assert frame.loc["Yard", list(STAGES)].tolist() == [5, 4, 0, 0, 0]
+        assert frame.loc["Depot", "Row"] == 0 and frame.loc["Office", "Row"] == 3
+        assert frame.loc["Shop", ["Standing_Charge", "Unit_Rate"]].tolist() == [25, 3.5]
+    assert frame.loc["Unknown", list(STAGES)].isna().all()
+
+
+def test_to_frame():
+    df = tariff()
+    trace = MatchTrace(df)
+    trace_sites(trace, TariffIndex(df), start_date="2025-07-01", quote_date="2025-06-12")
+    frame = trace.to_frame()
+
+    assert list(frame.columns) == TRACE_COLUMNS
+    assert len(trace) == len(frame) == len(SITES)
+    assert frame["Site"].tolist() == [site[0] for site in SITES]
+    # Office's only 30,000 kWh row can't be quoted on the 12th
+    assert frame["Result"].tolist() == ["Matched", "No Match", "Matched", "No Match", "No LDZ"]
+    assert frame["Matched By"].tolist()[:4] == ["postcode", "outcode", "sector", "outcode"]
+    assert frame["Straddles LDZ"].tolist() == [True, True, False, True, False]
+    assert frame["Row"].fillna(-1).tolist() == [2, -1, 5, -1, -1]
+    assert frame.loc[1, list(STAGES)].tolist() == [5, 4, 1, 1, 0]
+    # Counts and rows are nullable integers, blank where a site never got that far
+    for column in list(STAGES) + ["Row"]:
+        assert frame[column].dtype == "Int64"
+    assert frame.loc[3, ["Row", "Standing_Charge", "Unit_Rate"]].isna().all()
+    assert frame.loc[4, ["LDZ Found", "Matched By", "Row"] + list(STAGES)].isna().all()
+
+
+def test_undated_trace_drops_the_date_stages():
+    df = tariff()
+    trace = MatchTrace(df)
+    trace_sites(trace, TariffIndex(df))
+    frame = trace.to_frame()
+
+    assert list(frame.columns) == [column for column in TRACE_COLUMNS if column not in STAGES[3:]]
+    assert frame.loc[0, list(STAGES[:3])].tolist() == [5, 4, 3]
+    assert frame.loc[0, "Row"] == 0
+
+
+def test_disabled_trace_records_nothing():
+    df = tariff()
+    trace = MatchTrace(df, enabled=False)
+    trace_sites(trace, TariffIndex(df), start_date="2025-07-01")
+
+    assert len(trace) == 0
+    assert trace.records == []
+    # The tariff columns are never extracted
+    assert trace._columns is None
+    frame = trace.to_frame()
+    assert frame.empty
+    assert list(frame.columns) == [column for column in TRACE_COLUMNS if column not in STAGES[3:]]
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing.price_list import BANDS, price_rows
+from pricing.uplifts import IncrementalPricer, band_uplifts
+
+DURATIONS = ["1 Year", "2 Year", "3 Year"]
+
+
+def band_inputs(durations=None):
+    """Distinct uplifts per band and carbon flag, so every pick is identifiable."""
+    inputs = []
+    for i, band in enumerate(BANDS):
+        entry = {
+            **band,
+            "Standard_Unit": 0.1 * (i + 1),
+            "Standard_Standing": 1.0 * (i + 1),
+            "Carbon_Unit": 0.01 * (i + 1),
+            "Carbon_Standing": 10.0 * (i + 1),
+        }
+        if durations is not None:
+            entry["Duration"] = durations[i % len(durations)]
+        inputs.append(entry)
+    return inputs
+
+
+def flat_file():
+    """AQs on, beside and between the band edges, below and above them, and blank."""
+    edges = [value for band in BANDS for value in (band["Min"], band["Max"])]
+    consumption = sorted({edge + offset for edge in edges for offset in (-1, -0.5, 0, 0.5, 1)})
+    consumption += [0, 999, 731999.5, 1e7, np.nan]
+    flags = ["Yes", "no", " Y ", "TRUE", "1", "0", "", None]
+    durations = [12, 24, 36, "1 year", "2", None]
+    rows = [
+        (value, flags[i % len(flags)], durations[i % len(durations)])
+        for i, value in enumerate(consumption)
+    ]
+    return pd.DataFrame(rows, columns=["Minimum_Annual_Consumption", "Carbon_Offset", "Contract_Duration"])
+
+
+def gas105_uplifts(df, band_inputs):
+    """The per-row get_uplifts apply Gas105 used before band_uplifts."""
+    def get_uplifts(row):
+        consumption = row["Minimum_Annual_Consumption"]
+        matched_band = next((b for b in band_inputs if b["Min"] <= consumption <= b["Max"]), band_inputs[-1])
+        carbon = str(row.get("Carbon_Offset", "")).strip().lower() in ["yes", "y", "true", "1"]
+        if carbon:
+            return pd.Series({"Uplift_Unit": matched_band["Carbon_Unit"],
+                              "Uplift_Standing": matched_band["Carbon_Standing"]})
+        return pd.Series({"Uplift_Unit": matched_band["Standard_Unit"],
+                          "Uplift_Standing": matched_band["Standard_Standing"]})
+
+    return df.apply(get_uplifts, axis=1)
+
+
+def gas104_uplifts(df, band_inputs):
+    """The per-row get_band_uplift apply Gas104 used: the band's duration must match."""
+    def get_band_uplift(row):
+        consumption = row.get("Minimum_Annual_Consumption", 0)
+        contract_duration = str(row.get("Contract_Duration", "")).strip().lower()
+        duration_label = (
+            "1 Year" if "1" in contract_duration else
+            "2 Year" if "2" in contract_duration else
+            "3 Year"
+        )
+        band = next(
+            (b for b in band_inputs if b["Min"] <= consumption <= b["Max"] and b["Duration"] == duration_label),
+            None,
+        )
+        if band is None:
+            return pd.Series({"Uplift_Unit": 0.0, "Uplift_Standing": 0.0})
+        carbon = str(row.get("Carbon_Offset", "")).strip().lower() in ["y", "yes", "true", "1"]
+        if carbon:
+            return pd.Series({"Uplift_Unit": band["Carbon_Unit"], "Uplift_Standing": band["Carbon_Standing"]})
+        return pd.Series({"Uplift_Unit": band["Standard_Unit"], "Uplift_Standing": band["Standard_Standing"]})
+
+    return df.apply(get_band_uplift, axis=1)
+
+
+def test_band_uplifts_match_gas105_loop():
+    df = flat_file()
+    inputs = band_inputs()
+
+    pd.testing.assert_frame_equal(band_uplifts(df, inputs), gas105_uplifts(df, inputs), check_dtype=False)
+
+
+def test_unmatched_rows_fall_back_to_last_band():
+    df = pd.DataFrame({"Minimum_Annual_Consumption": [999, 24999.5, 1e7, np.nan], "Carbon_Offset": "No"})
+    inputs = band_inputs()
+
+    assert band_uplifts(df, inputs)["Uplift_Unit"].tolist() == [inputs[-1]["Standard_Unit"]] * 4
+    unmatched = band_uplifts(df, inputs, fallback_last=False)
+    assert unmatched["Uplift_Unit"].tolist() == [0.0] * 4
+    assert unmatched["Uplift_Standing"].tolist() == [0.0] * 4
+
+
+@pytest.mark.parametrize("durations", [["1 Year"], ["2 Year", "3 Year"], DURATIONS])
+def test_band_uplifts_with_durations_match_gas104_loop(durations):
+    df = flat_file()
+    inputs = band_inputs(durations)
+
+    got = band_uplifts(df, inputs, duration_col="Contract_Duration", fallback_last=False)
+    pd.testing.assert_frame_equal(got, gas104_uplifts(df, inputs), check_dtype=False)
+
+
+def test_carbon_flags_without_a_carbon_column():
+    df = flat_file().drop(columns=["Carbon_Offset"])
+    inputs = band_inputs()
+
+    pd.testing.assert_frame_equal(
+        band_uplifts(df, inputs), gas105_uplifts(df.assign(Carbon_Offset=""), inputs), check_dtype=False
+    )
+
+
+def tariff(seed, n=300):
+    """Gas price list rows spread over the bands, carbon flags and durations."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Minimum_Annual_Consumption": rng.choice([b["Min"] for b in BANDS] + [b["Max"] for b in BANDS] + [500], n),
+        "Carbon_Offset": rng.choice(["Yes", "No"], n),
+        "Contract_Duration": rng.choice([12, 24, 36], n),
+        "Unit_Rate": rng.random(n) * 5,
+        "Standing_Charge": rng.random(n) * 50,
+    })
+    df.attrs["content_hash"] = f"tariff-{seed}"
+    return df
+
+
+def full_price(df, inputs, **options):
+    """Every row priced from scratch: band_uplifts then price_rows."""
+    priced = df.reset_index(drop=True)
+    priced[["Uplift_Unit", "Uplift_Standing"]] = band_uplifts(priced, inputs, **options)
+    price_rows(priced, priced.index)
+    return priced
+
+
+def pricer_for(pricer, df, **options):
+    """The pricer an app keeps in session state, rebuilt when the tariff file changes."""
+    if pricer is None or pricer.tariff_hash != df.attrs["content_hash"]:
+        pricer = IncrementalPricer(df, price_rows, **options)
+    return pricer
+
+
+@pytest.mark.parametrize("options", [{}, {"duration_col": "Contract_Duration", "fallback_last": False}])
+def test_incremental_pricer_matches_full_recompute(options):
+    inputs = band_inputs(DURATIONS if options else None)
+    df = tariff(0)
+    pricer = pricer_for(None, df, **options)
+
+    def check(df, inputs):
+        got = pricer.price(inputs)
+        pd.testing.assert_frame_equal(got, full_price(df, inputs, **options), check_dtype=False)
+
+    check(df, inputs)
+    assert pricer.last_rows_priced == len(df)
+
+    # One band's standard uplift: only that band's standard rows are repriced
+    inputs[2] = {**inputs[2], "Standard_Unit": 0.75}
+    check(df, inputs)
+    assert 0 < pricer.last_rows_priced < len(df)
+
+    # A carbon uplift of another band
+    inputs[4] = {**inputs[4], "Carbon_Standing": 99.0}
+    check(df, inputs)
+    assert 0 < pricer.last_rows_priced < len(df)
+
+    # Nothing changed: nothing repriced
+    check(df, inputs)
+    assert pricer.last_rows_priced == 0
+
+    if options:
+        # A band's duration selection moves its rows in and out of the uplift
+        inputs[1] = {**inputs[1], "Duration": "3 Year"}
+        check(df, inputs)
+
+    # New band limits regroup every row
+    inputs[0] = {**inputs[0], "Max": 30000}
+    inputs[1] = {**inputs[1], "Min": 30001}
+    check(df, inputs)
+    assert pricer.last_rows_priced == len(df)
+
+    # A different tariff file gets a fresh pricer, priced in full
+    swapped = tariff(1)
+    pricer = pricer_for(pricer, swapped, **options)
+    check(swapped, inputs)
+    assert pricer.last_rows_priced == len(swapped)